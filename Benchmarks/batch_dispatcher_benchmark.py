@@ -0,0 +1,57 @@
+"""
+Benchmark comparing users planned one call each with users batched into shared calls, on a local stub server.
+
+Run with: python Benchmarks/batch_dispatcher_benchmark.py [users] [latency_ms]
+"""
+
+
+
+import sys, os
+import datetime
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "Tests")))
+
+from planner.batch_dispatcher import BATCH_SYSTEM_PROMPT, PlanningBatcher, build_batch_query
+from planner.deepseek_processor import _clients, ModelClient
+from planner.prompt_builder import COMPACT_SYSTEM_PROMPT, encode_tasks, estimate_tokens
+from planner.scheduler import plan_tasks
+from scheduler_benchmark import make_input_tasks
+from stub_server import StubServer
+
+
+if __name__ == "__main__":
+    users = int(sys.argv[1]) if len(sys.argv) > 1 else 64
+    latency = (float(sys.argv[2]) if len(sys.argv) > 2 else 200) / 1000
+    today = datetime.date(2025, 1, 1)
+    task_lists = [make_input_tasks(10, today, seed) for seed in range(users)]
+
+    alone_tokens = sum(estimate_tokens(COMPACT_SYSTEM_PROMPT) + estimate_tokens(encode_tasks(input_tasks, today))
+                       for input_tasks in task_lists)
+    batch_tokens = sum(estimate_tokens(BATCH_SYSTEM_PROMPT) +
+                       estimate_tokens(build_batch_query([encode_tasks(input_tasks, today)
+                                                          for input_tasks in task_lists[i:i + 16]]))
+                       for i in range(0, users, 16))
+    print(f"{users} users with 10 parts each, {latency * 1000:.0f} ms per model call")
+
+    with StubServer(content = "TASK Task 0 DATE 01 01 2025 DESC NONE PARTS 1 1", latency = latency) as server:
+        _clients["BENCH"] = ModelClient("BENCH", api_url = server.url)
+
+        start = time.perf_counter()
+        with ThreadPoolExecutor(4) as executor:
+            list(executor.map(lambda input_tasks: plan_tasks("BENCH", input_tasks, today), task_lists))
+        print(f"one call per user: {server.requests:4d} calls, {alone_tokens:6d} prompt tokens, "
+              f"{time.perf_counter() - start:6.2f} s")
+
+        calls = server.requests
+        batcher = PlanningBatcher("BENCH", window = 0.05, workers = 4)
+        start = time.perf_counter()
+        futures = [batcher.submit(input_tasks, today) for input_tasks in task_lists]
+        for future in futures:
+            future.result()
+        print(f"batched:           {server.requests - calls:4d} calls, {batch_tokens:6d} prompt tokens, "
+              f"{time.perf_counter() - start:6.2f} s")
+        batcher.close()
+        _clients.pop("BENCH").close()
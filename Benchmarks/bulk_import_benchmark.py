@@ -0,0 +1,80 @@
+"""
+Benchmark comparing the bulk row constructors with a loop over params_to_input_task and params_to_output_task.
+
+Run with: python Benchmarks/bulk_import_benchmark.py [tasks]
+"""
+
+
+
+import sys, os
+import time
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from planner.task_interpreter import (CreateTaskException, params_to_input_task, params_to_output_task,
+                                      rows_to_input_tasks, rows_to_output_tasks)
+
+
+def make_rows(tasks: int, bad_every: int = 0) -> list[tuple[str, ...]]:
+    """
+    Return rows of InputTask parameters as a CSV import gives them, with one bad row in every bad_every rows.
+    """
+    rows = []
+    for i in range(tasks):
+        parts = "x" if bad_every and i % bad_every == 0 else str(1 + i % 9)
+        rows.append((f"Task {i % 500}", f"2025-{1 + i % 12:02d}-{1 + i % 28:02d}",
+                     "NONE" if i % 3 else f"Description {i % 200}", parts))
+    return rows
+
+
+def loop_input_tasks(rows: list[tuple[str, ...]]) -> tuple[list, list]:
+    """
+    Create InputTasks the way the Planner did before the bulk constructor, splitting each date by hand.
+    """
+    tasks = []
+    errors = []
+    for index, (name, date, desc, parts) in enumerate(rows):
+        year, month, day = date.split('-')
+        try:
+            tasks.append(params_to_input_task(name, day, month, year, desc, parts))
+        except CreateTaskException as e:
+            errors.append((index, str(e)))
+    return tasks, errors
+
+
+def loop_output_tasks(rows: list[tuple[str, ...]]) -> tuple[list, list]:
+    tasks = []
+    errors = []
+    for index, (name, date, desc, part_num, total_parts) in enumerate(rows):
+        year, month, day = date.split('-')
+        try:
+            tasks.append(params_to_output_task(name, day, month, year, desc, part_num, total_parts))
+        except CreateTaskException as e:
+            errors.append((index, str(e)))
+    return tasks, errors
+
+
+def best_time(func, rows, repeat: int = 5) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func(rows)
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+if __name__ == "__main__":
+    tasks = int(sys.argv[1]) if len(sys.argv) > 1 else 100000
+
+    for label, bad_every in (("valid rows", 0), ("1 in 10 bad", 10)):
+        rows = make_rows(tasks, bad_every)
+        output_rows = [(name, date, desc, "1", parts) for name, date, desc, parts in rows]
+        assert [str(task) for task in loop_input_tasks(rows)[0]] == [str(task) for task in rows_to_input_tasks(rows)[0]]
+        assert len(loop_output_tasks(output_rows)[1]) == len(rows_to_output_tasks(output_rows)[1])
+
+        for name, loop, bulk, data in (("InputTask", loop_input_tasks, rows_to_input_tasks, rows),
+                                       ("OutputTask", loop_output_tasks, rows_to_output_tasks, output_rows)):
+            old = best_time(loop, data)
+            new = best_time(bulk, data)
+            print(f"{name:10s} {tasks} tasks, {label}: loop {old * 1000:8.1f} ms, bulk {new * 1000:8.1f} ms "
+                  f"({old / new:.1f}x faster, {new / tasks * 1e6:.2f} us/task)")
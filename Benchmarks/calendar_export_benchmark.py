@@ -0,0 +1,65 @@
+"""
+Benchmark of exporting a large schedule, comparing the streamed export with building the whole file as one string.
+
+Run with: python Benchmarks/calendar_export_benchmark.py [parts]
+"""
+
+
+
+import sys, os
+import datetime
+import tempfile
+import time
+import tracemalloc
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from planner.calendar_export import csv_lines, ics_lines, iter_chunks, schedule_hash
+from planner.task import OutputTask
+from planner.task_store import TaskStore
+
+
+def make_schedule(parts: int) -> list[OutputTask]:
+    """
+    Return a schedule of the given number of OutputTask parts, spread over a year.
+    """
+    start = datetime.date(2025, 1, 1).toordinal()
+    return [OutputTask.from_ordinal(f"Task {i // 5}", start + i % 365, "NONE" if i % 3 else f"Description {i // 5}",
+                                    1 + i % 5, 5) for i in range(parts)]
+
+
+def measure(func) -> tuple[float, int]:
+    """
+    Return the seconds func takes and the peak bytes it allocates, measured in separate runs since tracing is slow.
+    """
+    start = time.perf_counter()
+    func()
+    elapsed = time.perf_counter() - start
+    tracemalloc.start()
+    func()
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return elapsed, peak
+
+
+def consume(chunks) -> None:
+    for _ in chunks:
+        pass
+
+
+if __name__ == "__main__":
+    parts = int(sys.argv[1]) if len(sys.argv) > 1 else 50000
+    with tempfile.TemporaryDirectory() as directory:
+        store = TaskStore(os.path.join(directory, "planner.db"))
+        store.replace_schedule("bench", make_schedule(parts))
+
+        for name, lines in (("ics", ics_lines), ("csv", csv_lines)):
+            whole = measure(lambda: "".join(lines(store.get_schedule("bench"))))
+            streamed = measure(lambda: consume(iter_chunks(lines(store.iter_schedule("bench")))))
+            print(f"{name} {parts} parts: whole file {whole[0] * 1000:7.1f} ms, {whole[1] / 2 ** 20:6.1f} MiB peak; "
+                  f"streamed {streamed[0] * 1000:7.1f} ms, {streamed[1] / 2 ** 20:6.1f} MiB peak")
+
+        hashed = measure(lambda: schedule_hash(store.iter_schedule("bench")))
+        rendered = measure(lambda: consume(iter_chunks(ics_lines(store.iter_schedule("bench")))))
+        print(f"ETag hash {hashed[0] * 1000:7.1f} ms against {rendered[0] * 1000:7.1f} ms to render the ics file")
+        store.close()
@@ -0,0 +1,74 @@
+"""
+Benchmark comparing the model's reply in whole OutputTasks with the compact output of task ids and days, on a local
+stub server.
+
+Run with: python Benchmarks/compact_output_benchmark.py [ms per output token]
+
+The model's time to answer grows with the tokens it writes, so the stub waits a fixed time to first token plus the
+given time for every token of the reply it sends back. Each run is the whole of plan_tasks: building the query, the
+call, and decoding the reply.
+"""
+
+
+
+import sys, os
+import datetime
+import time
+from collections import defaultdict
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "Tests")))
+
+from planner.deepseek_processor import _clients, ModelClient
+from planner.prompt_builder import estimate_tokens
+from planner.scheduler import plan_tasks, schedule_tasks
+from planner.task_interpreter import task_display_name
+from scheduler_benchmark import make_input_tasks
+from stub_server import StubServer
+
+FIRST_TOKEN_SECONDS = 0.3
+
+
+def make_replies(input_tasks: list, today: datetime.date) -> tuple[str, str]:
+    """
+    Return the same schedule of the InputTasks as a reply of whole OutputTasks and as a compact reply.
+    """
+    ordered = sorted(input_tasks, key = lambda task: task.ordinal)
+    schedule = schedule_tasks(ordered, today)
+    full = " ".join(str(task).replace(" DUE ", " DATE ") for task in schedule)
+
+    ids = {(task_display_name(task), task.desc): task_id for task_id, task in enumerate(ordered, 1)}
+    days = defaultdict(list)
+    for task in sorted(schedule, key = lambda task: task.part_num):
+        days[ids[(task.name, task.desc)]].append(str(task.ordinal - today.toordinal()))
+    compact = "\n".join(f"{task_id}:{','.join(offsets)}" for task_id, offsets in sorted(days.items()))
+    return full, compact
+
+
+def time_plan(reply: str, input_tasks: list, today: datetime.date, per_token: float, compact_output: bool) -> float:
+    with StubServer(content = reply, latency = FIRST_TOKEN_SECONDS + estimate_tokens(reply) * per_token) as server:
+        _clients["BENCH"] = ModelClient("BENCH", api_url = server.url)
+        try:
+            start = time.perf_counter()
+            schedule = plan_tasks("BENCH", input_tasks, today, max_tokens = 10 ** 6, compact_output = compact_output)
+            elapsed = time.perf_counter() - start
+        finally:
+            _clients.pop("BENCH").close()
+        assert server.requests == 1 and len(schedule) == sum(task.parts for task in input_tasks)
+    return elapsed
+
+
+if __name__ == "__main__":
+    per_token = (float(sys.argv[1]) if len(sys.argv) > 1 else 1) / 1000
+    today = datetime.date(2025, 1, 1)
+    print(f"{FIRST_TOKEN_SECONDS * 1000:.0f} ms to first token, {per_token * 1000:g} ms per output token")
+
+    for parts in (20, 200, 1000):
+        input_tasks = make_input_tasks(parts, today)
+        full, compact = make_replies(input_tasks, today)
+        full_tokens = estimate_tokens(full)
+        compact_tokens = estimate_tokens(compact)
+        full_time = time_plan(full, input_tasks, today, per_token, False)
+        compact_time = time_plan(compact, input_tasks, today, per_token, True)
+        print(f"{len(input_tasks):4d} tasks, {parts:4d} parts: output {full_tokens:6d} -> {compact_tokens:5d} tokens "
+              f"({full_tokens / compact_tokens:.1f}x fewer), end to end {full_time:6.2f} s -> {compact_time:5.2f} s")
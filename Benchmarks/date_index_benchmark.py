@@ -0,0 +1,78 @@
+"""
+Benchmark of date queries on a large schedule, comparing a DateIndex with scanning every part of the list.
+
+Run with: python Benchmarks/date_index_benchmark.py [parts]
+"""
+
+
+
+import sys, os
+import datetime
+import random
+import time
+from collections import Counter
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from planner.date_index import DateIndex
+from planner.task import OutputTask
+
+
+def make_schedule(parts: int) -> list[OutputTask]:
+    """
+    Return a shuffled schedule of the given number of OutputTask parts, spread over a year.
+    """
+    start = datetime.date(2025, 1, 1).toordinal()
+    schedule = [OutputTask.from_ordinal(f"Task {i // 5}", start + i % 365, "NONE", 1 + i % 5, 5) for i in range(parts)]
+    random.Random(0).shuffle(schedule)
+    return schedule
+
+
+def per_query(func, repeat: int) -> float:
+    """
+    Return the microseconds func takes on average.
+    """
+    start = time.perf_counter()
+    for _ in range(repeat):
+        func()
+    return (time.perf_counter() - start) * 1e6 / repeat
+
+
+def main() -> None:
+    parts = int(sys.argv[1]) if len(sys.argv) > 1 else 50000
+    schedule = make_schedule(parts)
+    day = datetime.date(2025, 3, 1).toordinal()
+    limit = parts // 365
+
+    start = time.perf_counter()
+    index = DateIndex(schedule)
+    build_ms = (time.perf_counter() - start) * 1000
+
+    cases = [("parts on one day", lambda: [task for task in schedule if task.ordinal == day],
+              lambda: index.on_day(day)),
+             ("parts in one week", lambda: [task for task in schedule if day <= task.ordinal < day + 7],
+              lambda: index.between(day, day + 7)),
+             ("load of one day", lambda: sum(1 for task in schedule if task.ordinal == day),
+              lambda: index.load(day)),
+             ("loads of one month",
+              lambda: Counter(task.ordinal for task in schedule if day <= task.ordinal < day + 30),
+              lambda: index.day_loads(day, day + 30)),
+             (f"days over {limit} parts",
+              lambda: [d for d, load in Counter(task.ordinal for task in schedule).items() if load > limit],
+              lambda: index.busy_days(limit))]
+
+    print(f"{parts} parts, index built in {build_ms:.1f} ms")
+    print(f"{'query':>22}  {'list scan':>12}  {'DateIndex':>12}")
+    for name, scan, query in cases:
+        print(f"{name:>22}  {per_query(scan, 20):9.1f} us  {per_query(query, 200):9.1f} us")
+
+    added = OutputTask.from_ordinal("New", day, "NONE", 1, 1)
+    def insert_and_remove():
+        index.insert(added)
+        index.remove(added)
+    resort = per_query(lambda: sorted(schedule + [added], key = lambda task: task.ordinal), 5)
+    print(f"{'insert and remove':>22}  {resort:9.1f} us  {per_query(insert_and_remove, 200):9.1f} us")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,81 @@
+"""
+Benchmark of the planner's cold start, measured with python -X importtime in fresh interpreters.
+
+Run with: python Benchmarks/import_time_benchmark.py [--repeat N] [--top N] [--max-ms ms]
+
+Each case is run repeat times and the fastest run is kept. With --max-ms, the benchmark exits with status 1 if any
+case that should not load the model client's HTTP libraries takes longer than that to import, so a new eager import
+shows up before it slows down every CLI call and worker start.
+"""
+
+
+
+import sys, os
+import argparse
+import subprocess
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+
+# (statement, whether it is allowed to import requests)
+CASES = (
+    ("import planner", False),
+    ("from planner import params_to_input_task", False),
+    ("from planner import rows_to_input_tasks, lines_to_output_tasks", False),
+    ("from planner import schedule_tasks", False),
+    ("from planner import ModelClient", False),
+    ("from planner import ModelClient; ModelClient('KEY').close()", True),
+)
+
+
+def import_times(statement: str) -> tuple[dict[str, tuple[int, int]], bool]:
+    """
+    Given a statement, run it in a new interpreter and return the own and cumulative microseconds of each module it
+    imported, and whether requests was among them.
+    """
+    result = subprocess.run([sys.executable, "-X", "importtime", "-c", statement], capture_output = True, text = True,
+                            cwd = ROOT, check = True)
+    times = {}
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        own, cumulative, name = line[len("import time:"):].split("|")
+        times[name.strip()] = (int(own), int(cumulative))
+    return times, "requests" in times
+
+
+def baseline() -> set[str]:
+    """
+    Return the names of the modules the interpreter imports on its own at start-up.
+    """
+    return set(import_times("pass")[0])
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description = "Measure the planner's import time.")
+    parser.add_argument("--repeat", type = int, default = 5, help = "runs per case, the fastest is kept")
+    parser.add_argument("--top", type = int, default = 5, help = "slowest modules to list per case")
+    parser.add_argument("--max-ms", type = float, help = "import time that cases without requests may not exceed")
+    args = parser.parse_args()
+
+    start_up = baseline()
+    print(f"{len(start_up)} modules the interpreter imports at start-up are not counted")
+    too_slow = []
+    for statement, loads_requests in CASES:
+        runs = []
+        for _ in range(args.repeat):
+            times, imported_requests = import_times(statement)
+            runs.append(({name: own for name, (own, _) in times.items() if name not in start_up}, imported_requests))
+        times, imported_requests = min(runs, key = lambda run: sum(run[0].values()))
+        total = sum(times.values()) / 1000
+        print(f"\n{statement}\n  {total:7.1f} ms of imports, {len(times)} modules, "
+              f"requests {'imported' if imported_requests else 'not imported'}")
+        for name, own in sorted(times.items(), key = lambda item: -item[1])[:args.top]:
+            print(f"  {own / 1000:7.2f} ms  {name}")
+        if imported_requests and not loads_requests:
+            too_slow.append(f"{statement} imports requests")
+        elif args.max_ms is not None and not loads_requests and total > args.max_ms:
+            too_slow.append(f"{statement} takes {total:.1f} ms")
+
+    if too_slow:
+        print("\n" + "\n".join(too_slow))
+        sys.exit(1)
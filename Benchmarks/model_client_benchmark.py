@@ -0,0 +1,56 @@
+"""
+Benchmark comparing a bare requests.post against the pooled ModelClient on a local stub server.
+
+Run with: python Benchmarks/model_client_benchmark.py [calls] [connect_latency_ms]
+"""
+
+
+
+import sys, os
+import time
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "Tests")))
+
+import requests
+
+from planner.deepseek_processor import ModelClient, build_request_data
+from stub_server import StubServer
+
+
+def bench_bare_post(url: str, calls: int) -> float:
+    """
+    Return the mean seconds per call when every call opens a new connection.
+    """
+    headers = {'Authorization': 'Bearer BENCH', 'Content-Type': 'application/json'}
+    start = time.perf_counter()
+    for _ in range(calls):
+        requests.post(url, json = build_request_data("TASK A DUE 01 01 2000 DESC NONE PARTS 1"), headers = headers)
+    return (time.perf_counter() - start) / calls
+
+
+def bench_model_client(url: str, calls: int) -> float:
+    """
+    Return the mean seconds per call when calls share a pooled keep-alive connection.
+    """
+    with ModelClient("BENCH", api_url = url) as client:
+        start = time.perf_counter()
+        for _ in range(calls):
+            client.ask("TASK A DUE 01 01 2000 DESC NONE PARTS 1")
+        return (time.perf_counter() - start) / calls
+
+
+if __name__ == "__main__":
+    calls = int(sys.argv[1]) if len(sys.argv) > 1 else 200
+    connect_latency = float(sys.argv[2]) / 1000 if len(sys.argv) > 2 else 0.02
+
+    with StubServer(content = "TASK A DATE 01 01 2000 DESC NONE PARTS 1 1", connect_latency = connect_latency) as server:
+        bare = bench_bare_post(server.url, calls)
+        bare_connections = server.connections
+        pooled = bench_model_client(server.url, calls)
+        pooled_connections = server.connections - bare_connections
+
+    print(f"calls: {calls}, simulated handshake: {connect_latency * 1000:.1f} ms")
+    print(f"requests.post: {bare * 1000:8.3f} ms/call over {bare_connections} connections")
+    print(f"ModelClient:   {pooled * 1000:8.3f} ms/call over {pooled_connections} connections")
+    print(f"speedup:       {bare / pooled:8.2f}x")
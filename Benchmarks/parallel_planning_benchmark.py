@@ -0,0 +1,42 @@
+"""
+Benchmark comparing windows planned one after another with windows planned concurrently, on a local stub server.
+
+Run with: python Benchmarks/parallel_planning_benchmark.py [parts] [latency_ms]
+"""
+
+
+
+import sys, os
+import datetime
+import time
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "Tests")))
+
+from planner.deepseek_processor import _clients, ModelClient
+from planner.prompt_builder import chunk_tasks
+from planner.scheduler import plan_tasks, plan_tasks_parallel
+from scheduler_benchmark import make_input_tasks
+from stub_server import StubServer
+
+
+if __name__ == "__main__":
+    parts = int(sys.argv[1]) if len(sys.argv) > 1 else 2000
+    latency = (float(sys.argv[2]) if len(sys.argv) > 2 else 200) / 1000
+    today = datetime.date(2025, 1, 1)
+    input_tasks = make_input_tasks(parts, today)
+    windows = len(chunk_tasks(input_tasks, today))
+
+    with StubServer(content = "TASK Task 0 DATE 01 01 2025 DESC NONE PARTS 1 1", latency = latency) as server:
+        _clients["BENCH"] = ModelClient("BENCH", api_url = server.url)
+        print(f"{len(input_tasks)} tasks in {windows} windows, {latency * 1000:.0f} ms per model call")
+
+        start = time.perf_counter()
+        plan_tasks("BENCH", input_tasks, today)
+        print(f"sequential:   {time.perf_counter() - start:6.2f} s")
+
+        for workers in (2, 4, 8):
+            start = time.perf_counter()
+            plan_tasks_parallel("BENCH", input_tasks, today, workers = workers)
+            print(f"{workers} workers:    {time.perf_counter() - start:6.2f} s")
+        _clients.pop("BENCH").close()
@@ -0,0 +1,36 @@
+"""
+Benchmark of the prompt size sent to the model, comparing the full prompt with the compact one.
+
+Run with: python Benchmarks/prompt_size_benchmark.py [max tokens]
+"""
+
+
+
+import sys, os
+import datetime
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from planner.deepseek_processor import SYSTEM_PROMPT
+from planner.prompt_builder import COMPACT_SYSTEM_PROMPT, chunk_tasks, encode_tasks, estimate_tokens
+from planner.task_interpreter import input_tasks_to_lines
+from scheduler_benchmark import make_input_tasks
+
+
+if __name__ == "__main__":
+    max_tokens = int(sys.argv[1]) if len(sys.argv) > 1 else 8000
+    today = datetime.date(2025, 1, 1)
+    full_system = estimate_tokens(SYSTEM_PROMPT)
+    compact_system = estimate_tokens(COMPACT_SYSTEM_PROMPT)
+    print(f"system prompt: {full_system} tokens full, {compact_system} tokens compact")
+
+    for parts in (5, 50, 500, 5000):
+        input_tasks = make_input_tasks(parts, today)
+        full_query = input_tasks_to_lines(input_tasks)
+        compact_query = encode_tasks(input_tasks, today)
+        full = full_system + estimate_tokens(full_query)
+        compact = compact_system + estimate_tokens(compact_query)
+        chunks = chunk_tasks(input_tasks, today, max_tokens)
+        print(f"{len(input_tasks):5d} tasks: {full:6d} -> {compact:6d} tokens ({full / compact:.1f}x smaller), "
+              f"{len(SYSTEM_PROMPT) + len(full_query):6d} -> {len(COMPACT_SYSTEM_PROMPT) + len(compact_query):6d} chars, "
+              f"{len(chunks)} request(s) within {max_tokens} tokens including the reply")
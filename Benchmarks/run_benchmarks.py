@@ -0,0 +1,204 @@
+"""
+Benchmark suite for the planner package that saves its results as JSON, to compare performance between commits.
+
+Run with: python Benchmarks/run_benchmarks.py [--quick] [--latency ms] [--output file.json] [--compare base.json]
+
+Each benchmark runs on synthetic inputs from 10 to 100k tasks. Times are the minimum and median of several repeats,
+so that a busy machine shows up as noise in the median rather than in the minimum. With --compare, every result is
+compared with the same benchmark in an earlier results file, and the suite exits with status 1 if any got slower by
+more than the threshold.
+"""
+
+
+
+import sys, os
+import argparse
+import datetime
+import json
+import platform
+import statistics
+import subprocess
+import time
+import timeit
+import tracemalloc
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "Tests")))
+
+from planner.deepseek_processor import _clients, ModelClient, ask_model
+from planner.task import InputTask, OutputTask
+from planner.task_interpreter import (input_tasks_to_lines, line_to_output_task, lines_to_output_tasks,
+                                      params_to_input_task, rows_to_input_tasks)
+from stub_server import StubServer
+from task_interpreter_benchmark import make_response
+
+SIZES = (10, 100, 1000, 10000, 100000)
+QUICK_SIZES = (10, 100, 1000, 10000)
+
+
+def make_params(tasks: int) -> list[tuple[str, ...]]:
+    """
+    Return the form parameters of the given number of InputTasks, as strings the way the Planner receives them.
+    """
+    return [(f"Task {i}", f"{1 + i % 28:02d}", f"{1 + i % 12:02d}", "2025", "NONE" if i % 3 else f"Description {i}",
+             str(1 + i % 9)) for i in range(tasks)]
+
+
+def time_call(func, repeat: int) -> tuple[float, float]:
+    """
+    Return the minimum and median seconds per call of func over repeat runs.
+    """
+    timer = timeit.Timer(func)
+    number, _ = timer.autorange()
+    runs = [elapsed / number for elapsed in timer.repeat(repeat, number)]
+    return min(runs), statistics.median(runs)
+
+
+def measure_memory(func) -> int:
+    """
+    Return the bytes still allocated by the result of func.
+    """
+    tracemalloc.start()
+    before = tracemalloc.take_snapshot()
+    result = func()
+    after = tracemalloc.take_snapshot()
+    tracemalloc.stop()
+    del result
+    return sum(stat.size_diff for stat in after.compare_to(before, "filename"))
+
+
+def bench_interpreter(sizes: tuple[int, ...], repeat: int) -> list[dict]:
+    """
+    Return the timings of the task_interpreter functions for every size.
+    """
+    results = []
+    for size in sizes:
+        params = make_params(size)
+        rows = [(name, f"{year}-{month}-{day}", desc, parts) for name, day, month, year, desc, parts in params]
+        input_tasks = [params_to_input_task(*row) for row in params]
+        response = make_response(size)
+        lines = [str(task).replace(" DUE ", " DATE ") for task in lines_to_output_tasks(response)]
+
+        cases = {
+            "params_to_input_task": lambda: [params_to_input_task(*row) for row in params],
+            "rows_to_input_tasks": lambda: rows_to_input_tasks(rows),
+            "input_tasks_to_lines": lambda: input_tasks_to_lines(input_tasks),
+            "line_to_output_task": lambda: [line_to_output_task(line) for line in lines],
+            "lines_to_output_tasks": lambda: lines_to_output_tasks(response),
+        }
+        for name, func in cases.items():
+            best, median = time_call(func, repeat)
+            results.append({"name": name, "size": size, "min": best, "median": median, "per_task": best / size})
+            print(f"{name:24s} {size:7d} tasks: {best * 1000:10.3f} ms ({best / size * 1e6:7.2f} us/task)")
+    return results
+
+
+def bench_tasks(sizes: tuple[int, ...], repeat: int) -> list[dict]:
+    """
+    Return the construction time and memory of InputTasks and OutputTasks for every size.
+    """
+    results = []
+    for size in sizes:
+        cases = {
+            "InputTask": lambda: [InputTask(f"Task {i % 100}", 1 + i % 28, 1 + i % 12, 2025, "NONE", 1 + i % 9)
+                                  for i in range(size)],
+            "OutputTask": lambda: [OutputTask(f"Task {i % 100}", 1 + i % 28, 1 + i % 12, 2025, "NONE", 1, 1 + i % 9)
+                                   for i in range(size)],
+        }
+        for name, func in cases.items():
+            best, median = time_call(func, repeat)
+            memory = measure_memory(func)
+            results.append({"name": name, "size": size, "min": best, "median": median, "per_task": best / size,
+                            "bytes": memory, "bytes_per_task": memory / size})
+            print(f"{name:24s} {size:7d} tasks: {best * 1000:10.3f} ms ({best / size * 1e6:7.2f} us/task), "
+                  f"{memory / size:7.1f} bytes/task")
+    return results
+
+
+def bench_ask_model(latency: float, calls: int) -> list[dict]:
+    """
+    Return the latency of ask_model end to end against a local stub server that waits latency seconds per call.
+    """
+    results = []
+    response = make_response(100)
+    query = input_tasks_to_lines([params_to_input_task(*row) for row in make_params(100)])
+    with StubServer(content = response, latency = latency) as server:
+        _clients["BENCH"] = ModelClient("BENCH", api_url = server.url)
+        try:
+            ask_model("BENCH", query)
+            times = []
+            for _ in range(calls):
+                start = time.perf_counter()
+                ask_model("BENCH", query)
+                times.append(time.perf_counter() - start)
+        finally:
+            _clients.pop("BENCH").close()
+
+    times.sort()
+    overhead = [elapsed - latency for elapsed in times]
+    results.append({"name": "ask_model", "size": 100, "latency": latency, "min": times[0],
+                    "median": statistics.median(times), "p95": times[min(int(calls * 0.95), calls - 1)],
+                    "overhead_median": statistics.median(overhead)})
+    print(f"{'ask_model':24s} {100:7d} tasks: {statistics.median(times) * 1000:10.3f} ms median "
+          f"({statistics.median(overhead) * 1000:.3f} ms over the {latency * 1000:.0f} ms stub latency)")
+    return results
+
+
+def git_commit() -> str | None:
+    try:
+        return subprocess.run(["git", "rev-parse", "HEAD"], capture_output = True, text = True, check = True,
+                              cwd = os.path.dirname(os.path.abspath(__file__))).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def compare(results: list[dict], base_path: str, threshold: float) -> bool:
+    """
+    Given results and an earlier results file, print how each benchmark changed and return whether any regressed.
+    """
+    with open(base_path) as file:
+        base = {(result["name"], result["size"]): result for result in json.load(file)["results"]}
+
+    regressed = False
+    print(f"\ncompared with {base_path}:")
+    for result in results:
+        old = base.get((result["name"], result["size"]))
+        if old is None:
+            continue
+        ratio = result["min"] / old["min"]
+        flag = ""
+        if ratio > threshold:
+            flag = "  SLOWER"
+            regressed = True
+        print(f"{result['name']:24s} {result['size']:7d} tasks: {ratio:6.2f}x{flag}")
+    return regressed
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description = "Run the planner benchmark suite.")
+    parser.add_argument("--quick", action = "store_true", help = "skip the 100k task sizes")
+    parser.add_argument("--repeat", type = int, default = 5, help = "runs per benchmark")
+    parser.add_argument("--latency", type = float, default = 50, help = "stub server latency in ms")
+    parser.add_argument("--calls", type = int, default = 20, help = "ask_model calls to time")
+    parser.add_argument("--output", help = "results file, by default Benchmarks/results/<commit>.json")
+    parser.add_argument("--compare", help = "earlier results file to compare with")
+    parser.add_argument("--threshold", type = float, default = 1.2, help = "slowdown ratio counted as a regression")
+    args = parser.parse_args()
+
+    sizes = QUICK_SIZES if args.quick else SIZES
+    results = bench_interpreter(sizes, args.repeat)
+    results += bench_tasks(sizes, args.repeat)
+    results += bench_ask_model(args.latency / 1000, args.calls)
+
+    commit = git_commit()
+    output = args.output or os.path.join(os.path.dirname(os.path.abspath(__file__)), "results",
+                                         f"{(commit or 'unknown')[:12]}.json")
+    os.makedirs(os.path.dirname(os.path.abspath(output)), exist_ok = True)
+    with open(output, "w") as file:
+        json.dump({"commit": commit, "python": platform.python_version(), "platform": platform.platform(),
+                   "timestamp": datetime.datetime.now().isoformat(timespec = "seconds"), "results": results},
+                  file, indent = 2)
+    print(f"\nsaved to {output}")
+
+    if args.compare and compare(results, args.compare, args.threshold):
+        sys.exit(1)
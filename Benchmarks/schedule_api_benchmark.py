@@ -0,0 +1,69 @@
+"""
+Benchmark of the schedule API, comparing the bytes and time of one visible week against the whole schedule, with and
+without compression and with a conditional GET.
+
+Run with: python Benchmarks/schedule_api_benchmark.py [parts]
+"""
+
+
+
+import sys, os
+import datetime
+import tempfile
+import time
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from planner.task import OutputTask
+
+
+def make_schedule(parts: int) -> list[OutputTask]:
+    """
+    Return a schedule of the given number of OutputTask parts, spread over a year from today.
+    """
+    start = datetime.date.today().toordinal()
+    return [OutputTask.from_ordinal(f"Task {i // 5}", start + i % 365, "NONE", 1 + i % 5, 5) for i in range(parts)]
+
+
+def measure(client, url: str, headers: dict, repeat: int = 20) -> tuple[float, int, int]:
+    """
+    Return the milliseconds a GET of url takes on average, and the status and size of its response.
+    """
+    start = time.perf_counter()
+    for _ in range(repeat):
+        response = client.get(url, headers = headers)
+    return (time.perf_counter() - start) * 1000 / repeat, response.status_code, len(response.data)
+
+
+def main() -> None:
+    parts = int(sys.argv[1]) if len(sys.argv) > 1 else 5000
+    with tempfile.TemporaryDirectory() as directory:
+        os.environ["PLANNER_DB"] = os.path.join(directory, "planner.db")
+        import app as planner_app
+
+        client = planner_app.app.test_client()
+        client.get("/api/schedule")
+        with client.session_transaction() as session:
+            user = session["user"]
+        planner_app.taskStore.replace_schedule(user, make_schedule(parts))
+
+        today = datetime.date.today()
+        week = f"start={today}&end={today + datetime.timedelta(days = 7)}"
+        etag = client.get(f"/api/schedule?{week}", headers = {"Accept-Encoding": "gzip"}).headers["ETag"]
+        cases = [("whole schedule", "/api/schedule?limit=1000", {}),
+                 ("whole schedule, gzip", "/api/schedule?limit=1000", {"Accept-Encoding": "gzip"}),
+                 ("visible week", f"/api/schedule?{week}", {}),
+                 ("visible week, gzip", f"/api/schedule?{week}", {"Accept-Encoding": "gzip"}),
+                 ("visible week, unchanged", f"/api/schedule?{week}",
+                  {"Accept-Encoding": "gzip", "If-None-Match": etag})]
+
+        print(f"{parts} parts in the schedule (the whole schedule is read in pages of 1000)")
+        for name, url, headers in cases:
+            pages = -(-parts // 1000) if "limit=1000" in url else 1
+            elapsed, status, size = measure(client, url, headers)
+            print(f"{name:>26}: {elapsed * pages:8.2f} ms, {size * pages:9d} bytes, status {status}")
+        planner_app.taskStore.close()
+
+
+if __name__ == "__main__":
+    main()
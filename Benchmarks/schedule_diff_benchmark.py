@@ -0,0 +1,67 @@
+"""
+Benchmark of diffing schedules, comparing the time and size of a diff with sending the whole changed schedule.
+
+Run with: python Benchmarks/schedule_diff_benchmark.py [parts] [changes]
+"""
+
+
+
+import sys, os
+import datetime
+import json
+import time
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from planner.schedule_diff import diff_schedules
+from planner.task import OutputTask
+from planner.task_interpreter import task_to_dict
+
+
+def make_schedule(parts: int) -> list[OutputTask]:
+    """
+    Return a schedule of the given number of OutputTask parts, spread over a year.
+    """
+    start = datetime.date(2025, 1, 1).toordinal()
+    return [OutputTask.from_ordinal(f"Task {i // 5}", start + i % 365, "NONE", 1 + i % 5, 5) for i in range(parts)]
+
+
+def change_schedule(schedule: list[OutputTask], changes: int) -> list[OutputTask]:
+    """
+    Return the schedule with changes parts moved a day later, a third of them removed and as many added.
+    """
+    step = max(len(schedule) // changes, 1)
+    changed = list(schedule)
+    for i in range(0, len(schedule), step):
+        task = changed[i]
+        changed[i] = OutputTask.from_ordinal(task.name, task.ordinal + 1, task.desc, task.part_num, task.total_parts)
+    removed = changes // 3
+    del changed[:removed * step:step]
+    changed.extend(OutputTask.from_ordinal(f"New {i}", schedule[0].ordinal, "NONE", 1, 1) for i in range(removed))
+    return changed
+
+
+def main() -> None:
+    parts = int(sys.argv[1]) if len(sys.argv) > 1 else 5000
+    changes = int(sys.argv[2]) if len(sys.argv) > 2 else 30
+    old = make_schedule(parts)
+    new = change_schedule(old, changes)
+
+    repeat = 20
+    start = time.perf_counter()
+    for _ in range(repeat):
+        diff = diff_schedules(old, new)
+    diff_ms = (time.perf_counter() - start) * 1000 / repeat
+    start = time.perf_counter()
+    for _ in range(repeat):
+        body = json.dumps([task_to_dict(task) for task in new])
+    full_ms = (time.perf_counter() - start) * 1000 / repeat
+    diff_body = json.dumps(diff.to_dict())
+
+    print(f"{parts} parts, {len(diff.added)} added, {len(diff.moved)} moved, {len(diff.removed)} removed")
+    print(f"{'whole schedule':>15}: {full_ms:7.2f} ms to encode, {len(body):8d} bytes")
+    print(f"{'diff':>15}: {diff_ms:7.2f} ms to compute, {len(diff_body):8d} bytes")
+
+
+if __name__ == "__main__":
+    main()
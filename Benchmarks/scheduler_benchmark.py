@@ -0,0 +1,45 @@
+"""
+Benchmark for the local scheduler on large synthetic backlogs.
+
+Run with: python Benchmarks/scheduler_benchmark.py [parts]
+"""
+
+
+
+import sys, os
+import datetime
+import random
+import time
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from planner.scheduler import schedule_tasks
+from planner.task import InputTask
+
+
+def make_input_tasks(parts: int, today: datetime.date, seed: int = 0) -> list[InputTask]:
+    """
+    Return InputTasks due within the next year whose parts add up to the given number.
+    """
+    rng = random.Random(seed)
+    input_tasks = []
+    remaining = parts
+    while remaining > 0:
+        task_parts = min(rng.randint(1, 9), remaining)
+        remaining -= task_parts
+        due = today + datetime.timedelta(days = rng.randint(-5, 365))
+        input_tasks.append(InputTask(f"Task {len(input_tasks)}", due.day, due.month, due.year, "NONE", task_parts))
+    return input_tasks
+
+
+if __name__ == "__main__":
+    parts = int(sys.argv[1]) if len(sys.argv) > 1 else 100000
+    today = datetime.date(2025, 1, 1)
+
+    for size in (parts // 100, parts // 10, parts):
+        input_tasks = make_input_tasks(size, today)
+        start = time.perf_counter()
+        schedule = schedule_tasks(input_tasks, today)
+        elapsed = time.perf_counter() - start
+        print(f"{len(input_tasks):7d} tasks, {len(schedule):7d} parts: {elapsed * 1000:8.1f} ms "
+              f"({elapsed / len(schedule) * 1e6:.2f} us/part)")
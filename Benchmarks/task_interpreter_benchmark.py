@@ -0,0 +1,111 @@
+"""
+Benchmark comparing the single-pass OutputTask scanner against the previous split-and-rebuild parser.
+
+Run with: python Benchmarks/task_interpreter_benchmark.py [tasks]
+"""
+
+
+
+import sys, os
+import random
+import time
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from planner.task_interpreter import lines_to_output_tasks, params_to_output_task
+
+
+def make_response(tasks: int, seed: int = 0) -> str:
+    """
+    Return a synthetic AI response with the given number of OutputTask parts.
+    """
+    rng = random.Random(seed)
+    words = ["Math", "Homework", "Reading", "Study", "for", "the", "History", "Quiz", "Project", "Report"]
+    parts = []
+    for i in range(tasks):
+        name = ' '.join(rng.choices(words, k = rng.randint(1, 4)))
+        desc = ' '.join(rng.choices(words, k = rng.randint(0, 12))) or "NONE"
+        total = rng.randint(1, 9)
+        parts.append(f"TASK {name} DATE {rng.randint(1, 28):02d} {rng.randint(1, 12):02d} 2025 DESC {desc} "
+                     f"PARTS {rng.randint(1, total)} {total}")
+    return ' '.join(parts)
+
+
+def legacy_line_to_output_task(line: str):
+    """
+    The word-by-word line parser that lines_to_output_tasks used before the single-pass scanner.
+    """
+    line_list = line.split()
+    active_state = "NONE"
+    data = {"NAME": "", "DAY": "", "MONTH": "", "YEAR": "", "DESC": "", "PART_NUM": "", "TOTAL_PARTS": ""}
+
+    if "TASK" not in line_list or "DATE" not in line_list or "DESC" not in line_list or "PARTS" not in line_list:
+        raise ValueError("All required parameters not given to create an OutputTask.")
+
+    for word in line_list:
+        if word == "TASK" or word == "DATE" or word == "DESC" or word == "PARTS":
+            active_state = word
+        elif active_state == "TASK":
+            data["NAME"] = word if data["NAME"] == "" else data["NAME"] + ' ' + word
+        elif active_state == "DATE":
+            if data["DAY"] == "":
+                data["DAY"] = word
+            elif data["MONTH"] == "":
+                data["MONTH"] = word
+            else:
+                data["YEAR"] = word
+        elif active_state == "DESC":
+            data["DESC"] = word if data["DESC"] == "" else data["DESC"] + ' ' + word
+        elif active_state == "PARTS":
+            if data["PART_NUM"] == "":
+                data["PART_NUM"] = word
+            else:
+                data["TOTAL_PARTS"] = word
+
+    return params_to_output_task(data["NAME"], data["DAY"], data["MONTH"], data["YEAR"], data["DESC"],
+                                 data["PART_NUM"], data["TOTAL_PARTS"])
+
+
+def legacy_lines_to_output_tasks(lines: str) -> list:
+    """
+    The previous lines_to_output_tasks, which rebuilt every task string before parsing it again.
+    """
+    line = ""
+    output_tasks = []
+    for word in lines.split():
+        if word == "TASK":
+            if line != "":
+                output_tasks.append(legacy_line_to_output_task(line))
+            line = "TASK"
+        else:
+            line += ' ' + word
+    if line != "":
+        output_tasks.append(legacy_line_to_output_task(line))
+    return output_tasks
+
+
+def best_of(func, arg, repeat: int = 5) -> float:
+    """
+    Return the fastest of several timed runs of func(arg) in seconds.
+    """
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func(arg)
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+if __name__ == "__main__":
+    tasks = int(sys.argv[1]) if len(sys.argv) > 1 else 10000
+    response = make_response(tasks)
+
+    assert [str(task) for task in legacy_lines_to_output_tasks(response)] == \
+        [str(task) for task in lines_to_output_tasks(response)]
+
+    legacy = best_of(legacy_lines_to_output_tasks, response)
+    scanner = best_of(lines_to_output_tasks, response)
+    print(f"tasks: {tasks}, response: {len(response) / 1024:.0f} KiB")
+    print(f"split and rebuild: {legacy * 1000:8.1f} ms")
+    print(f"single pass:       {scanner * 1000:8.1f} ms")
+    print(f"speedup:           {legacy / scanner:8.2f}x")
@@ -0,0 +1,66 @@
+"""
+Benchmark measuring the memory held by parsed OutputTasks with tracemalloc, against the previous dict-based classes.
+
+Run with: python Benchmarks/task_memory_benchmark.py [tasks]
+"""
+
+
+
+import sys, os
+import tracemalloc
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from planner.task_interpreter import lines_to_output_tasks
+from task_interpreter_benchmark import make_response
+
+
+class LegacyOutputTask:
+    """
+    The previous OutputTask layout: an instance dictionary with separate day, month, and year.
+    """
+
+    def __init__(self, name, day, month, year, desc, part_num, total_parts):
+        self._name = name
+        self._day = day
+        self._month = month
+        self._year = year
+        self._desc = desc
+        self._part_num = part_num
+        self._total_parts = total_parts
+
+
+def legacy_output_tasks(response: str) -> list:
+    """
+    Parse a response into LegacyOutputTasks, copying names and descriptions out of the response per part.
+    """
+    legacy = []
+    for task in lines_to_output_tasks(response):
+        # rebuild the strings so that nothing is shared, as the old word-joining parser did
+        legacy.append(LegacyOutputTask(''.join(list(task.name)), task.day, task.month, task.year,
+                                       ''.join(list(task.desc)), task.part_num, task.total_parts))
+    return legacy
+
+
+def measure(func, arg) -> tuple[int, list]:
+    """
+    Return the bytes still allocated after calling func(arg), along with its result so it stays alive.
+    """
+    tracemalloc.start()
+    before = tracemalloc.take_snapshot()
+    result = func(arg)
+    after = tracemalloc.take_snapshot()
+    tracemalloc.stop()
+    return sum(stat.size_diff for stat in after.compare_to(before, "filename")), result
+
+
+if __name__ == "__main__":
+    tasks = int(sys.argv[1]) if len(sys.argv) > 1 else 10000
+    response = make_response(tasks)
+
+    legacy_bytes, legacy = measure(legacy_output_tasks, response)
+    slotted_bytes, slotted = measure(lines_to_output_tasks, response)
+    print(f"tasks: {tasks}")
+    print(f"dict-based: {legacy_bytes / 1024:9.1f} KiB ({legacy_bytes / tasks:6.1f} bytes/task)")
+    print(f"slotted:    {slotted_bytes / 1024:9.1f} KiB ({slotted_bytes / tasks:6.1f} bytes/task)")
+    print(f"saving:     {1 - slotted_bytes / legacy_bytes:9.1%}")
@@ -0,0 +1,228 @@
+import unittest
+
+# to allow easy test running in VSCode
+import sys, os
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+import datetime
+import gzip
+import json
+import logging
+import tempfile
+import threading
+import time
+
+# the app opens its database when it is imported, so it is given a temporary one first
+tmp = tempfile.TemporaryDirectory()
+os.environ["PLANNER_DB"] = os.path.join(tmp.name, "planner.db")
+
+import app
+from planner.task import OutputTask
+
+def tearDownModule():
+    app.jobQueue.shutdown()
+    app.taskStore.close()
+    tmp.cleanup()
+
+class AppTests(unittest.TestCase):
+    """
+    Test cases for the routes of the app module.
+    """
+
+    def setUp(self):
+        """
+        Create a test client with its own user, and dates from today for its tasks.
+        """
+        app.logger.setLevel(logging.WARNING)
+        self.client = app.app.test_client()
+        self.user = f"test-{self.id()}"
+        with self.client.session_transaction() as session:
+            session["user"] = self.user
+        self.today = datetime.date.today()
+
+    def tearDown(self):
+        app.taskStore.delete_user(self.user)
+
+    def due(self, days: int) -> str:
+        return (self.today + datetime.timedelta(days = days)).isoformat()
+
+    def test_add_tasks(self):
+        """
+        Testing if one task or a list of tasks posted as JSON is added and scheduled, and bad bodies are rejected.
+        """
+        response = self.client.post("/api/tasks", json = {"name": "Essay", "date": self.due(10), "parts": 2})
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(response.get_json()["name"], "Essay")
+        self.assertEqual(response.get_json()["desc"], "NONE")
+
+        response = self.client.post("/api/tasks", json = [{"name": "Quiz", "date": self.due(3)},
+                                                         {"name": "Reading", "date": self.due(5), "desc": "Chapter 1"}])
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual([task["parts"] for task in response.get_json()], [1, 1])
+        self.assertEqual(len(app.taskStore.get_input_tasks(self.user)), 3)
+        self.assertEqual(len(app.taskStore.get_schedule(self.user)), 4)
+
+        # the same task added again is scheduled again
+        self.client.post("/api/tasks", json = {"name": "Essay", "date": self.due(10), "parts": 2})
+        essay = [task for task in app.taskStore.get_schedule(self.user) if task.name == "Essay"]
+        self.assertEqual(sorted(task.part_num for task in essay), [1, 1, 2, 2])
+
+        response = self.client.post("/api/tasks", json = [{"name": "Quiz", "date": self.due(3)}, {"date": "soon"}])
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual([error["index"] for error in response.get_json()["errors"]], [1])
+        for body in ([], "Essay", [1]):
+            self.assertEqual(self.client.post("/api/tasks", json = body).status_code, 400)
+        self.assertEqual(self.client.post("/api/tasks", data = "not json").status_code, 400)
+        self.assertEqual(len(app.taskStore.get_input_tasks(self.user)), 4)
+
+    def test_schedule_pages(self):
+        """
+        Testing if the schedule is returned one page at a time within a date range.
+        """
+        self.client.post("/api/tasks", json = {"name": "Project", "date": self.due(10), "parts": 5})
+        pages = []
+        offset = 0
+        while offset is not None:
+            page = self.client.get(f"/api/schedule?limit=2&offset={offset}").get_json()
+            pages.append([task["part_num"] for task in page["tasks"]])
+            offset = page["next_offset"]
+        self.assertEqual(pages, [[1, 2], [3, 4], [5]])
+
+        schedule = app.taskStore.get_schedule(self.user)
+        start = schedule[1].date
+        page = self.client.get(f"/api/schedule?start={start.isoformat()}&end={schedule[3].date.isoformat()}").get_json()
+        self.assertEqual(page["start"], start.isoformat())
+        self.assertEqual([task["part_num"] for task in page["tasks"]], [2, 3])
+        self.assertEqual(len({task["id"] for task in page["tasks"]}), 2)
+
+        for query in ("start=tomorrow", "limit=0", f"limit={app.maxPageSize + 1}", "offset=-1"):
+            self.assertEqual(self.client.get(f"/api/schedule?{query}").status_code, 400)
+
+    def test_schedule_part_ids(self):
+        """
+        Testing if a part has the same id on every page of the schedule, even when the same task is added twice.
+        """
+        for _ in range(2):
+            self.client.post("/api/tasks", json = {"name": "Essay", "date": self.due(10)})
+        ids = [task["id"] for task in self.client.get("/api/schedule").get_json()["tasks"]]
+        self.assertEqual(len(set(ids)), 2)
+        self.assertEqual([task["id"] for task in self.client.get("/api/schedule?offset=1&limit=1").get_json()["tasks"]],
+                         ids[1:])
+
+        # the second copy is placed on the next day, so the copy before it is left out of the range
+        second = app.taskStore.get_schedule(self.user)[1].date
+        page = self.client.get(f"/api/schedule?start={second.isoformat()}").get_json()
+        self.assertEqual([task["id"] for task in page["tasks"]], ids[1:])
+
+    def test_schedule_caching(self):
+        """
+        Testing if an unchanged schedule is answered with 304 by its ETag, and large pages are compressed.
+        """
+        response = self.client.get("/api/schedule")
+        etag = response.headers["ETag"]
+        self.assertTrue(etag.startswith("W/"))
+        self.assertEqual(response.headers["Cache-Control"], "no-cache")
+        self.assertIn("Accept-Encoding", response.headers["Vary"])
+        self.assertNotIn("Content-Encoding", response.headers)
+
+        response = self.client.get("/api/schedule", headers = {"If-None-Match": etag})
+        self.assertEqual(response.status_code, 304)
+        self.assertEqual(response.data, b"")
+
+        self.client.post("/api/tasks", json = {"name": "Project", "date": self.due(30), "parts": 20})
+        response = self.client.get("/api/schedule", headers = {"If-None-Match": etag, "Accept-Encoding": "gzip"})
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response.headers["ETag"], etag)
+        self.assertEqual(response.headers["Content-Encoding"], "gzip")
+        self.assertEqual(len(json.loads(gzip.decompress(response.data))["tasks"]), 20)
+
+        # the tag names the JSON, so a compressed and a plain body of it match each other
+        response = self.client.get("/api/schedule", headers = {"If-None-Match": response.headers["ETag"]})
+        self.assertEqual(response.status_code, 304)
+
+    def test_schedule_loads(self):
+        """
+        Testing if the number of parts on each day and the days over a limit are returned.
+        """
+        self.client.post("/api/tasks", json = [{"name": "Project", "date": self.due(3), "parts": 4},
+                                               {"name": "Quiz", "date": self.due(2), "parts": 2}])
+        loads = self.client.get("/api/schedule/loads").get_json()["loads"]
+        self.assertEqual(sum(loads.values()), 6)
+        self.assertEqual(list(loads), sorted(loads))
+
+        result = self.client.get(f"/api/schedule/loads?start={self.due(1)}&over=1").get_json()
+        self.assertEqual(result["loads"], {day: load for day, load in loads.items() if day >= self.due(1)})
+        self.assertEqual(result["busy"], [day for day, load in result["loads"].items() if load > 1])
+        self.assertEqual(self.client.get("/api/schedule/loads?end=never").status_code, 400)
+
+    def test_export(self):
+        """
+        Testing if the schedule is exported as a file, compressed if asked, and answered with 304 while unchanged.
+        """
+        self.client.post("/api/tasks", json = {"name": "Essay", "date": self.due(10), "parts": 2})
+        response = self.client.get("/export/schedule.csv")
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.mimetype, "text/csv")
+        self.assertEqual(len(response.data.decode().splitlines()), 3)
+        etag = response.headers["ETag"]
+        self.assertEqual(self.client.get("/export/schedule.csv", headers = {"If-None-Match": etag}).status_code, 304)
+
+        response = self.client.get("/export/schedule.ics", headers = {"Accept-Encoding": "gzip"})
+        self.assertEqual(response.headers["Content-Encoding"], "gzip")
+        self.assertTrue(response.headers["ETag"].endswith('-gzip"'))
+        self.assertIn("BEGIN:VCALENDAR", gzip.decompress(response.data).decode())
+        self.assertEqual(self.client.get("/export/schedule.pdf").status_code, 404)
+
+        self.client.post("/api/tasks", json = {"name": "Quiz", "date": self.due(3)})
+        self.assertEqual(self.client.get("/export/schedule.csv", headers = {"If-None-Match": etag}).status_code, 200)
+
+        feeds = self.client.get("/export/feed").get_json()
+        response = app.app.test_client().get(feeds["csv"])
+        self.assertEqual(len(response.data.decode().splitlines()), 4)
+        self.assertEqual(app.app.test_client().get("/export/feed/unknown.csv").status_code, 404)
+
+    def test_metrics(self):
+        """
+        Testing if the metrics are returned in the Prometheus text format, including the stages of earlier requests.
+        """
+        self.client.post("/api/tasks", json = {"name": "Essay", "date": self.due(10)})
+        response = self.client.get("/metrics")
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.mimetype, "text/plain")
+        self.assertIn('planner_stage_seconds_count{stage="storage"}', response.data.decode())
+
+    def test_schedule_stream(self):
+        """
+        Testing if the schedule stream sends the version it started from, and then the parts that changed as soon as they
+        are written.
+        """
+        # the poll is long enough that only the store waking the stream delivers the change in time
+        poll, lifetime = app.streamPollInterval, app.streamLifetime
+        app.streamPollInterval, app.streamLifetime = 30, 60
+        try:
+            self.client.post("/api/tasks", json = {"name": "Essay", "date": self.due(10), "parts": 2})
+            response = self.client.get("/api/schedule/stream", buffered = False)
+            self.assertEqual(response.mimetype, "text/event-stream")
+            events = iter(response.response)
+            self.assertIn(b": version 1", next(events))
+
+            added = OutputTask.from_ordinal("Quiz", self.today.toordinal(), "NONE", 1, 1)
+            writer = threading.Timer(0.1, app.taskStore.add_output_tasks, (self.user, [added]))
+            start = time.monotonic()
+            writer.start()
+            event = next(events).decode()
+            self.assertLess(time.monotonic() - start, 5)
+            writer.join()
+            response.close()
+        finally:
+            app.streamPollInterval, app.streamLifetime = poll, lifetime
+
+        self.assertTrue(event.startswith("id: 2\nevent: diff\n"))
+        diff = json.loads(event.split("data: ", 1)[1])
+        self.assertEqual([part["name"] for part in diff["added"]], ["Quiz"])
+        self.assertEqual((diff["moved"], diff["removed"]), ([], []))
+        ids = {task["id"] for task in self.client.get("/api/schedule").get_json()["tasks"]}
+        self.assertIn(diff["added"][0]["id"], ids)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,99 @@
+import unittest
+
+# to allow easy test running in VSCode
+import sys, os
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+sys.path.append(os.path.abspath(os.path.dirname(__file__)))
+
+import asyncio
+import time
+
+from planner.deepseek_processor import APIException
+from planner.async_processor import *
+from stub_server import AsyncStubServer
+
+class AsyncModelClientTests(unittest.IsolatedAsyncioTestCase):
+    """
+    Test cases for the async_processor module.
+    """
+
+    async def asyncSetUp(self):
+        """
+        Start a local asyncio stub of the chat completions endpoint with slow responses.
+        """
+        self.plan = "TASK Project 1 DUE 26 07 2025 DESC NONE PARTS 1 1"
+        self.server = await AsyncStubServer(content = self.plan, latency = 0.2).start()
+        self.client = AsyncModelClient("TEST KEY", api_url = self.server.url, max_concurrency = 4)
+
+    async def asyncTearDown(self):
+        await self.client.close()
+        await self.server.stop()
+
+    async def test_ask(self):
+        """
+        Testing if the model's reply is returned.
+        """
+        self.assertEqual(await self.client.ask("TASK A DUE 01 01 2000 DESC NONE PARTS 1"), self.plan)
+
+    async def test_concurrency(self):
+        """
+        Testing if many calls overlap but never exceed the concurrency limit.
+        """
+        start = time.perf_counter()
+        results = await asyncio.gather(*(self.client.ask("TASK A DUE 01 01 2000 DESC NONE PARTS 1") for _ in range(12)))
+        elapsed = time.perf_counter() - start
+        self.assertEqual(results, [self.plan] * 12)
+        self.assertEqual(self.server.max_active, 4)
+        # 12 calls in batches of 4 take about 3 round trips rather than 12
+        self.assertLess(elapsed, 12 * 0.2 / 2)
+
+    async def test_deadline(self):
+        """
+        Testing if a call that passes its deadline raises an APIException and frees its slot.
+        """
+        with self.assertRaises(APIException):
+            await self.client.ask("TASK A DUE 01 01 2000 DESC NONE PARTS 1", deadline = 0.05)
+        self.assertEqual(self.client.in_flight, 0)
+
+    async def test_cancellation(self):
+        """
+        Testing if cancelling a call aborts the request and frees its slot.
+        """
+        call = asyncio.create_task(self.client.ask("TASK A DUE 01 01 2000 DESC NONE PARTS 1"))
+        await asyncio.sleep(0.05)
+        call.cancel()
+        with self.assertRaises(asyncio.CancelledError):
+            await call
+        self.assertEqual(self.client.in_flight, 0)
+        await asyncio.sleep(0.05)
+        self.assertEqual(self.server.cancelled, 1)
+
+    async def test_error_status(self):
+        """
+        Testing if a non-200 status code raises an APIException.
+        """
+        self.server.status = 503
+        self.server.latency = 0
+        with self.assertRaises(APIException):
+            await self.client.ask("TASK A DUE 01 01 2000 DESC NONE PARTS 1")
+
+        self.server.status = 429
+        self.server.retry_after = 3
+        with self.assertRaises(APIException) as raised:
+            await self.client.ask("TASK A DUE 01 01 2000 DESC NONE PARTS 1")
+        self.assertEqual((raised.exception.status_code, raised.exception.retry_after), (429, 3.0))
+
+    async def test_error_reply_body(self):
+        """
+        Testing if a 200 reply without message content raises an APIException.
+        """
+        self.server.latency = 0
+        for body in (b'{"error": {"message": "overloaded"}}', b'not json', b'{"choices": []}', b'[]'):
+            self.server.raw_body = body
+            with self.assertRaises(APIException):
+                await self.client.ask("TASK A DUE 01 01 2000 DESC NONE PARTS 1")
+        self.assertEqual(self.client.in_flight, 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,168 @@
+import unittest
+
+# to allow easy test running in VSCode
+import sys, os
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+sys.path.append(os.path.abspath(os.path.dirname(__file__)))
+
+import datetime
+
+from planner.batch_dispatcher import *
+from planner.deepseek_processor import _clients, ModelClient
+from planner.scheduler import schedule_tasks
+from planner.task import InputTask
+from stub_server import StubServer
+
+class BatchDispatcherTests(unittest.TestCase):
+    """
+    Test cases for the batch_dispatcher module.
+    """
+
+    def setUp(self):
+        """
+        Start a local stub of the chat completions endpoint that answers a batch of three users.
+        """
+        self.today = datetime.date(2025, 7, 20)
+        self.input_tasks = [[InputTask("Essay", 25, 7, 2025, "NONE", 1)],
+                            [InputTask("Quiz", 22, 7, 2025, "NONE", 1)],
+                            [InputTask("Project", 30, 7, 2025, "NONE", 2)]]
+        self.reply = ("USER 1 TASK Essay DATE 20 07 2025 DESC NONE PARTS 1 1 USER 2 TASK Quiz DATE 21 07 2025 DESC NONE "
+                      "PARTS 1 1 USER 3 TASK Project DATE 20 07 2025 DESC NONE PARTS 1 2 TASK Project DATE 21 07 2025 "
+                      "DESC NONE PARTS 2 2")
+        self.server = StubServer(content = self.reply).start()
+        _clients["TEST KEY"] = ModelClient("TEST KEY", api_url = self.server.url)
+
+    def tearDown(self):
+        _clients.pop("TEST KEY").close()
+        self.server.stop()
+
+    def test_split_batch_reply(self):
+        """
+        Testing if a batch reply is split back into each user's part, leaving out users it has no part for.
+        """
+        query = build_batch_query(["Today 20 07 2025\n1;5;1;Essay;-", "Today 20 07 2025\n1;2;1;Quiz;-"])
+        self.assertEqual(query, "USER 1\nToday 20 07 2025\n1;5;1;Essay;-\nUSER 2\nToday 20 07 2025\n1;2;1;Quiz;-")
+        parts = split_batch_reply(self.reply, 4)
+        self.assertEqual(parts[0], "TASK Essay DATE 20 07 2025 DESC NONE PARTS 1 1")
+        self.assertTrue(parts[2].endswith("PARTS 2 2"))
+        self.assertIsNone(parts[3])
+
+    def test_batch(self):
+        """
+        Testing if requests arriving within the window are planned in one call, each caller getting its own schedule.
+        """
+        batcher = PlanningBatcher("TEST KEY", window = 0.2)
+        futures = [batcher.submit(input_tasks, self.today) for input_tasks in self.input_tasks]
+        schedules = [future.result(timeout = 5) for future in futures]
+        batcher.close()
+
+        self.assertEqual(self.server.requests, 1)
+        self.assertEqual(self.server.last_body["messages"][0]["content"], BATCH_SYSTEM_PROMPT)
+        self.assertEqual([[str(task) for task in schedule] for schedule in schedules],
+                         [["TASK Essay DUE 20 07 2025 DESC NONE PARTS 1 1"],
+                          ["TASK Quiz DUE 21 07 2025 DESC NONE PARTS 1 1"],
+                          ["TASK Project DUE 20 07 2025 DESC NONE PARTS 1 2",
+                           "TASK Project DUE 21 07 2025 DESC NONE PARTS 2 2"]])
+
+    def test_batch_compact_output(self):
+        """
+        Testing if a batch reply of task ids and days is expanded with each user's own InputTasks.
+        """
+        self.server.content = "USER 1\n1:0\nUSER 2\n1:1\nUSER 3\n1:0,1"
+        batcher = PlanningBatcher("TEST KEY", window = 0.2, compact_output = True)
+        futures = [batcher.submit(input_tasks, self.today) for input_tasks in self.input_tasks]
+        schedules = [future.result(timeout = 5) for future in futures]
+        batcher.close()
+
+        self.assertEqual(self.server.requests, 1)
+        self.assertEqual(self.server.last_body["messages"][0]["content"], COMPACT_BATCH_SYSTEM_PROMPT)
+        self.assertEqual([[str(task) for task in schedule] for schedule in schedules],
+                         [["TASK Essay DUE 20 07 2025 DESC NONE PARTS 1 1"],
+                          ["TASK Quiz DUE 21 07 2025 DESC NONE PARTS 1 1"],
+                          ["TASK Project DUE 20 07 2025 DESC NONE PARTS 1 2",
+                           "TASK Project DUE 21 07 2025 DESC NONE PARTS 2 2"]])
+
+    def test_batch_fallback(self):
+        """
+        Testing if a user the reply leaves out is scheduled locally, and batches are limited to max_batch requests.
+        """
+        missing = [InputTask("Reading", 23, 7, 2025, "NONE", 2)]
+        batcher = PlanningBatcher("TEST KEY", window = 0.2, max_batch = 4)
+        futures = [batcher.submit(input_tasks, self.today) for input_tasks in self.input_tasks + [missing] * 2]
+        schedules = [future.result(timeout = 5) for future in futures]
+        batcher.close()
+
+        self.assertEqual(self.server.requests, 2)
+        self.assertEqual(len(schedules[0]), 1)
+        self.assertEqual(schedules[3], schedule_tasks(missing, self.today))
+
+    def test_batch_unexpected_error(self):
+        """
+        Testing if an error other than an APIException during a batch call still schedules every user locally.
+        """
+        from planner import batch_dispatcher
+        def broken_split(reply, count):
+            raise KeyError("choices")
+        batch_dispatcher.split_batch_reply, original = broken_split, batch_dispatcher.split_batch_reply
+        try:
+            batcher = PlanningBatcher("TEST KEY", window = 0.2)
+            futures = [batcher.submit(input_tasks, self.today) for input_tasks in self.input_tasks]
+            schedules = [future.result(timeout = 5) for future in futures]
+            batcher.close()
+        finally:
+            batch_dispatcher.split_batch_reply = original
+        self.assertEqual(schedules, [schedule_tasks(input_tasks, self.today) for input_tasks in self.input_tasks])
+
+    def test_batch_part_error(self):
+        """
+        Testing if an unexpected error while reading one user's part schedules only that user locally.
+        """
+        from planner import batch_dispatcher
+        original = batch_dispatcher.parse_reply
+        def broken_parse(reply, input_tasks = None, today = None):
+            if input_tasks[0].name == "Quiz":
+                raise ValueError("day is out of range for month")
+            return original(reply, input_tasks, today)
+        batch_dispatcher.parse_reply = broken_parse
+        try:
+            batcher = PlanningBatcher("TEST KEY", window = 0.2)
+            futures = [batcher.submit(input_tasks, self.today) for input_tasks in self.input_tasks]
+            schedules = [future.result(timeout = 5) for future in futures]
+            batcher.close()
+        finally:
+            batch_dispatcher.parse_reply = original
+        self.assertEqual(self.server.requests, 1)
+        self.assertEqual(schedules[1], schedule_tasks(self.input_tasks[1], self.today))
+        self.assertEqual([str(task) for task in schedules[2]],
+                         ["TASK Project DUE 20 07 2025 DESC NONE PARTS 1 2",
+                          "TASK Project DUE 21 07 2025 DESC NONE PARTS 2 2"])
+
+    def test_get_planning_batcher(self):
+        """
+        Testing if the shared batcher of an API Key is reused, with a separate one for compact replies.
+        """
+        from planner.batch_dispatcher import _batchers
+        try:
+            batcher = get_planning_batcher("SHARED KEY")
+            compact = get_planning_batcher("SHARED KEY", compact_output = True)
+            self.assertIs(get_planning_batcher("SHARED KEY"), batcher)
+            self.assertIs(get_planning_batcher("SHARED KEY", compact_output = True), compact)
+            self.assertIsNot(batcher, compact)
+        finally:
+            for key in [key for key in _batchers if key[0] == "SHARED KEY"]:
+                _batchers.pop(key).close()
+
+    def test_error_submit(self):
+        """
+        Testing if submitting something other than a list of InputTasks, or to a closed batcher, raises an error.
+        """
+        batcher = PlanningBatcher("TEST KEY")
+        with self.assertRaises(BatchDispatcherException):
+            batcher.submit(["NOT A TASK"], self.today)
+        batcher.close()
+        with self.assertRaises(BatchDispatcherException):
+            batcher.submit(self.input_tasks[0], self.today)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,106 @@
+import unittest
+
+# to allow easy test running in VSCode
+import sys, os
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+import csv
+import datetime
+
+from planner.calendar_export import *
+from planner.task import OutputTask
+
+class CalendarExportTests(unittest.TestCase):
+    """
+    Test cases for the calendar_export module.
+    """
+
+    def setUp(self):
+        """
+        Create a schedule of OutputTasks for testing.
+        """
+        self.stamp = datetime.datetime(2025, 7, 1, 12, 0, tzinfo = datetime.timezone.utc)
+        self.schedule = [OutputTask("Essay, Draft", 20, 7, 2025, "Intro; body", 1, 2),
+                         OutputTask("Essay, Draft", 21, 7, 2025, "Intro; body", 2, 2),
+                         OutputTask("NONE", 22, 7, 2025, "Read chapter 1", 1, 1)]
+
+    def test_ics_lines(self):
+        """
+        Testing if a schedule becomes an iCalendar file with one escaped all-day event per part.
+        """
+        text = "".join(ics_lines(iter(self.schedule), stamp = self.stamp))
+        self.assertTrue(text.startswith("BEGIN:VCALENDAR\r\nVERSION:2.0\r\n"))
+        self.assertTrue(text.endswith("END:VCALENDAR\r\n"))
+        self.assertEqual(text.count("BEGIN:VEVENT"), 3)
+        self.assertIn("DTSTART;VALUE=DATE:20250721\r\nDTEND;VALUE=DATE:20250722\r\n", text)
+        self.assertIn("SUMMARY:Essay\\, Draft (2/2)\r\n", text)
+        self.assertIn("DESCRIPTION:Intro\\; body\r\n", text)
+        self.assertIn("SUMMARY:Read chapter 1\r\n", text)
+        self.assertIn("DTSTAMP:20250701T120000Z\r\n", text)
+
+    def test_ics_uids(self):
+        """
+        Testing if a part keeps its UID when it moves to another day and repeated parts get different UIDs.
+        """
+        def uids(schedule):
+            text = "".join(ics_lines(schedule, stamp = self.stamp))
+            return [line for line in text.split("\r\n") if line.startswith("UID:")]
+        moved = [OutputTask.from_ordinal(task.name, task.ordinal + 3, task.desc, task.part_num, task.total_parts)
+                 for task in self.schedule]
+        self.assertEqual(uids(self.schedule), uids(moved))
+        repeated = uids(self.schedule[:1] * 2)
+        self.assertNotEqual(repeated[0], repeated[1])
+
+    def test_ics_folding(self):
+        """
+        Testing if long lines are folded to at most 75 octets without splitting characters.
+        """
+        task = OutputTask("Essay", 20, 7, 2025, "Überblick " * 20, 1, 1)
+        lines = "".join(ics_lines([task], stamp = self.stamp)).split("\r\n")
+        self.assertTrue(all(len(line.encode()) <= 75 for line in lines))
+        description = [line for line in lines if line.startswith("DESCRIPTION:") or line.startswith(" ")]
+        self.assertGreater(len(description), 1)
+        self.assertEqual("".join(line[1:] if line.startswith(" ") else line for line in description),
+                         "DESCRIPTION:" + ("Überblick " * 20))
+
+    def test_csv_lines(self):
+        """
+        Testing if a schedule becomes a CSV file that Google Calendar and Outlook can import.
+        """
+        rows = list(csv.reader("".join(csv_lines(self.schedule)).splitlines()))
+        self.assertEqual(tuple(rows[0]), CSV_HEADER)
+        self.assertEqual(rows[1], ["Essay, Draft (1/2)", "07/20/2025", "07/20/2025", "True", "Intro; body"])
+        self.assertEqual(rows[3], ["Read chapter 1", "07/22/2025", "07/22/2025", "True", "Read chapter 1"])
+
+    def test_iter_chunks(self):
+        """
+        Testing if lines are joined into chunks of about the given size without losing any text.
+        """
+        lines = [f"line {i}\n" for i in range(1000)]
+        chunks = list(iter_chunks(iter(lines), 100))
+        self.assertEqual("".join(chunks), "".join(lines))
+        self.assertTrue(all(100 <= len(chunk) < 110 for chunk in chunks[:-1]))
+        self.assertEqual(list(iter_chunks([])), [])
+
+    def test_schedule_hash(self):
+        """
+        Testing if the hash of a schedule changes exactly when the schedule changes.
+        """
+        self.assertEqual(schedule_hash(self.schedule), schedule_hash(iter(list(self.schedule))))
+        self.assertNotEqual(schedule_hash(self.schedule), schedule_hash(self.schedule[:2]))
+        moved = self.schedule[:2] + [OutputTask("NONE", 23, 7, 2025, "Read chapter 1", 1, 1)]
+        self.assertNotEqual(schedule_hash(self.schedule), schedule_hash(moved))
+
+    def test_export_exceptions(self):
+        """
+        Testing if exporting something other than OutputTasks raises an exception.
+        """
+        with self.assertRaises(CalendarExportException):
+            list(ics_lines(["TASK Essay"]))
+        with self.assertRaises(CalendarExportException):
+            list(csv_lines([None]))
+        with self.assertRaises(CalendarExportException):
+            schedule_hash([1])
+
+if __name__ == '__main__':
+    unittest.main()
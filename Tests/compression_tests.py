@@ -0,0 +1,57 @@
+import unittest
+
+# to allow easy test running in VSCode
+import sys, os
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+import gzip
+import json
+
+from planner import compression
+from planner.compression import *
+
+class CompressionTests(unittest.TestCase):
+    """
+    Test cases for the compression module.
+    """
+
+    def setUp(self):
+        """
+        Create a JSON body like a page of the schedule for testing.
+        """
+        self.data = json.dumps([{"name": f"Task {i}", "day": i % 28 + 1, "month": 7, "year": 2025, "desc": "NONE",
+                                 "part_num": 1, "total_parts": 1} for i in range(200)]).encode()
+
+    def test_compress(self):
+        """
+        Testing if every supported encoding shrinks the body and decompresses back to it.
+        """
+        self.assertIn("gzip", ENCODINGS)
+        compressed = compress(self.data, "gzip")
+        self.assertLess(len(compressed), len(self.data) // 4)
+        self.assertEqual(gzip.decompress(compressed), self.data)
+        if "br" in ENCODINGS:
+            self.assertEqual(compression.brotli.decompress(compress(self.data, "br")), self.data)
+
+    def test_compress_chunks(self):
+        """
+        Testing if a streamed body of text and bytes chunks compresses to one gzip stream.
+        """
+        chunks = [self.data[:1000].decode(), self.data[1000:5000], self.data[5000:].decode()]
+        self.assertEqual(gzip.decompress(b"".join(compress_chunks(chunks, "gzip"))), self.data)
+        self.assertEqual(gzip.decompress(b"".join(compress_chunks([], "gzip"))), b"")
+
+    def test_compression_exceptions(self):
+        """
+        Testing if unsupported encodings raise an exception.
+        """
+        with self.assertRaises(CompressionException):
+            compress(self.data, "deflate")
+        with self.assertRaises(CompressionException):
+            list(compress_chunks([self.data], "zstd"))
+        if "br" not in ENCODINGS:
+            with self.assertRaises(CompressionException):
+                compress(self.data, "br")
+
+if __name__ == '__main__':
+    unittest.main()
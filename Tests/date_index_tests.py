@@ -0,0 +1,88 @@
+import unittest
+
+# to allow easy test running in VSCode
+import sys, os
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+import datetime
+
+from planner.date_index import *
+from planner.task import OutputTask
+
+class DateIndexTests(unittest.TestCase):
+    """
+    Test cases for the date_index module.
+    """
+
+    def setUp(self):
+        """
+        Create an unordered schedule of OutputTasks and a DateIndex of it for testing.
+        """
+        self.schedule = [OutputTask("Essay", 22, 7, 2025, "NONE", 3, 3),
+                         OutputTask("Essay", 20, 7, 2025, "NONE", 1, 3),
+                         OutputTask("Reading", 20, 7, 2025, "Chapter 1", 1, 1),
+                         OutputTask("Essay", 21, 7, 2025, "NONE", 2, 3),
+                         OutputTask("Quiz", 25, 7, 2025, "NONE", 1, 1)]
+        self.index = DateIndex(self.schedule)
+
+    def test_queries(self):
+        """
+        Testing if parts are kept in date order and found by day, by date range, and by load.
+        """
+        s = self.schedule
+        self.assertEqual(self.index.tasks(), [s[1], s[2], s[3], s[0], s[4]])
+        self.assertEqual(len(self.index), 5)
+        self.assertIn(s[3], self.index)
+        self.assertNotIn(OutputTask("Essay", 23, 7, 2025, "NONE", 3, 3), self.index)
+
+        self.assertEqual(self.index.on_day(datetime.date(2025, 7, 20)), [s[1], s[2]])
+        self.assertEqual(self.index.between(datetime.date(2025, 7, 21), datetime.date(2025, 7, 25)), [s[3], s[0]])
+        self.assertEqual(self.index.between(end = datetime.date(2025, 7, 21)), [s[1], s[2]])
+        self.assertEqual(self.index.between(datetime.date(2025, 8, 1)), [])
+
+        first = datetime.date(2025, 7, 20).toordinal()
+        self.assertEqual(self.index.load(first), 2)
+        self.assertEqual(self.index.load(datetime.date(2025, 7, 23)), 0)
+        self.assertEqual(self.index.day_loads(), {first: 2, first + 1: 1, first + 2: 1, first + 5: 1})
+        self.assertEqual(self.index.day_loads(first + 1, first + 5), {first + 1: 1, first + 2: 1})
+        self.assertEqual(self.index.busy_days(1), [first])
+        self.assertEqual(self.index.busy_days(0, start = first + 2), [first + 2, first + 5])
+
+    def test_updates(self):
+        """
+        Testing if inserted and removed parts update the order and loads, and bulk inserts match single ones.
+        """
+        added = OutputTask("Quiz", 20, 7, 2025, "NONE", 1, 1)
+        self.index.insert(added)
+        self.assertEqual(self.index.on_day(added.ordinal)[-1], added)
+        self.assertEqual(self.index.load(added.ordinal), 3)
+
+        self.index.remove(self.schedule[2])
+        self.index.remove(self.schedule[4])
+        self.assertEqual(self.index.load(added.ordinal), 2)
+        self.assertEqual(self.index.busy_days(1), [added.ordinal])
+        self.assertEqual(self.index.load(self.schedule[4].ordinal), 0)
+        with self.assertRaises(DateIndexException):
+            self.index.remove(self.schedule[4])
+
+        many = [OutputTask.from_ordinal(f"Task {i}", added.ordinal + i % 7, "NONE", 1, 1) for i in range(50)]
+        one_at_a_time = DateIndex(self.index)
+        for task in many:
+            one_at_a_time.insert(task)
+        self.index.extend(many)
+        self.assertEqual(self.index.tasks(), one_at_a_time.tasks())
+        self.assertEqual(self.index.day_loads(), one_at_a_time.day_loads())
+
+    def test_date_index_exceptions(self):
+        """
+        Testing if objects that are not OutputTasks raise an exception.
+        """
+        with self.assertRaises(DateIndexException):
+            DateIndex(["Essay"])
+        with self.assertRaises(DateIndexException):
+            self.index.insert("Essay")
+        with self.assertRaises(DateIndexException):
+            self.index.extend([self.schedule[0], None])
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,89 @@
+import unittest
+
+# to allow easy test running in VSCode
+import sys, os
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+sys.path.append(os.path.abspath(os.path.dirname(__file__)))
+
+from planner.deepseek_processor import *
+from stub_server import StubServer
+
+class ModelClientTests(unittest.TestCase):
+    """
+    Test cases for the ModelClient in the deepseek_processor module.
+    """
+
+    def setUp(self):
+        """
+        Start a local stub of the chat completions endpoint.
+        """
+        self.plan = "TASK Project 1 DUE 26 07 2025 DESC NONE PARTS 1 1"
+        self.server = StubServer(content = self.plan).start()
+        self.client = ModelClient("TEST KEY", api_url = self.server.url, pool_size = 2)
+
+    def tearDown(self):
+        self.client.close()
+        self.server.stop()
+
+    def test_ask(self):
+        """
+        Testing if a query is sent with the system prompt and the model's reply is returned.
+        """
+        query = "TASK Project 1 DUE 26 07 2025 DESC NONE PARTS 1"
+        self.assertEqual(self.client.ask(query), self.plan)
+        self.assertEqual(self.server.last_body["model"], MODEL_NAME)
+        self.assertEqual(self.server.last_body["messages"][0]["content"], SYSTEM_PROMPT)
+        self.assertEqual(self.server.last_body["messages"][-1]["content"], query)
+
+    def test_connection_reuse(self):
+        """
+        Testing if repeated calls from one thread reuse a single keep-alive connection.
+        """
+        for _ in range(5):
+            self.client.ask("TASK A DUE 01 01 2000 DESC NONE PARTS 1")
+        self.assertEqual(self.server.requests, 5)
+        self.assertEqual(self.server.connections, 1)
+
+    def test_ask_stream(self):
+        """
+        Testing if a streamed reply is yielded in pieces that join back into the plan.
+        """
+        self.server.content = self.plan * 3
+        self.server.stream_chunk_size = 5
+        chunks = list(self.client.ask_stream("TASK A DUE 01 01 2000 DESC NONE PARTS 1"))
+        self.assertGreater(len(chunks), 1)
+        self.assertEqual(''.join(chunks), self.plan * 3)
+        self.assertTrue(self.server.last_body["stream"])
+
+    def test_error_timeout(self):
+        """
+        Testing if a read timeout is raised as an APIException.
+        """
+        self.server.latency = 0.5
+        with self.assertRaises(APIException):
+            self.client.ask("TASK A DUE 01 01 2000 DESC NONE PARTS 1", read_timeout = 0.05)
+
+    def test_error_status(self):
+        """
+        Testing if a non-200 status code raises an APIException.
+        """
+        self.server.status = 429
+        with self.assertRaises(APIException):
+            self.client.ask("TASK A DUE 01 01 2000 DESC NONE PARTS 1")
+        with self.assertRaises(APIException):
+            list(self.client.ask_stream("TASK A DUE 01 01 2000 DESC NONE PARTS 1"))
+
+    def test_error_reply_body(self):
+        """
+        Testing if a 200 reply without message content raises an APIException.
+        """
+        for body in (b'{"error": {"message": "overloaded"}}', b'not json', b'{"choices": []}'):
+            self.server.raw_body = body
+            with self.assertRaises(APIException):
+                self.client.ask("TASK A DUE 01 01 2000 DESC NONE PARTS 1")
+            with self.assertRaises(APIException):
+                list(self.client.ask_stream("TASK A DUE 01 01 2000 DESC NONE PARTS 1"))
+
+
+if __name__ == "__main__":
+    unittest.main()
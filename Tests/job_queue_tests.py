@@ -0,0 +1,85 @@
+import unittest
+
+# to allow easy test running in VSCode
+import sys, os
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+import threading
+
+from planner.job_queue import *
+
+class JobQueueTests(unittest.TestCase):
+    """
+    Test cases for the job_queue module.
+    """
+
+    def setUp(self):
+        """
+        Create a small JobQueue and an event that holds jobs until released.
+        """
+        self.queue = JobQueue(workers = 2, max_pending = 2)
+        self.release = threading.Event()
+
+    def tearDown(self):
+        self.release.set()
+        self.queue.shutdown()
+
+    def blocked(self, value):
+        self.release.wait(5)
+        return value
+
+    def test_result(self):
+        """
+        Testing if a job can be found by its id and returns its result.
+        """
+        job = self.queue.submit("a", self.blocked, 42)
+        self.assertIs(self.queue.get(job.job_id), job)
+        self.assertIn(job.status, ("pending", "running"))
+        self.release.set()
+        self.assertEqual(job.result(5), 42)
+        self.assertEqual(job.status, "done")
+        self.assertIsNone(self.queue.get("unknown"))
+
+    def test_coalescing(self):
+        """
+        Testing if identical unfinished jobs are coalesced and a finished job is not reused.
+        """
+        first = self.queue.submit("a", self.blocked, 1)
+        self.assertIs(self.queue.submit("a", self.blocked, 1), first)
+        self.assertEqual(self.queue.pending, 1)
+        self.release.set()
+        first.result(5)
+        self.assertIsNot(self.queue.submit("a", self.blocked, 1), first)
+
+    def test_backpressure(self):
+        """
+        Testing if submitting past the maximum queue depth raises a QueueFullException.
+        """
+        self.queue.submit("a", self.blocked, 1)
+        self.queue.submit("b", self.blocked, 2)
+        with self.assertRaises(QueueFullException):
+            self.queue.submit("c", self.blocked, 3)
+
+    def test_failed_job(self):
+        """
+        Testing if a job that raises is reported as failed with its error.
+        """
+        job = self.queue.submit("a", int, "NOT A NUMBER")
+        with self.assertRaises(ValueError):
+            job.result(5)
+        self.assertEqual(job.status, "failed")
+        self.assertIsInstance(job.error(), ValueError)
+
+    def test_processes(self):
+        """
+        Testing if jobs also run on a process pool.
+        """
+        queue = JobQueue(workers = 1, use_processes = True)
+        try:
+            self.assertEqual(queue.submit("a", pow, 2, 10).result(30), 1024)
+        finally:
+            queue.shutdown()
+
+
+if __name__ == "__main__":
+    unittest.main()
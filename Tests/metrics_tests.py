@@ -0,0 +1,86 @@
+import unittest
+
+# to allow easy test running in VSCode
+import sys, os
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+sys.path.append(os.path.abspath(os.path.dirname(__file__)))
+
+from planner.deepseek_processor import APIException, ModelClient
+from planner.metrics import *
+from stub_server import StubServer
+
+class MetricsTests(unittest.TestCase):
+    """
+    Test cases for the metrics module.
+    """
+
+    def test_histogram(self):
+        """
+        Testing if observations land in cumulative buckets and are rendered in Prometheus text format.
+        """
+        registry = MetricsRegistry()
+        histogram = registry.histogram("test_seconds", "Test durations.", ("stage",), buckets = (0.1, 1.0))
+        for value in (0.05, 0.5, 0.7, 5.0):
+            histogram.observe(value, stage = "parse")
+        with histogram.time(stage = "build"):
+            pass
+
+        self.assertEqual(histogram.count(stage = "parse"), 4)
+        lines = registry.render().splitlines()
+        self.assertEqual(lines[:2], ["# HELP test_seconds Test durations.", "# TYPE test_seconds histogram"])
+        self.assertIn('test_seconds_bucket{stage="build",le="0.1"} 1', lines)
+        self.assertEqual([line for line in lines if 'stage="parse"' in line],
+                         ['test_seconds_bucket{stage="parse",le="0.1"} 1',
+                          'test_seconds_bucket{stage="parse",le="1.0"} 3',
+                          'test_seconds_bucket{stage="parse",le="+Inf"} 4',
+                          'test_seconds_sum{stage="parse"} 6.25',
+                          'test_seconds_count{stage="parse"} 4'])
+
+    def test_counter(self):
+        """
+        Testing if counters add up per label value, and counters without labels start at zero.
+        """
+        registry = MetricsRegistry()
+        errors = registry.counter("test_errors_total", "Test errors.", ("status",))
+        failures = registry.counter("test_failures_total", "Test failures.")
+        errors.inc(status = "503")
+        errors.inc(2, status = "503")
+        errors.inc(status = "none")
+        self.assertEqual(errors.value(status = "503"), 3)
+        self.assertEqual(registry.render().splitlines()[-1], "test_failures_total 0")
+        self.assertIn('test_errors_total{status="none"} 1', registry.render())
+
+    def test_model_client_metrics(self):
+        """
+        Testing if the ModelClient records its connect, time to first byte, and total times, and counts API errors.
+        """
+        connects = STAGE_SECONDS.count(stage = "model_connect")
+        totals = STAGE_SECONDS.count(stage = "model_total")
+        errors = API_ERRORS.value(status = "503")
+        with StubServer(content = "TASK A DATE 01 01 2000 DESC NONE PARTS 1 1") as server:
+            with ModelClient("TEST KEY", api_url = server.url) as client:
+                client.ask("TASK A DUE 02 01 2000 DESC NONE PARTS 1")
+                client.ask("TASK A DUE 02 01 2000 DESC NONE PARTS 1")
+                server.status = 503
+                with self.assertRaises(APIException):
+                    client.ask("TASK A DUE 02 01 2000 DESC NONE PARTS 1")
+
+        self.assertEqual(STAGE_SECONDS.count(stage = "model_connect"), connects + 1)
+        self.assertEqual(STAGE_SECONDS.count(stage = "model_total"), totals + 3)
+        self.assertGreater(STAGE_SECONDS.count(stage = "model_ttfb"), 0)
+        self.assertEqual(API_ERRORS.value(status = "503"), errors + 1)
+
+    def test_error_metrics(self):
+        """
+        Testing if wrong labels or a name registered twice raise an error.
+        """
+        registry = MetricsRegistry()
+        counter = registry.counter("test_total", "Test.", ("status",))
+        with self.assertRaises(MetricsException):
+            counter.inc(stage = "parse")
+        with self.assertRaises(MetricsException):
+            registry.histogram("test_total", "Test.")
+
+
+if __name__ == "__main__":
+    unittest.main()
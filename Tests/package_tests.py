@@ -0,0 +1,51 @@
+import unittest
+
+# to allow easy test running in VSCode
+import sys, os
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+import importlib
+import subprocess
+
+import planner
+
+class PackageTests(unittest.TestCase):
+    """
+    Test cases for the planner package.
+    """
+
+    def test_exports(self):
+        """
+        Testing if the package exports exactly the names each module lists in its __all__.
+        """
+        for module, names in planner._EXPORTS.items():
+            self.assertEqual(list(names), importlib.import_module(f"planner.{module}").__all__)
+        # every module is exported, and no name is exported by two of them
+        modules = {name[:-3] for name in os.listdir(os.path.dirname(planner.__file__))
+                   if name.endswith(".py") and name != "__init__.py"}
+        self.assertEqual(set(planner._EXPORTS), modules)
+        self.assertEqual(len(planner.__all__), sum(len(names) for names in planner._EXPORTS.values()))
+
+    def test_lazy_attributes(self):
+        """
+        Testing if names are loaded from their module on first use and unknown names still raise AttributeError.
+        """
+        from planner import task_interpreter
+        self.assertIs(planner.params_to_input_task, task_interpreter.params_to_input_task)
+        from planner.task import OutputTask
+        self.assertIs(planner.OutputTask, OutputTask)
+        self.assertIn("schedule_tasks", dir(planner))
+        with self.assertRaises(AttributeError):
+            planner.not_a_name
+
+    def test_cold_import(self):
+        """
+        Testing if importing the package, or scheduling without the model, does not load the HTTP libraries.
+        """
+        code = "import sys, planner; from planner import schedule_tasks, ModelClient; print('requests' in sys.modules)"
+        result = subprocess.run([sys.executable, "-c", code], capture_output = True, text = True, check = True,
+                                cwd = os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+        self.assertEqual(result.stdout.strip(), "False")
+
+if __name__ == '__main__':
+    unittest.main()
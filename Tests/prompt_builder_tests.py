@@ -0,0 +1,100 @@
+import unittest
+
+# to allow easy test running in VSCode
+import sys, os
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+import datetime
+
+from planner.deepseek_processor import SYSTEM_PROMPT
+from planner.prompt_builder import *
+from planner.task import InputTask
+from planner.task_interpreter import input_tasks_to_lines
+
+class PromptBuilderTests(unittest.TestCase):
+    """
+    Test cases for the prompt_builder module.
+    """
+
+    def setUp(self):
+        """
+        Create the InputTasks from the example in the system prompt, assuming that today is January 1, 2000.
+        """
+        self.today = datetime.date(2000, 1, 1)
+        self.input_tasks = [InputTask("Math Homework", 8, 1, 2000, "NONE", 1),
+                            InputTask("Reading Homework", 5, 1, 2000, "NONE", 2),
+                            InputTask("NONE", 15, 1, 2000, "Book report for the Great Gatsby", 3),
+                            InputTask("Study", 8, 1, 2000, "Studying for a History Quiz", 9)]
+
+    def test_estimate_tokens(self):
+        """
+        Testing if the token estimate counts words, long words, numbers, and symbols.
+        """
+        self.assertEqual(estimate_tokens(""), 0)
+        self.assertEqual(estimate_tokens("TASK Math DUE 08 01 2000"), 7)
+        self.assertEqual(estimate_tokens("procrastination"), 3)
+        self.assertEqual(estimate_tokens("1;7;-"), 5)
+
+    def test_encode_tasks(self):
+        """
+        Testing if tasks are encoded with days until due, and repeated text is written once.
+        """
+        repeated = InputTask("Study", 10, 1, 2000, "Studying for a History Quiz", 1)
+        query = encode_tasks(self.input_tasks + [repeated], self.today, {0: 2, 3: 1, -1: 5})
+        self.assertEqual(query.split("\n"), ["Today 01 01 2000",
+                                             "$1=Studying for a History Quiz",
+                                             "1;7;1;Math Homework;-",
+                                             "2;4;2;Reading Homework;-",
+                                             "3;14;3;-;Book report for the Great Gatsby",
+                                             "4;7;9;Study;$1",
+                                             "5;9;1;Study;$1",
+                                             "Busy: 0*2 3*1"])
+
+    def test_compact_prompt_size(self):
+        """
+        Testing if the compact prompt and query are much smaller than the full ones.
+        """
+        full = estimate_tokens(SYSTEM_PROMPT) + estimate_tokens(input_tasks_to_lines(self.input_tasks))
+        compact = estimate_tokens(COMPACT_SYSTEM_PROMPT) + estimate_tokens(encode_tasks(self.input_tasks, self.today))
+        self.assertLess(compact * 3, full)
+
+    def test_compact_output_tokens(self):
+        """
+        Testing if the compact output format needs far fewer reply tokens, so more tasks fit in each chunk.
+        """
+        task = InputTask("Reading Homework", 5, 1, 2000, "Chapters one to three of the textbook", 9)
+        self.assertLess(task_tokens(task, compact_output = True) * 4, task_tokens(task))
+        input_tasks = [InputTask(f"Task {i}", 1 + i % 28, 2, 2000, "NONE", 3) for i in range(100)]
+        self.assertLess(len(chunk_tasks(input_tasks, self.today, 2000, compact_output = True)),
+                        len(chunk_tasks(input_tasks, self.today, 2000)))
+
+    def test_chunk_tasks(self):
+        """
+        Testing if large lists are split into chunks of due dates within the token budget.
+        """
+        self.assertEqual(chunk_tasks(self.input_tasks, self.today), [sorted(self.input_tasks, key = lambda task: task.ordinal)])
+
+        budget = estimate_tokens(COMPACT_SYSTEM_PROMPT) + 16 + 1000
+        input_tasks = [InputTask(f"Task {i}", 1 + i % 28, 2, 2000, "NONE", 3) for i in range(100)]
+        chunks = chunk_tasks(input_tasks, self.today, budget)
+        self.assertGreater(len(chunks), 1)
+        self.assertEqual(sorted(task for chunk in chunks for task in chunk), sorted(input_tasks))
+        for chunk, following in zip(chunks, chunks[1:]):
+            busy_days = chunk[-1].ordinal - self.today.toordinal()
+            self.assertLessEqual(sum(task_tokens(task) for task in chunk) + 3 * busy_days, 1000)
+            self.assertLessEqual(chunk[-1].ordinal, following[0].ordinal)
+
+    def test_error_chunk_tasks(self):
+        """
+        Testing if a non-list, a list of non-InputTasks, or a budget below the system prompt raises an error.
+        """
+        with self.assertRaises(PromptBuilderException):
+            chunk_tasks("NOT A LIST")
+        with self.assertRaises(PromptBuilderException):
+            encode_tasks(self.input_tasks + ["NOT A TASK"], self.today)
+        with self.assertRaises(PromptBuilderException):
+            chunk_tasks(self.input_tasks, self.today, 10)
+
+
+if __name__ == "__main__":
+    unittest.main()
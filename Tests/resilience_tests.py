@@ -0,0 +1,163 @@
+import unittest
+
+# to allow easy test running in VSCode
+import sys, os
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+sys.path.append(os.path.abspath(os.path.dirname(__file__)))
+
+import random
+import time
+
+from planner.deepseek_processor import APIException, ModelClient, parse_retry_after
+from planner.resilience import *
+from planner.response_cache import ResponseCache
+from stub_server import StubServer
+
+class ResilienceTests(unittest.TestCase):
+    """
+    Test cases for the resilience module.
+    """
+
+    def setUp(self):
+        """
+        Start a local stub of the chat completions endpoint whose faults each test injects.
+        """
+        self.plan = "TASK Project 1 DATE 26 07 2025 DESC NONE PARTS 1 1"
+        self.query = "TASK Project 1 DUE 27 07 2025 DESC NONE PARTS 1"
+        self.server = StubServer(content = self.plan).start()
+        self.model_client = ModelClient("TEST KEY", api_url = self.server.url)
+
+    def tearDown(self):
+        self.model_client.close()
+        self.server.stop()
+
+    def test_backoff_delay(self):
+        """
+        Testing if delays grow exponentially with full jitter, are capped, and never undercut Retry-After.
+        """
+        rng = random.Random(0)
+        for attempt in range(8):
+            self.assertLessEqual(backoff_delay(attempt, 0.5, 4.0, rng = rng), min(4.0, 0.5 * 2 ** attempt))
+        self.assertGreaterEqual(backoff_delay(0, 0.5, 4.0, retry_after = 3.0, rng = rng), 3.0)
+        self.assertEqual(parse_retry_after("2"), 2.0)
+        self.assertEqual(parse_retry_after("Wed, 21 Oct 2015 07:28:00 GMT"), 0.0)
+        self.assertIsNone(parse_retry_after("soon"))
+
+    def test_retries(self):
+        """
+        Testing if rate limits and server errors are retried until the call succeeds.
+        """
+        client = ResilientModelClient(self.model_client, retries = 3, base_delay = 0.01)
+        self.server.statuses = [503, 429, 502]
+        self.assertEqual(client.ask(self.query), self.plan)
+        self.assertEqual(self.server.requests, 4)
+
+    def test_retry_after(self):
+        """
+        Testing if the wait before a retry honors the Retry-After header.
+        """
+        client = ResilientModelClient(self.model_client, retries = 1, base_delay = 0.01)
+        self.server.statuses = [429]
+        self.server.retry_after = 0.3
+        start = time.perf_counter()
+        self.assertEqual(client.ask(self.query), self.plan)
+        self.assertGreaterEqual(time.perf_counter() - start, 0.3)
+
+    def test_no_retry(self):
+        """
+        Testing if client errors are not retried, and retries stop when they run out or would pass the deadline.
+        """
+        client = ResilientModelClient(self.model_client, retries = 3, base_delay = 0.01)
+        self.server.statuses = [400]
+        with self.assertRaises(APIException) as context:
+            client.ask(self.query)
+        self.assertEqual(context.exception.status_code, 400)
+        self.assertEqual(self.server.requests, 1)
+
+        self.server.status = 503
+        with self.assertRaises(APIException):
+            client.ask(self.query)
+        self.assertEqual(self.server.requests, 1 + 4)
+
+        self.server.retry_after = 5
+        start = time.perf_counter()
+        with self.assertRaises(APIException):
+            client.ask(self.query, deadline = 1.0)
+        self.assertLess(time.perf_counter() - start, 1.0)
+        self.assertEqual(self.server.requests, 1 + 4 + 1)
+
+    def test_circuit_breaker(self):
+        """
+        Testing if the breaker opens after repeated failures, fails fast while open, still serves cached plans, and
+        closes again after a successful trial call.
+        """
+        cache = ResponseCache()
+        client = ResilientModelClient(self.model_client, retries = 0, breaker = CircuitBreaker(2, 0.2))
+        client.ask(self.query, cache = cache)
+
+        self.server.status = 500
+        for _ in range(2):
+            with self.assertRaises(APIException):
+                client.ask("TASK Other DUE 27 07 2025 DESC NONE PARTS 1")
+        self.assertEqual(client.breaker.state, "open")
+        with self.assertRaises(CircuitOpenException):
+            client.ask("TASK Other DUE 27 07 2025 DESC NONE PARTS 1")
+        self.assertEqual(self.server.requests, 3)
+        self.assertEqual(client.ask(self.query, cache = cache), self.plan)
+
+        time.sleep(0.2)
+        self.assertEqual(client.breaker.state, "half_open")
+        self.server.status = 200
+        self.assertEqual(client.ask(self.query), self.plan)
+        self.assertEqual(client.breaker.state, "closed")
+
+    def test_circuit_breaker_trial_error(self):
+        """
+        Testing if a trial call that fails with an error other than an APIException opens the breaker again.
+        """
+        breaker = CircuitBreaker(1, 0.05)
+        client = ResilientModelClient(self.model_client, retries = 0, breaker = breaker)
+        breaker.record_failure()
+        time.sleep(0.05)
+
+        def broken_ask(*args, **kwargs):
+            raise KeyError("choices")
+        self.model_client.ask = broken_ask
+        with self.assertRaises(KeyError):
+            client.ask(self.query)
+        self.assertEqual(breaker.state, "open")
+
+        del self.model_client.ask
+        time.sleep(0.05)
+        self.assertEqual(client.ask(self.query), self.plan)
+        self.assertEqual(breaker.state, "closed")
+
+    def test_hedged_requests(self):
+        """
+        Testing if a second request is sent when the first is slower than the recent p95 latency, and the faster
+        reply is returned.
+        """
+        client = ResilientModelClient(self.model_client, hedge = True, hedge_min_samples = 5)
+        for _ in range(5):
+            client.ask(self.query)
+        self.server.latencies = [1.0]
+        start = time.perf_counter()
+        self.assertEqual(client.ask(self.query), self.plan)
+        self.assertLess(time.perf_counter() - start, 0.5)
+        self.assertEqual(self.server.requests, 7)
+        client.close()
+
+    def test_latency_tracker(self):
+        """
+        Testing if percentiles are taken over the most recent latencies only.
+        """
+        tracker = LatencyTracker(window = 100)
+        self.assertIsNone(tracker.percentile(95))
+        for latency in range(200):
+            tracker.record(latency)
+        self.assertEqual(tracker.percentile(95), 195)
+        self.assertEqual(tracker.percentile(0), 100)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,109 @@
+import unittest
+
+# to allow easy test running in VSCode
+import sys, os
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+sys.path.append(os.path.abspath(os.path.dirname(__file__)))
+
+import datetime
+import tempfile
+import time
+
+from planner.deepseek_processor import *
+from planner.response_cache import *
+from stub_server import StubServer
+
+class ResponseCacheTests(unittest.TestCase):
+    """
+    Test cases for the response_cache module.
+    """
+
+    def setUp(self):
+        """
+        Create basic query and date variables for testing.
+        """
+        self.query = "TASK Project 1 DUE 26 07 2025 DESC NONE PARTS 1"
+        self.today = datetime.date(2025, 7, 20)
+        self.key = make_cache_key(MODEL_NAME, SYSTEM_PROMPT, self.query, self.today)
+
+    def test_make_cache_key(self):
+        """
+        Testing if the cache key changes with the model, prompt, query, and date.
+        """
+        self.assertEqual(self.key, make_cache_key(MODEL_NAME, SYSTEM_PROMPT, self.query, self.today))
+        self.assertNotEqual(self.key, make_cache_key("other-model", SYSTEM_PROMPT, self.query, self.today))
+        self.assertNotEqual(self.key, make_cache_key(MODEL_NAME, "other prompt", self.query, self.today))
+        self.assertNotEqual(self.key, make_cache_key(MODEL_NAME, SYSTEM_PROMPT, self.query + " ", self.today))
+        self.assertNotEqual(self.key, make_cache_key(MODEL_NAME, SYSTEM_PROMPT, self.query, datetime.date(2025, 7, 21)))
+
+    def test_hits_and_misses(self):
+        """
+        Testing if lookups are counted as hits or misses.
+        """
+        cache = ResponseCache()
+        self.assertIsNone(cache.get(self.key))
+        cache.put(self.key, "PLAN")
+        self.assertEqual(cache.get(self.key), "PLAN")
+        self.assertEqual(cache.stats()["hits"], 1)
+        self.assertEqual(cache.stats()["misses"], 1)
+
+    def test_lru_eviction(self):
+        """
+        Testing if the least recently used response is evicted once the entry or byte limit is passed.
+        """
+        cache = ResponseCache(max_entries = 2)
+        cache.put("a", "1")
+        cache.put("b", "2")
+        cache.get("a")
+        cache.put("c", "3")
+        self.assertIsNone(cache.get("b"))
+        self.assertEqual(cache.get("a"), "1")
+        self.assertEqual(cache.get("c"), "3")
+
+        cache = ResponseCache(max_bytes = 10)
+        cache.put("a", "12345")
+        cache.put("b", "123456")
+        self.assertIsNone(cache.get("a"))
+        self.assertEqual(len(cache), 1)
+
+    def test_ttl(self):
+        """
+        Testing if responses expire after their time to live.
+        """
+        cache = ResponseCache(ttl = 0.05)
+        cache.put(self.key, "PLAN")
+        time.sleep(0.1)
+        self.assertIsNone(cache.get(self.key))
+
+    def test_disk_tier(self):
+        """
+        Testing if responses stored on disk survive a new cache being created.
+        """
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "cache.db")
+            cache = ResponseCache(db_path = path)
+            cache.put(self.key, "PLAN")
+            cache.close()
+
+            cache = ResponseCache(db_path = path)
+            self.assertEqual(cache.get(self.key), "PLAN")
+            self.assertEqual(cache.disk_hits, 1)
+            self.assertEqual(cache.get(self.key), "PLAN")
+            self.assertEqual(cache.disk_hits, 1)
+            cache.close()
+
+    def test_cached_ask(self):
+        """
+        Testing if a repeated query is answered from the cache without calling the model.
+        """
+        with StubServer(content = "PLAN") as server:
+            cache = ResponseCache()
+            client = ModelClient("TEST KEY", api_url = server.url)
+            self.assertEqual(client.ask(self.query, cache = cache), "PLAN")
+            self.assertEqual(client.ask(self.query, cache = cache), "PLAN")
+            self.assertEqual(server.requests, 1)
+            client.close()
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,67 @@
+import unittest
+
+# to allow easy test running in VSCode
+import sys, os
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from planner.schedule_diff import *
+from planner.task import OutputTask
+
+class ScheduleDiffTests(unittest.TestCase):
+    """
+    Test cases for the schedule_diff module.
+    """
+
+    def setUp(self):
+        """
+        Create a schedule of OutputTasks for testing.
+        """
+        self.schedule = [OutputTask("Essay", 20, 7, 2025, "NONE", 1, 2),
+                         OutputTask("Essay", 21, 7, 2025, "NONE", 2, 2),
+                         OutputTask("Reading", 22, 7, 2025, "Chapter 1", 1, 1)]
+
+    def test_key_parts(self):
+        """
+        Testing if part keys stay the same when parts move and differ for repeated parts.
+        """
+        keys = list(key_parts(self.schedule))
+        self.assertEqual(len(set(keys)), 3)
+        self.assertEqual(len({part_id(key) for key in keys}), 3)
+        moved = [OutputTask("Essay", 25, 7, 2025, "NONE", 1, 2)] + self.schedule[1:]
+        self.assertEqual(list(key_parts(moved)), keys)
+        self.assertEqual(len(key_parts(self.schedule + self.schedule[:1])), 4)
+        repeated = list(key_parts(self.schedule + self.schedule[:1]))
+        self.assertEqual(repeated[3], part_key(self.schedule[0], 1))
+        self.assertEqual(repeated[:3], [part_key(task, 0) for task in self.schedule])
+        copies = [self.schedule[2]] * 50 + self.schedule[:2] + [self.schedule[2]]
+        self.assertEqual([key[3] for key in key_parts(copies)], list(range(50)) + [0, 0, 50])
+
+    def test_diff_schedules(self):
+        """
+        Testing if only added, moved, and removed parts are in the diff.
+        """
+        new = [OutputTask("Essay", 23, 7, 2025, "NONE", 1, 2),
+               self.schedule[2],
+               OutputTask("Quiz", 24, 7, 2025, "NONE", 1, 1)]
+        keys = key_parts(self.schedule)
+        diff = diff_schedules(self.schedule, new)
+        self.assertEqual(len(diff), 3)
+        self.assertEqual(list(diff.added.values()), [new[2]])
+        self.assertEqual(list(diff.moved.values()), [new[0]])
+        self.assertEqual(diff.removed, [list(keys)[1]])
+        self.assertEqual(diff.to_dict()["moved"][0]["day"], 23)
+        self.assertEqual(diff.to_dict()["moved"][0]["id"], part_id(list(keys)[0]))
+        self.assertEqual(diff.to_dict()["removed"], [part_id(list(keys)[1])])
+
+        self.assertFalse(diff_schedules(self.schedule, list(reversed(self.schedule))))
+        self.assertEqual(len(diff_keyed_parts({}, keys).added), 3)
+
+    def test_schedule_diff_exceptions(self):
+        """
+        Testing if schedules that are not of OutputTasks raise an exception.
+        """
+        with self.assertRaises(ScheduleDiffException):
+            diff_schedules(self.schedule, ["Essay"])
+
+if __name__ == '__main__':
+    unittest.main()
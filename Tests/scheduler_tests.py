@@ -0,0 +1,250 @@
+import unittest
+
+# to allow easy test running in VSCode
+import sys, os
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+sys.path.append(os.path.abspath(os.path.dirname(__file__)))
+
+import datetime
+import time
+
+from planner.deepseek_processor import _clients, ModelClient
+from planner.prompt_builder import COMPACT_OUTPUT_SYSTEM_PROMPT, COMPACT_SYSTEM_PROMPT
+from planner.resilience import _resilient_clients, ResilientModelClient
+from planner.scheduler import *
+from planner.task_interpreter import params_to_input_task
+from stub_server import StubServer
+
+class SchedulerTests(unittest.TestCase):
+    """
+    Test cases for the scheduler module.
+    """
+
+    def setUp(self):
+        """
+        Create the InputTasks from the example in the system prompt, assuming that today is January 1, 2000.
+        """
+        self.today = datetime.date(2000, 1, 1)
+        self.input_tasks = [params_to_input_task("Math Homework", "08", "01", "2000", "NONE", "1"),
+                            params_to_input_task("Reading Homework", "05", "01", "2000", "NONE", "2"),
+                            params_to_input_task("NONE", "15", "01", "2000", "Book report for the Great Gatsby", "3"),
+                            params_to_input_task("Study", "08", "01", "2000", "Studying for a History Quiz", "9")]
+
+    def test_schedule_tasks(self):
+        """
+        Testing if the example from the system prompt is scheduled by due date with balanced daily loads.
+        """
+        schedule = schedule_tasks(self.input_tasks, self.today)
+        days = {}
+        for task in schedule:
+            days.setdefault(task.name, []).append((task.day, task.part_num))
+
+        self.assertEqual(days["Reading Homework"], [(1, 1), (2, 2)])
+        self.assertEqual(days["Math Homework"], [(3, 1)])
+        self.assertEqual(days["Study"], [(1, 1), (2, 2), (3, 3), (4, 4), (4, 5), (5, 6), (5, 7), (6, 8), (7, 9)])
+        self.assertEqual(days["Book report for the Great Gatsby"], [(8, 1), (9, 2), (10, 3)])
+
+        # sorted by date and never more than two parts on one day
+        ordinals = [datetime.date(task.year, task.month, task.day).toordinal() for task in schedule]
+        self.assertEqual(ordinals, sorted(ordinals))
+        self.assertLessEqual(max(ordinals.count(ordinal) for ordinal in ordinals), 2)
+
+    def test_late_tasks(self):
+        """
+        Testing if late tasks and tasks due today are scheduled today, ahead of other tasks.
+        """
+        input_tasks = [params_to_input_task("Later", "10", "01", "2000", "NONE", "1"),
+                       params_to_input_task("Late", "20", "12", "1999", "NONE", "2")]
+        schedule = schedule_tasks(input_tasks, self.today)
+        self.assertEqual([(task.name, task.day, task.month) for task in schedule],
+                         [("Late", 1, 1), ("Late", 1, 1), ("Later", 2, 1)])
+
+    def test_before_due_date(self):
+        """
+        Testing if every part is scheduled before its task's due date.
+        """
+        input_tasks = [params_to_input_task(f"Task {i}", str(2 + i % 20), "01", "2000", "NONE", str(1 + i % 5))
+                       for i in range(50)]
+        due = {task.name: datetime.date(task.year, task.month, task.day) for task in input_tasks}
+        schedule = schedule_tasks(input_tasks, self.today)
+        self.assertEqual(len(schedule), sum(task.parts for task in input_tasks))
+        for task in schedule:
+            self.assertLess(datetime.date(task.year, task.month, task.day), due[task.name])
+
+    def test_replan_tasks(self):
+        """
+        Testing if adding, removing, and changing tasks leaves every unaffected part where it was.
+        """
+        schedule = schedule_tasks(self.input_tasks, self.today)
+        study = [str(task) for task in schedule if task.name == "Study"]
+
+        quiz = params_to_input_task("Quiz Prep", "04", "01", "2000", "NONE", "2")
+        added = replan_tasks(schedule, added = [quiz], today = self.today)
+        self.assertEqual([str(task) for task in added if task.name == "Study"], study)
+        self.assertEqual([(task.day, task.part_num) for task in added if task.name == "Quiz Prep"], [(1, 1), (2, 2)])
+        self.assertEqual(len(added), len(schedule) + 2)
+
+        removed = replan_tasks(added, removed = [self.input_tasks[2]], today = self.today)
+        self.assertNotIn("Book report for the Great Gatsby", {task.name for task in removed})
+        self.assertEqual(len(removed), len(added) - 3)
+
+        moved = params_to_input_task("Quiz Prep", "03", "01", "2000", "NONE", "1")
+        changed = replan_tasks(removed, changed = [(quiz, moved)], today = self.today)
+        self.assertEqual([(task.day, task.part_num, task.total_parts) for task in changed if task.name == "Quiz Prep"],
+                         [(1, 1, 1)])
+        self.assertEqual([str(task) for task in changed if task.name == "Study"], study)
+
+    def test_place_new_tasks(self):
+        """
+        Testing if only the added task's parts are returned, even when they equal parts already in the schedule.
+        """
+        essay = params_to_input_task("Essay", "02", "01", "2000", "NONE", "1")
+        schedule = replan_tasks([], added = [essay], today = self.today)
+        new_parts = place_new_tasks(schedule, [essay], self.today)
+        self.assertEqual(len(new_parts), 1)
+        self.assertEqual(new_parts, schedule)
+        self.assertEqual(len(replan_tasks(schedule, added = [essay], today = self.today)), 2)
+
+    def test_replan_tasks_window(self):
+        """
+        Testing if new parts stay before their due date even when pinned days after it are emptier.
+        """
+        busy = [params_to_input_task("Busy", "03", "01", "2000", "NONE", "4")]
+        later = [params_to_input_task("Later", "20", "01", "2000", "NONE", "1")]
+        schedule = schedule_tasks(busy + later, self.today)
+        self.assertEqual([task.day for task in schedule], [1, 1, 2, 2, 3])
+
+        new = params_to_input_task("New", "03", "01", "2000", "NONE", "2")
+        replanned = replan_tasks(schedule, added = [new], today = self.today)
+        self.assertEqual([task.day for task in replanned if task.name == "New"], [1, 2])
+
+    def test_build_replan_query(self):
+        """
+        Testing if the reduced query only contains the pinned parts inside the new tasks' window.
+        """
+        schedule = schedule_tasks(self.input_tasks, self.today)
+        quiz = params_to_input_task("Quiz Prep", "03", "01", "2000", "NONE", "1")
+        query = build_replan_query(schedule, [quiz], self.today)
+        self.assertTrue(query.endswith(str(quiz)))
+        self.assertIn("TASK Reading Homework DUE 02 01 2000", query)
+        self.assertNotIn("Math Homework", query)
+        self.assertNotIn("Great Gatsby", query)
+
+    def test_plan_tasks_fallback(self):
+        """
+        Testing if the local scheduler is used when the model still fails after a retry.
+        """
+        with StubServer(status = 503) as server:
+            _clients["TEST KEY"] = ModelClient("TEST KEY", api_url = server.url)
+            _resilient_clients[_clients["TEST KEY"]] = ResilientModelClient(_clients["TEST KEY"], retries = 1,
+                                                                            base_delay = 0.01)
+            try:
+                schedule = plan_tasks("TEST KEY", self.input_tasks, self.today)
+            finally:
+                _clients.pop("TEST KEY").close()
+            self.assertEqual(server.requests, 2)
+        self.assertEqual([str(task) for task in schedule],
+                         [str(task) for task in schedule_tasks(self.input_tasks, self.today)])
+
+    def test_plan_tasks_invalid_date(self):
+        """
+        Testing if the local scheduler is used when the model replies with a date that does not exist.
+        """
+        with StubServer(content = "TASK Reading Homework DATE 31 02 2000 DESC NONE PARTS 1 1") as server:
+            _clients["TEST KEY"] = ModelClient("TEST KEY", api_url = server.url)
+            try:
+                schedule = plan_tasks("TEST KEY", self.input_tasks, self.today)
+            finally:
+                _clients.pop("TEST KEY").close()
+            self.assertEqual(server.requests, 1)
+        self.assertEqual(schedule, schedule_tasks(self.input_tasks, self.today))
+
+    def test_plan_tasks_chunked(self):
+        """
+        Testing if a list too large for one query is planned in windows, each told about the days already planned.
+        """
+        input_tasks = [params_to_input_task(f"Task {i}", str(2 + i % 20), "01", "2000", "NONE", "2") for i in range(40)]
+        with StubServer(content = "TASK Task DATE 01 01 2000 DESC NONE PARTS 1 1") as server:
+            _clients["TEST KEY"] = ModelClient("TEST KEY", api_url = server.url)
+            try:
+                schedule = plan_tasks("TEST KEY", input_tasks, self.today, max_tokens = 1200)
+            finally:
+                _clients.pop("TEST KEY").close()
+            self.assertGreater(server.requests, 1)
+            self.assertEqual(len(schedule), server.requests)
+            self.assertEqual(server.last_body["messages"][0]["content"], COMPACT_SYSTEM_PROMPT)
+            self.assertIn("\nBusy: 0*", server.last_body["messages"][-1]["content"])
+
+    def test_plan_tasks_compact_output(self):
+        """
+        Testing if a reply of only task ids and days is expanded into the schedule of the given tasks.
+        """
+        # the query numbers the tasks by due date
+        with StubServer(content = "1:0,1\n2:2\n3:3,4,5") as server:
+            _clients["TEST KEY"] = ModelClient("TEST KEY", api_url = server.url)
+            try:
+                schedule = plan_tasks("TEST KEY", self.input_tasks[:3], self.today, compact_output = True)
+            finally:
+                _clients.pop("TEST KEY").close()
+            self.assertEqual(server.requests, 1)
+            self.assertEqual(server.last_body["messages"][0]["content"], COMPACT_OUTPUT_SYSTEM_PROMPT)
+        self.assertEqual([(task.name, task.day, task.part_num, task.total_parts) for task in schedule],
+                         [("Reading Homework", 1, 1, 2), ("Reading Homework", 2, 2, 2), ("Math Homework", 3, 1, 1),
+                          ("Book report for the Great Gatsby", 4, 1, 3), ("Book report for the Great Gatsby", 5, 2, 3),
+                          ("Book report for the Great Gatsby", 6, 3, 3)])
+
+        # a day far outside the due window falls back to the local scheduler
+        with StubServer(content = "1:0,99999999999\n2:2\n3:3,4,5") as server:
+            _clients["TEST KEY"] = ModelClient("TEST KEY", api_url = server.url)
+            try:
+                schedule = plan_tasks("TEST KEY", self.input_tasks[:3], self.today, compact_output = True)
+            finally:
+                _clients.pop("TEST KEY").close()
+        self.assertEqual(schedule, schedule_tasks(self.input_tasks[:3], self.today))
+
+    def test_merge_schedules(self):
+        """
+        Testing if parts of separately planned schedules that collide on a day are spread out before their due dates.
+        """
+        schedule = schedule_tasks(self.input_tasks, self.today)
+        self.assertEqual(merge_schedules([schedule], self.input_tasks, self.today), schedule)
+
+        project = params_to_input_task("Project", "05", "01", "2000", "NONE", "4")
+        essay = params_to_input_task("Essay", "06", "01", "2000", "NONE", "2")
+        # both planned as if they were alone, so every part lands on the first days
+        merged = merge_schedules([schedule_tasks([project], self.today), schedule_tasks([essay], self.today)],
+                                 [project, essay], self.today)
+        self.assertEqual([(task.name, task.day, task.part_num) for task in merged],
+                         [("Project", 1, 1), ("Project", 2, 2), ("Project", 3, 3), ("Project", 4, 4),
+                          ("Essay", 5, 1), ("Essay", 5, 2)])
+
+    def test_plan_tasks_parallel(self):
+        """
+        Testing if windows are planned concurrently, taking about as long as one window.
+        """
+        input_tasks = [params_to_input_task(f"Task {i}", str(2 + i % 20), "01", "2000", "NONE", "2") for i in range(40)]
+        with StubServer(content = "TASK Task 0 DATE 01 01 2000 DESC NONE PARTS 1 1", latency = 0.2) as server:
+            _clients["TEST KEY"] = ModelClient("TEST KEY", api_url = server.url)
+            try:
+                start = time.perf_counter()
+                schedule = plan_tasks_parallel("TEST KEY", input_tasks, self.today, max_tokens = 800, workers = 8)
+                elapsed = time.perf_counter() - start
+            finally:
+                _clients.pop("TEST KEY").close()
+            self.assertGreater(server.requests, 2)
+            self.assertLess(elapsed, 0.2 * 2)
+            self.assertEqual(len(schedule), server.requests)
+            self.assertNotIn("Busy:", server.last_body["messages"][-1]["content"])
+
+    def test_error_schedule_tasks(self):
+        """
+        Testing if a non-list or a list of non-InputTasks raises an error.
+        """
+        with self.assertRaises(SchedulerException):
+            schedule_tasks("NOT A LIST", self.today)
+        with self.assertRaises(SchedulerException):
+            schedule_tasks(self.input_tasks + ["NOT A TASK"], self.today)
+
+
+if __name__ == "__main__":
+    unittest.main()
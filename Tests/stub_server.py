@@ -0,0 +1,248 @@
+"""
+Module with a local stub of DeepSeek's chat completions endpoint for tests and benchmarks.
+"""
+
+
+
+import asyncio
+import json
+import socket
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+
+class _StubHandler(BaseHTTPRequestHandler):
+    """
+    Request handler that answers every POST with a canned chat completion.
+    """
+    # HTTP/1.1 keeps connections open between requests unless the client closes them
+    protocol_version = "HTTP/1.1"
+
+    def setup(self) -> None:
+        """
+        Count the new connection and simulate the handshake cost of a fresh connection.
+        """
+        super().setup()
+        # headers and body go out in separate writes, so don't let Nagle hold the body back
+        self.connection.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        stub = self.server.stub
+        with stub._lock:
+            stub._connections += 1
+        if stub.connect_latency:
+            time.sleep(stub.connect_latency)
+
+    def do_POST(self) -> None:
+        stub = self.server.stub
+        length = int(self.headers.get('Content-Length', 0))
+        body = json.loads(self.rfile.read(length) or b"{}")
+        with stub._lock:
+            stub._requests += 1
+            stub.last_body = body
+            # injected faults are used up one request at a time before falling back to status and latency
+            status = stub.statuses.pop(0) if stub.statuses else stub.status
+            latency = stub.latencies.pop(0) if stub.latencies else stub.latency
+
+        if latency:
+            time.sleep(latency)
+
+        if status == 200 and body.get("stream"):
+            self._stream(stub)
+            return
+
+        if status == 200 and stub.raw_body is not None:
+            payload = stub.raw_body
+        elif status == 200:
+            payload = json.dumps({"choices": [{"message": {"role": "assistant", "content": stub.content}}]}).encode()
+        else:
+            payload = json.dumps({"error": {"code": status}}).encode()
+        try:
+            self.send_response(status)
+            self.send_header('Content-Type', 'application/json')
+            self.send_header('Content-Length', str(len(payload)))
+            if status != 200 and stub.retry_after is not None:
+                self.send_header('Retry-After', str(stub.retry_after))
+            self.end_headers()
+            self.wfile.write(payload)
+        except (BrokenPipeError, ConnectionResetError):
+            # the client gave up waiting, e.g. after a read timeout
+            self.close_connection = True
+
+    def _stream(self, stub: "StubServer") -> None:
+        """
+        Send the content as a server-sent-events token stream using chunked transfer encoding.
+        """
+        def write_chunk(data: bytes) -> None:
+            self.wfile.write(f"{len(data):x}\r\n".encode() + data + b"\r\n")
+
+        try:
+            self.send_response(200)
+            self.send_header('Content-Type', 'text/event-stream')
+            self.send_header('Transfer-Encoding', 'chunked')
+            self.end_headers()
+            write_chunk(b": PROCESSING\n\n")
+            if stub.raw_body is not None:
+                write_chunk(b"data: " + stub.raw_body + b"\n\n")
+            for i in range(0, len(stub.content), stub.stream_chunk_size):
+                if stub.chunk_latency:
+                    time.sleep(stub.chunk_latency)
+                delta = {"choices": [{"delta": {"content": stub.content[i:i + stub.stream_chunk_size]}}]}
+                write_chunk(b"data: " + json.dumps(delta).encode() + b"\n\n")
+            write_chunk(b"data: [DONE]\n\n")
+            write_chunk(b"")
+        except (BrokenPipeError, ConnectionResetError):
+            self.close_connection = True
+
+    def log_message(self, format, *args) -> None:
+        # keep test and benchmark output quiet
+        pass
+
+
+class StubServer:
+    """
+    Local HTTP server that mimics DeepSeek's chat completions endpoint.
+
+    Runs on a background thread and records how many connections and requests it has seen.
+    """
+
+    def __init__(self, content: str = "", latency: float = 0.0, connect_latency: float = 0.0, status: int = 200) -> None:
+        """
+        Create a new StubServer that replies with content and the given status after waiting latency seconds.
+
+        connect_latency is added once per new connection to stand in for a TCP and TLS handshake. Faults are injected
+        by filling statuses and latencies, which override status and latency for the next requests in order, and
+        retry_after, which is sent as the Retry-After header of every error.
+        """
+        self.content = content
+        self.latency = latency
+        self.connect_latency = connect_latency
+        self.status = status
+        self.statuses = []
+        self.latencies = []
+        self.retry_after = None
+        # bytes sent as the body of successful replies, or as the first event of streamed ones, instead of content
+        self.raw_body = None
+        # streamed replies send the content in pieces of this many characters
+        self.stream_chunk_size = 8
+        self.chunk_latency = 0.0
+        self.last_body = None
+        self._lock = threading.Lock()
+        self._connections = 0
+        self._requests = 0
+        self._server = ThreadingHTTPServer(("127.0.0.1", 0), _StubHandler)
+        self._server.daemon_threads = True
+        self._server.stub = self
+        self._thread = None
+
+    @property
+    def url(self):
+        return f"http://127.0.0.1:{self._server.server_address[1]}/api/v1/chat/completions"
+
+    @property
+    def connections(self):
+        return self._connections
+
+    @property
+    def requests(self):
+        return self._requests
+
+    def start(self) -> "StubServer":
+        self._thread = threading.Thread(target = self._server.serve_forever, daemon = True)
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        self._server.shutdown()
+        self._server.server_close()
+
+    def __enter__(self) -> "StubServer":
+        return self.start()
+
+    def __exit__(self, *exc) -> None:
+        self.stop()
+
+
+class AsyncStubServer:
+    """
+    asyncio version of StubServer for testing async clients against slow responses.
+
+    Records the highest number of requests it was serving at the same time.
+    """
+
+    def __init__(self, content: str = "", latency: float = 0.0, status: int = 200) -> None:
+        """
+        Create a new AsyncStubServer that replies with content and the given status after waiting latency seconds.
+        """
+        self.content = content
+        self.latency = latency
+        self.status = status
+        # seconds sent in a Retry-After header with error statuses, if set
+        self.retry_after = None
+        # bytes sent as the body of a 200 reply instead of the content, if set
+        self.raw_body = None
+        self._requests = 0
+        self._active = 0
+        self._max_active = 0
+        self._cancelled = 0
+        self._runner = None
+        self._port = None
+
+    @property
+    def url(self):
+        return f"http://127.0.0.1:{self._port}/api/v1/chat/completions"
+
+    @property
+    def requests(self):
+        return self._requests
+
+    @property
+    def max_active(self):
+        return self._max_active
+
+    @property
+    def cancelled(self):
+        return self._cancelled
+
+    async def _handle(self, request):
+        from aiohttp import web
+
+        self._requests += 1
+        self._active += 1
+        self._max_active = max(self._max_active, self._active)
+        try:
+            await request.read()
+            if self.latency:
+                await asyncio.sleep(self.latency)
+            if self.status == 200 and self.raw_body is not None:
+                return web.Response(body = self.raw_body, content_type = "application/json")
+            if self.status == 200:
+                return web.json_response({"choices": [{"message": {"role": "assistant", "content": self.content}}]})
+            headers = {} if self.retry_after is None else {"Retry-After": str(self.retry_after)}
+            return web.json_response({"error": {"code": self.status}}, status = self.status, headers = headers)
+        except asyncio.CancelledError:
+            # aiohttp cancels the handler when the client goes away
+            self._cancelled += 1
+            raise
+        finally:
+            self._active -= 1
+
+    async def start(self) -> "AsyncStubServer":
+        from aiohttp import web
+
+        app = web.Application()
+        app.router.add_post("/api/v1/chat/completions", self._handle)
+        self._runner = web.AppRunner(app, handler_cancellation = True)
+        await self._runner.setup()
+        site = web.TCPSite(self._runner, "127.0.0.1", 0)
+        await site.start()
+        self._port = site._server.sockets[0].getsockname()[1]
+        return self
+
+    async def stop(self) -> None:
+        await self._runner.cleanup()
+
+    async def __aenter__(self) -> "AsyncStubServer":
+        return await self.start()
+
+    async def __aexit__(self, *exc) -> None:
+        await self.stop()
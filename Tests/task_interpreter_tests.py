@@ -4,6 +4,8 @@ import unittest
 import sys, os
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
 
+import datetime
+
 from planner.task_interpreter import *
 
 class InterpreterTests(unittest.TestCase):
@@ -80,6 +82,124 @@ class InterpreterTests(unittest.TestCase):
         self.assertEqual(str(test_list[1]), self.output_task2)
         self.assertEqual(str(test_list[2]), self.output_task3)
 
+    def test_lines_to_output_tasks_format(self):
+        """
+        Testing if the DATE keyword and uneven whitespace from the AI are accepted.
+        """
+        test_list = lines_to_output_tasks("TASK  Project\n1 DATE 26 07 2025 DESC NONE PARTS 1 4\nTASK Meeting DATE 23 07 2025 "
+                                          "DESC Multiple\tWords PARTS 1 1")
+        self.assertEqual(str(test_list[0]), self.output_task1)
+        self.assertEqual(str(test_list[1]), self.output_task3)
+
+    def test_stream_to_output_tasks(self):
+        """
+        Testing if a chunked OutputTask string is converted into the same OutputTasks no matter where it is split.
+        """
+        for size in (1, 3, 7, len(self.all_output_tasks)):
+            chunks = [self.all_output_tasks[i:i + size] for i in range(0, len(self.all_output_tasks), size)]
+            test_list = list(stream_to_output_tasks(chunks))
+            self.assertEqual([str(task) for task in test_list], [self.output_task1, self.output_task2, self.output_task3])
+
+    def test_output_task_stream_parser(self):
+        """
+        Testing if the stream parser returns each OutputTask as soon as the next one starts.
+        """
+        parser = OutputTaskStreamParser()
+        self.assertEqual(parser.feed(self.output_task1), [])
+        self.assertEqual(parser.feed(" TA"), [])
+        # a chunk ending in "TASK" could still be the start of a longer word
+        self.assertEqual(parser.feed("SK"), [])
+        test_list = parser.feed(" ")
+        self.assertEqual([str(task) for task in test_list], [self.output_task1])
+        self.assertEqual(parser.feed(self.output_task2[5:]), [])
+        self.assertEqual([str(task) for task in parser.close()], [self.output_task2])
+
+    def test_rows_to_input_tasks(self):
+        """
+        Testing if rows as tuples and dictionaries with ISO dates result in the same InputTasks as the parameters.
+        """
+        rows = [("Project 1", "2025-07-26", "NONE", "4"),
+                {"name": "NONE", "date": "2025-07-20", "desc": "Hello", "parts": 1},
+                {"name": "Meeting", "day": 23, "month": 7, "year": 2025, "desc": "Multiple Words", "parts": "1"}]
+        test_list, errors = rows_to_input_tasks(iter(rows))
+        self.assertEqual(errors, [])
+        self.assertEqual(' '.join(str(task) for task in test_list), self.all_input_tasks)
+        self.assertEqual(test_list[0], params_to_input_task("Project 1", "26", "07", "2025", "NONE", "4"))
+        self.assertEqual(iso_date_to_ordinal("2025-07-26"), datetime.date(2025, 7, 26).toordinal())
+
+    def test_rows_to_output_tasks(self):
+        """
+        Testing if rows of OutputTask parameters result in correct OutputTask objects.
+        """
+        test_list, errors = rows_to_output_tasks([("Project 1", datetime.date(2025, 7, 26), "NONE", 1, 4),
+                                                  ["NONE", "2025-07-20", "Hello", "1", "1"]])
+        self.assertEqual(errors, [])
+        self.assertEqual([str(task) for task in test_list], [self.output_task1, self.output_task2])
+
+    def test_error_rows_to_tasks(self):
+        """
+        Testing if every row with wrong parameters gives an error while the other rows still create Tasks.
+        """
+        test_list, errors = rows_to_input_tasks([("Project 1", "2025-02-30", "NONE", "A"),
+                                                 ("Project 2", "2025-07-26", "NONE", "4"),
+                                                 {"name": 1, "date": 20250726, "parts": "1"},
+                                                 ("Project 3", "2025-07-26"),
+                                                 "Project 4"])
+        self.assertEqual([str(task) for task in test_list], ["TASK Project 2 DUE 26 07 2025 DESC NONE PARTS 4"])
+        self.assertEqual([index for index, _ in errors], [0, 2, 3, 4])
+        self.assertIn("Date is not valid", errors[0][1])
+        self.assertIn("Parts is not an integer", errors[0][1])
+        self.assertEqual(errors[1][1], "Error when creating Task: Name is not a string; Date is not a string; "
+                                       "Description is not a string")
+        test_list, errors = rows_to_output_tasks([("Project 1", "2025-07-26", "NONE", "1", "B")])
+        self.assertEqual(errors, [(0, "Error when creating Task: Total Number of Parts is not an integer")])
+        with self.assertRaises(CreateTaskException):
+            rows_to_input_tasks("Project 1")
+        with self.assertRaises(CreateTaskException):
+            rows_to_input_tasks(None)
+
+    def test_offsets_to_output_tasks(self):
+        """
+        Testing if a compact reply of task ids and days is expanded into OutputTasks using the InputTasks.
+        """
+        input_tasks = [params_to_input_task("Project 1", "26", "07", "2025", "NONE", "2"),
+                       params_to_input_task("NONE", "20", "07", "2025", "Hello", "1"),
+                       params_to_input_task("Meeting", "23", "07", "2025", "Multiple Words", "1")]
+        today = datetime.date(2025, 7, 19)
+        expected = ["TASK Hello DUE 19 07 2025 DESC Hello PARTS 1 1",
+                    "TASK Meeting DUE 21 07 2025 DESC Multiple Words PARTS 1 1",
+                    "TASK Project 1 DUE 24 07 2025 DESC NONE PARTS 1 2",
+                    "TASK Project 1 DUE 25 07 2025 DESC NONE PARTS 2 2"]
+        for reply in ("3:2\n1:5,6\n2:0", '{"3": [2], "1": [5, 6], "2": [0]}', " 3 : 2 , 1:5, 6\n\n2:0 "):
+            self.assertEqual([str(task) for task in offsets_to_output_tasks(reply, input_tasks, today)], expected)
+        self.assertEqual(task_display_name(input_tasks[1]), "Hello")
+
+    def test_error_offsets_to_output_tasks(self):
+        """
+        Testing if a compact reply that is malformed, names unknown tasks, or gives days outside the due window raises
+        an error.
+        """
+        input_tasks = [params_to_input_task("Project 1", "26", "07", "2025", "NONE", "2")]
+        today = datetime.date(2025, 7, 19)
+        with self.assertRaises(TaskInterpreterException):
+            offsets_to_output_tasks("2:1", input_tasks)
+        for reply in ("1:-1", "1:7", "1:99999999", "1:99999999999", '{"1": [0, -99999999]}'):
+            with self.assertRaises(TaskInterpreterException):
+                offsets_to_output_tasks(reply, input_tasks, today)
+        self.assertEqual(len(offsets_to_output_tasks("1:0,6", input_tasks, today)), 2)
+        late = [params_to_input_task("Project 1", "18", "07", "2025", "NONE", "1")]
+        self.assertEqual(offsets_to_output_tasks("1:0", late, today)[0].date, today)
+        with self.assertRaises(TaskInterpreterException):
+            offsets_to_output_tasks("1:1", late, today)
+        with self.assertRaises(TaskInterpreterException):
+            offsets_to_output_tasks("1:1 TASK", input_tasks)
+        with self.assertRaises(TaskInterpreterException):
+            offsets_to_output_tasks('{"1": ["a"]}', input_tasks)
+        with self.assertRaises(TaskInterpreterException):
+            offsets_to_output_tasks('{"1": [1', input_tasks)
+        with self.assertRaises(CreateTaskException):
+            offsets_to_output_tasks(None, input_tasks)
+
     def test_error_params_to_input_task(self):
         """
         Testing if manually inserting wrong parameters to create an InputTask raises an error.
@@ -96,6 +216,8 @@ class InterpreterTests(unittest.TestCase):
             params_to_input_task("TEST", "01", "01", "2000", 1, "1")
         with self.assertRaises(CreateTaskException):
             params_to_input_task("TEST", "01", "01", "2000", "NONE", "A")
+        with self.assertRaises(CreateTaskException):
+            params_to_input_task("TEST", "31", "02", "2000", "NONE", "1")
 
     def test_error_tasks_to_lines(self):
         """
@@ -125,6 +247,8 @@ class InterpreterTests(unittest.TestCase):
             params_to_output_task("TEST", "01", "01", "2000", 1, "1", "2")
         with self.assertRaises(CreateTaskException):
             params_to_output_task("TEST", "01", "01", "2000", "NONE", "1", "A")
+        with self.assertRaises(CreateTaskException):
+            params_to_output_task("TEST", "01", "13", "2000", "NONE", "1", "2")
 
     def test_error_line_to_output_task(self):
         """
@@ -148,6 +272,18 @@ class InterpreterTests(unittest.TestCase):
         # invalid parts format
         with self.assertRaises(TaskInterpreterException):
             line_to_output_task("TASK TEST DUE 01 01 2000 1234 DESC NONE PARTS 1 2 3")
+        with self.assertRaisesRegex(TaskInterpreterException, "More values given to Parts"):
+            line_to_output_task("TASK TEST DUE 01 01 2000 DESC NONE PARTS 1 2 3")
+
+        # a date that does not exist
+        for line in ("TASK A DATE 31 02 2025 DESC NONE PARTS 1 1", "TASK A DATE 01 13 2025 DESC NONE PARTS 1 1",
+                     "TASK A DATE 01 01 99999999999999999999 DESC NONE PARTS 1 1"):
+            with self.assertRaisesRegex(CreateTaskException, "Date is not valid"):
+                line_to_output_task(line)
+            with self.assertRaises(CreateTaskException):
+                lines_to_output_tasks(self.output_task1 + " " + line)
+            with self.assertRaises(CreateTaskException):
+                list(stream_to_output_tasks([line]))
 
     def test_error_lines_to_output_tasks(self):
         """
@@ -156,6 +292,22 @@ class InterpreterTests(unittest.TestCase):
         with self.assertRaises(CreateTaskException):
             lines_to_output_tasks([self.output_task1, self.output_task2, self.output_task3])
 
+        # errors point at the offending part of the string
+        lines = self.output_task1 + " TASK TEST DUE 01 01 2000 DESC NONE PARTS 1 2 3"
+        with self.assertRaises(TaskInterpreterException) as context:
+            lines_to_output_tasks(lines)
+        self.assertEqual(context.exception.position, len(lines) - 1)
+        with self.assertRaises(TaskInterpreterException) as context:
+            lines_to_output_tasks(self.output_task1 + " TASK TEST DESC NONE PARTS 1 2")
+        self.assertEqual(context.exception.position, len(self.output_task1) + 1)
+
+        # text left after a complete task is not taken for text before the first task
+        with self.assertRaisesRegex(TaskInterpreterException, "after the end of a complete task") as context:
+            lines_to_output_tasks(self.output_task1 + " extra")
+        self.assertEqual(context.exception.position, len(self.output_task1) + 1)
+        with self.assertRaisesRegex(TaskInterpreterException, "before the first TASK"):
+            lines_to_output_tasks("extra " + self.output_task1)
+
 
 if __name__ == "__main__":
     unittest.main()
@@ -0,0 +1,143 @@
+import unittest
+
+# to allow easy test running in VSCode
+import sys, os
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+import datetime
+import tempfile
+import threading
+import time
+
+from planner.task import InputTask, OutputTask
+from planner.task_store import *
+
+class TaskStoreTests(unittest.TestCase):
+    """
+    Test cases for the task_store module.
+    """
+
+    def setUp(self):
+        """
+        Create a TaskStore on a temporary database file.
+        """
+        self.tmp = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.tmp.name, "planner.db")
+        self.store = TaskStore(self.path)
+        self.input_tasks = [InputTask("Project 1", 26, 7, 2025, "NONE", 4),
+                            InputTask("NONE", 20, 7, 2025, "Hello", 1),
+                            InputTask("Meeting", 23, 7, 2025, "Multiple Words", 1)]
+        self.schedule = [OutputTask("Project 1", day, 7, 2025, "NONE", part, 4) for part, day in enumerate(range(20, 24), 1)]
+
+    def tearDown(self):
+        self.store.close()
+        self.tmp.cleanup()
+
+    def test_input_tasks(self):
+        """
+        Testing if InputTasks are stored per user and read back by due date, one page at a time.
+        """
+        self.store.add_input_tasks("alice", self.input_tasks)
+        self.store.add_input_tasks("bob", self.input_tasks[:1])
+        self.assertEqual(self.store.get_input_tasks("alice"), sorted(self.input_tasks, key = lambda task: task.ordinal))
+        self.assertEqual(self.store.count_input_tasks("bob"), 1)
+        self.assertEqual([task.name for task in self.store.get_input_tasks("alice", limit = 2, offset = 1)],
+                         ["Meeting", "Project 1"])
+        self.assertEqual(self.store.get_input_tasks("carol"), [])
+
+        self.assertEqual(self.store.remove_input_tasks("alice", self.input_tasks[1:2]), 1)
+        self.assertEqual(self.store.count_input_tasks("alice"), 2)
+
+    def test_schedule(self):
+        """
+        Testing if schedules are stored per user and read back by date range.
+        """
+        self.store.add_output_tasks("alice", self.schedule)
+        self.assertEqual(self.store.get_schedule("alice"), self.schedule)
+        self.assertEqual(self.store.get_schedule("alice", datetime.date(2025, 7, 21), datetime.date(2025, 7, 23)),
+                         self.schedule[1:3])
+        self.assertEqual(self.store.get_schedule("alice", limit = 1, offset = 3), self.schedule[3:])
+        self.assertEqual(list(self.store.iter_schedule("alice", batch_size = 3)), self.schedule)
+        self.assertEqual(list(self.store.iter_schedule("alice", end = datetime.date(2025, 7, 22))), self.schedule[:2])
+
+        self.store.replace_schedule("alice", self.schedule[:1])
+        self.assertEqual(self.store.get_schedule("alice"), self.schedule[:1])
+        self.store.delete_user("alice")
+        self.assertEqual(self.store.get_schedule("alice"), [])
+
+    def test_schedule_copies(self):
+        """
+        Testing if each part of a page is read with the number of copies of it earlier in the whole schedule.
+        """
+        copies = [OutputTask("Project 1", 22, 7, 2025, "NONE", 1, 4), OutputTask("Project 1", 20, 7, 2025, "NONE", 3, 4)]
+        self.store.add_output_tasks("alice", self.schedule + copies)
+        self.store.add_output_tasks("bob", self.schedule)
+        schedule = self.store.get_schedule("alice")
+        counted = [(task, sum(earlier.part_num == task.part_num for earlier in schedule[:index]))
+                   for index, task in enumerate(schedule)]
+        self.assertEqual(self.store.get_schedule_copies("alice"), counted)
+        self.assertEqual([copies for _, copies in counted], [0, 0, 0, 1, 1, 0])
+        self.assertEqual(self.store.get_schedule_copies("alice", datetime.date(2025, 7, 22), limit = 2, offset = 1),
+                         counted[4:6])
+
+    def test_schedule_version(self):
+        """
+        Testing if every write to a user's schedule, and only to theirs, changes its version.
+        """
+        self.assertEqual(self.store.schedule_version("alice"), 0)
+        self.store.add_output_tasks("alice", self.schedule)
+        self.store.replace_schedule("alice", self.schedule[:1])
+        self.assertEqual(self.store.schedule_version("alice"), 2)
+        self.store.add_input_tasks("alice", self.input_tasks)
+        self.store.add_output_tasks("bob", self.schedule)
+        self.assertEqual(self.store.schedule_version("alice"), 2)
+        self.store.delete_user("alice")
+        self.assertEqual(self.store.schedule_version("alice"), 3)
+
+    def test_wait_for_version(self):
+        """
+        Testing if a wait for a new schedule version ends as soon as this store writes, or else after the timeout.
+        """
+        self.assertEqual(self.store.wait_for_version("alice", 0, 0.05), 0)
+        self.store.add_output_tasks("alice", self.schedule)
+        self.assertEqual(self.store.wait_for_version("alice", 0, 30), 1)
+
+        writer = threading.Timer(0.1, self.store.replace_schedule, ("alice", self.schedule[:1]))
+        start = time.monotonic()
+        writer.start()
+        # a write for another user wakes the wait, which goes on waiting for alice
+        other = threading.Timer(0.05, self.store.add_output_tasks, ("bob", self.schedule))
+        other.start()
+        self.assertEqual(self.store.wait_for_version("alice", 1, 30), 2)
+        self.assertLess(time.monotonic() - start, 5)
+        writer.join()
+        other.join()
+
+    def test_shared_database(self):
+        """
+        Testing if writes are seen by other threads and by a second store on the same file, as another worker would be.
+        """
+        self.store.add_input_tasks("alice", self.input_tasks)
+        other = TaskStore(self.path)
+        self.assertEqual(other.count_input_tasks("alice"), 3)
+        other.close()
+
+        counts = []
+        thread = threading.Thread(target = lambda: counts.append(self.store.count_input_tasks("alice")))
+        thread.start()
+        thread.join()
+        self.assertEqual(counts, [3])
+
+    def test_error_add(self):
+        """
+        Testing if storing objects of the wrong type raises an error and stores nothing.
+        """
+        with self.assertRaises(TaskStoreException):
+            self.store.add_input_tasks("alice", self.input_tasks + ["NOT A TASK"])
+        self.assertEqual(self.store.count_input_tasks("alice"), 0)
+        with self.assertRaises(TaskStoreException):
+            self.store.add_output_tasks("alice", self.input_tasks)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,74 @@
+import unittest
+
+# to allow easy test running in VSCode
+import sys, os
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+import datetime
+
+from planner.task import OutputTask
+from planner.task_table import *
+
+class TaskTableTests(unittest.TestCase):
+    """
+    Test cases for the task_table module.
+    """
+
+    def setUp(self):
+        """
+        Create an unsorted schedule of OutputTasks for testing.
+        """
+        self.schedule = [OutputTask("Study", 3, 1, 2000, "History Quiz", 3, 3),
+                         OutputTask("Study", 1, 1, 2000, "History Quiz", 1, 3),
+                         OutputTask("Reading", 1, 1, 2000, "NONE", 1, 1),
+                         OutputTask("Study", 2, 1, 2000, "History Quiz", 2, 3),
+                         OutputTask("Math", 3, 1, 2000, "NONE", 1, 1)]
+        self.table = TaskTable.from_output_tasks(self.schedule)
+
+    def test_round_trip(self):
+        """
+        Testing if a schedule converts to a TaskTable and back in date order.
+        """
+        self.assertEqual(len(self.table), 5)
+        self.assertEqual(self.table.names, ["Study", "Reading", "Math"])
+        self.assertEqual(self.table.to_output_tasks(), sorted(self.schedule, key = lambda task: task.ordinal))
+
+    def test_day_counts(self):
+        """
+        Testing if parts are counted per day and overloaded days are found.
+        """
+        self.assertEqual(self.table.day_counts(), {datetime.date(2000, 1, 1): 2, datetime.date(2000, 1, 2): 1,
+                                                   datetime.date(2000, 1, 3): 2})
+        self.assertEqual(self.table.overloaded_days(1), [datetime.date(2000, 1, 1), datetime.date(2000, 1, 3)])
+        self.assertEqual(self.table.overloaded_days(2), [])
+
+    def test_filters(self):
+        """
+        Testing if date range and name filters keep only matching parts.
+        """
+        week = self.table.filter_dates(datetime.date(2000, 1, 2), datetime.date(2000, 1, 3))
+        self.assertEqual([str(task) for task in week.to_output_tasks()], [str(self.schedule[3])])
+        self.assertEqual(len(self.table.filter_dates(end = datetime.date(2000, 1, 2))), 2)
+        self.assertEqual(len(self.table.filter_dates(datetime.date(2000, 1, 5))), 0)
+        self.assertEqual([task.part_num for task in self.table.filter_name("Study").to_output_tasks()], [1, 2, 3])
+
+    def test_concat(self):
+        """
+        Testing if tables from several users combine with shared name and description ids.
+        """
+        other = TaskTable.from_output_tasks([OutputTask("Math", 2, 1, 2000, "NONE", 1, 1)])
+        combined = TaskTable.concat([self.table, other])
+        self.assertEqual(len(combined), 6)
+        self.assertEqual(combined.names, ["Study", "Reading", "Math"])
+        self.assertEqual(combined.day_counts()[datetime.date(2000, 1, 2)], 2)
+
+    def test_error_from_output_tasks(self):
+        """
+        Testing if building a TaskTable from non-OutputTasks raises an error.
+        """
+        with self.assertRaises(TaskTableException):
+            TaskTable.from_output_tasks(["NOT A TASK"])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,56 @@
+import unittest
+
+# to allow easy test running in VSCode
+import sys, os
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+import datetime
+
+from planner.task import *
+from planner.task_interpreter import lines_to_output_tasks
+
+class TaskTests(unittest.TestCase):
+    """
+    Test cases for the task module.
+    """
+
+    def test_date(self):
+        """
+        Testing if the packed date gives back the day, month, and year it was created with.
+        """
+        task = OutputTask("Project 1", 26, 7, 2025, "NONE", 1, 4)
+        self.assertEqual((task.day, task.month, task.year), (26, 7, 2025))
+        self.assertEqual(task.ordinal, datetime.date(2025, 7, 26).toordinal())
+        self.assertEqual(str(OutputTask.from_ordinal("Project 1", task.ordinal, "NONE", 1, 4)), str(task))
+        with self.assertRaises(ValueError):
+            InputTask("Project 1", 29, 2, 2025, "NONE", 1)
+
+    def test_slots(self):
+        """
+        Testing if Tasks do not carry an instance dictionary.
+        """
+        self.assertFalse(hasattr(InputTask("Project 1", 26, 7, 2025, "NONE", 4), "__dict__"))
+        self.assertFalse(hasattr(OutputTask("Project 1", 26, 7, 2025, "NONE", 1, 4), "__dict__"))
+
+    def test_interned_strings(self):
+        """
+        Testing if parts of the same task share one name and description string.
+        """
+        first, second = lines_to_output_tasks("TASK Study DUE 01 01 2000 DESC History Quiz PARTS 1 2 "
+                                              "TASK Study DUE 02 01 2000 DESC History Quiz PARTS 2 2")
+        self.assertIs(first.name, second.name)
+        self.assertIs(first.desc, second.desc)
+
+    def test_ordering_and_hashing(self):
+        """
+        Testing if Tasks sort by date and equal Tasks deduplicate.
+        """
+        late = OutputTask("A", 3, 1, 2000, "NONE", 2, 2)
+        early = OutputTask("B", 1, 1, 2000, "NONE", 1, 1)
+        self.assertEqual(sorted([late, early]), [early, late])
+        self.assertEqual(len({late, early, OutputTask("A", 3, 1, 2000, "NONE", 2, 2)}), 2)
+        self.assertNotEqual(OutputTask("A", 3, 1, 2000, "NONE", 1, 1), InputTask("A", 3, 1, 2000, "NONE", 1))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,127 @@
+import unittest
+
+# to allow easy test running in VSCode
+import sys, os
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+import datetime
+
+from planner.metrics import INVALID_PARTS
+from planner.scheduler import schedule_tasks
+from planner.task import InputTask, OutputTask
+from planner.validator import *
+
+class ValidatorTests(unittest.TestCase):
+    """
+    Test cases for the validator module.
+    """
+
+    def setUp(self):
+        """
+        Create InputTasks and a valid schedule of them for testing.
+        """
+        self.today = datetime.date(2000, 1, 1)
+        self.input_tasks = [InputTask("Math Homework", 8, 1, 2000, "NONE", 1),
+                            InputTask("Reading Homework", 5, 1, 2000, "NONE", 2),
+                            InputTask("NONE", 15, 1, 2000, "Book report", 3)]
+        self.schedule = [OutputTask("Reading Homework", 1, 1, 2000, "NONE", 1, 2),
+                         OutputTask("Reading Homework", 2, 1, 2000, "NONE", 2, 2),
+                         OutputTask("Math Homework", 3, 1, 2000, "NONE", 1, 1),
+                         OutputTask("Book Report", 4, 1, 2000, "Book report", 1, 3),
+                         OutputTask("Book Report", 5, 1, 2000, "Book report", 2, 3),
+                         OutputTask("Book Report", 6, 1, 2000, "Book report", 3, 3)]
+
+    def test_valid_schedule(self):
+        """
+        Testing if a valid schedule, even with a model-chosen name for an unnamed task, has no problems.
+        """
+        report = validate_schedule(self.schedule, self.input_tasks, self.today)
+        self.assertTrue(report.ok)
+        self.assertEqual(report.max_load, 1)
+        self.assertEqual(report.load_mean, 1.0)
+        self.assertEqual(report.load_variance, 0.0)
+        self.assertTrue(validate_schedule(schedule_tasks(self.input_tasks, self.today), self.input_tasks,
+                                          self.today).ok)
+
+    def test_same_named_tasks(self):
+        """
+        Testing if two InputTasks with the same name and description each get their own parts.
+        """
+        input_tasks = [InputTask("Essay", 5, 1, 2000, "NONE", 2), InputTask("Essay", 9, 1, 2000, "NONE", 2)]
+        schedule = schedule_tasks(input_tasks, self.today)
+        report = validate_schedule(schedule, input_tasks, self.today)
+        self.assertTrue(report.ok, report.problem_counts())
+
+        report = validate_schedule(schedule + schedule[:1], input_tasks, self.today)
+        self.assertEqual(report.problem_counts()["duplicate"], 1)
+        report = validate_schedule(schedule[1:], input_tasks, self.today)
+        self.assertEqual(report.problem_counts()["missing"], 1)
+
+    def test_problems(self):
+        """
+        Testing if every kind of problem is found and counted.
+        """
+        schedule = [OutputTask("Reading Homework", 1, 1, 2000, "NONE", 1, 2),
+                    OutputTask("Reading Homework", 5, 1, 2000, "NONE", 2, 2),
+                    OutputTask("Math Homework", 3, 1, 2000, "NONE", 1, 2),
+                    OutputTask("Book Report", 31, 12, 1999, "Book report", 1, 3),
+                    OutputTask("Book Report", 5, 1, 2000, "Book report", 1, 3),
+                    OutputTask("Book Report", 6, 1, 2000, "Book report", 4, 3),
+                    OutputTask("Ghost Task", 2, 1, 2000, "NONE", 1, 1)]
+        report = validate_schedule(schedule, self.input_tasks, self.today)
+        self.assertFalse(report.ok)
+        self.assertEqual(report.problem_counts(), {"unknown": 1, "duplicate": 1, "extra": 1, "wrong_total": 1,
+                                                   "late": 1, "past": 1, "missing": 2})
+        self.assertEqual(report.unknown, [schedule[6]])
+        self.assertEqual(report.late, [schedule[1]])
+        self.assertEqual(report.past, [schedule[3]])
+        self.assertEqual(report.missing, [(self.input_tasks[2], 2), (self.input_tasks[2], 3)])
+        self.assertEqual(report.to_dict()["missing"][0]["part_num"], 2)
+
+    def test_load_variance(self):
+        """
+        Testing if the load of every day from today to the last part is counted, including empty days.
+        """
+        schedule = [OutputTask("Book Report", 1, 1, 2000, "Book report", 1, 3),
+                    OutputTask("Book Report", 1, 1, 2000, "Book report", 2, 3),
+                    OutputTask("Book Report", 3, 1, 2000, "Book report", 3, 3)]
+        report = validate_schedule(schedule, self.input_tasks[2:], self.today)
+        self.assertTrue(report.ok)
+        self.assertEqual(report.max_load, 2)
+        self.assertEqual(report.load_mean, 1.0)
+        self.assertAlmostEqual(report.load_variance, 2 / 3)
+
+    def test_repair(self):
+        """
+        Testing if a repaired schedule is valid and keeps the parts of tasks that had no problems.
+        """
+        schedule = self.schedule[:1] + self.schedule[2:]
+        schedule[1] = OutputTask("Math Homework", 20, 1, 2000, "NONE", 1, 1)
+        schedule.append(OutputTask("Ghost Task", 2, 1, 2000, "NONE", 1, 1))
+        before = INVALID_PARTS.value(problem = "unknown")
+
+        repaired, report = repair_schedule(schedule, self.input_tasks, self.today)
+        self.assertEqual(report.problem_counts(), {"unknown": 1, "duplicate": 0, "extra": 0, "wrong_total": 0,
+                                                   "late": 1, "past": 0, "missing": 1})
+        self.assertTrue(validate_schedule(repaired, self.input_tasks, self.today).ok)
+        for task in self.schedule[3:]:
+            self.assertIn(task, repaired)
+        self.assertEqual(INVALID_PARTS.value(problem = "unknown"), before + 1)
+
+        repaired, report = repair_schedule(self.schedule, self.input_tasks, self.today)
+        self.assertTrue(report.ok)
+        self.assertEqual(repaired, self.schedule)
+
+    def test_validator_exceptions(self):
+        """
+        Testing if the validator raises an exception when the lists are not of tasks.
+        """
+        with self.assertRaises(ValidatorException):
+            validate_schedule(None, self.input_tasks, self.today)
+        with self.assertRaises(ValidatorException):
+            validate_schedule(self.schedule, ["Math Homework"], self.today)
+        with self.assertRaises(ValidatorException):
+            repair_schedule(["Math Homework"], self.input_tasks, self.today)
+
+if __name__ == '__main__':
+    unittest.main()
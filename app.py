@@ -1,33 +1,407 @@
-from flask import Flask, request, render_template
-from planner import params_to_input_task
+import cProfile
+import datetime
+import hashlib
+import io
+import json
+import logging
+import os
+import pstats
+import time
+import uuid
+from concurrent.futures import TimeoutError as FutureTimeoutError
+
+from flask import Flask, Response, g, jsonify, request, render_template, session, stream_with_context, url_for
+from itsdangerous import BadSignature, URLSafeSerializer
+from planner import rows_to_input_tasks, input_tasks_to_lines, ask_model_stream, stream_to_output_tasks
+from planner import place_new_tasks
+from planner import task_to_dict, make_cache_key, MODEL_NAME, SYSTEM_PROMPT, TaskStore, DateIndex
+from planner import APIException, CreateTaskException, TaskInterpreterException
+from planner import EXPORT_FORMATS, iter_chunks, schedule_hash, part_key, key_parts, part_id, diff_keyed_parts
+from planner.batch_dispatcher import get_planning_batcher
+from planner.compression import ENCODINGS, MIN_SIZE, compress, compress_chunks
+from planner.job_queue import JobQueue, QueueFullException
+from planner.metrics import REGISTRY, STAGE_SECONDS
+from planner.validator import repair_schedule
+
+class JsonFormatter(logging.Formatter):
+    # every attribute a LogRecord has before any extra fields are added to it
+    reserved = set(vars(logging.LogRecord('', 0, '', 0, '', (), None))) | {'message', 'asctime'}
+
+    def format(self, record):
+        entry = {'time': self.formatTime(record), 'level': record.levelname, 'logger': record.name,
+                 'message': record.getMessage()}
+        entry.update((key, value) for key, value in vars(record).items() if key not in self.reserved)
+        if record.exc_info:
+            entry['exception'] = self.formatException(record.exc_info)
+        return json.dumps(entry, default = str)
+
+logHandler = logging.StreamHandler()
+logHandler.setFormatter(JsonFormatter())
+logger = logging.getLogger('planner.app')
+logger.addHandler(logHandler)
+logger.setLevel(os.environ.get('PLANNER_LOG_LEVEL', 'INFO'))
+
+# with PLANNER_PROFILE set, any request with ?profile=1 is run under cProfile and its hottest functions are logged
+profilingEnabled = bool(os.environ.get('PLANNER_PROFILE'))
+profileDir = os.environ.get('PLANNER_PROFILE_DIR')
 
 app = Flask(__name__)
+# every worker process has to share the secret key, or sessions only work on the worker that created them
+app.secret_key = os.environ.get('FLASK_SECRET_KEY') or os.urandom(24)
+
+# the model answers with only the days of each task's parts unless PLANNER_COMPACT_OUTPUT is 0
+compactOutput = os.environ.get('PLANNER_COMPACT_OUTPUT', '1') != '0'
+
+# seconds a planning job waits for its batch before it fails
+planTimeout = float(os.environ.get('PLANNER_PLAN_TIMEOUT', 300))
 
-inputTaskList = []
+# calendar clients cannot send the session cookie, so their feed URLs carry the user signed with the secret key
+feedSigner = URLSafeSerializer(app.secret_key, salt = 'calendar-feed')
+
+# tasks and schedules of every user, shared by all worker processes
+taskStore = TaskStore(os.environ.get('PLANNER_DB', 'planner.db'))
+
+# planning runs in the background so that no request handler waits on the model
+jobQueue = JobQueue(workers = int(os.environ.get('PLANNER_WORKERS', 4)),
+                    max_pending = int(os.environ.get('PLANNER_MAX_QUEUE', 32)),
+                    use_processes = os.environ.get('PLANNER_EXECUTOR', 'thread') == 'process')
 
 @app.route('/', methods = ['POST', 'GET'])
 def index():
     if request.method == 'POST':
-        # get all task information from one form
-        taskName = request.form.get('addName')
-        taskDate = request.form.get('addDate')
-        taskDesc = request.form.get('addDesc')
-        taskParts = request.form.get('addParts')
+        with STAGE_SECONDS.time(stage = 'form_parse'):
+            # get all task information from one form
+            taskName = request.form.get('addName')
+            taskDate = request.form.get('addDate')
+            taskDesc = request.form.get('addDesc')
+            taskParts = request.form.get('addParts')
+
+            # create an InputTask from form data, whose date comes in ISO format
+            inputTasks, errors = rows_to_input_tasks([(taskName, taskDate, taskDesc, taskParts)])
+        if errors:
+            return jsonify(error = errors[0][1]), 400
+        add_tasks(current_user(), inputTasks)
 
-        print(taskName, taskDate, taskDesc, taskParts)
+    return render_template('index.html')
 
-        # process date info
-        taskYear, taskMonth, taskDay = taskDate.split('-')
+def add_tasks(userId, inputTasks):
+    # add the InputTasks to the session's task list
+    lastDue = max(inputTask.date for inputTask in inputTasks)
+    logger.info('tasks added', extra = {'user': userId, 'tasks': len(inputTasks), 'due': lastDue.isoformat(),
+                                        'parts': sum(inputTask.parts for inputTask in inputTasks)})
+    with STAGE_SECONDS.time(stage = 'storage'):
+        taskStore.add_input_tasks(userId, inputTasks)
 
-        # create an InputTask from form data
-        inputTask = params_to_input_task(taskName, taskDay, taskMonth, taskYear, taskDesc, taskParts)
-        print(inputTask)
+        # place only the new tasks' parts around the part of the schedule before the last due date
+        today = datetime.date.today()
+        window = taskStore.get_schedule(userId, today, lastDue)
+        taskStore.add_output_tasks(userId, place_new_tasks(window, inputTasks, today))
 
-        # add this InputTask to the session's task list
-        inputTaskList.append(inputTask)
-        print(inputTaskList)
+def current_user():
+    # give every browser session its own task list
+    if 'user' not in session:
+        session['user'] = uuid.uuid4().hex
+    return session['user']
 
-    return render_template('index.html')
+def plan_and_store(apiKey, userId, taskList):
+    # plans from users who ask at about the same time share one model call
+    # a job that never hears back would hold its worker and its job key forever, filling the queue
+    schedule = get_planning_batcher(apiKey, compactOutput).submit(taskList).result(timeout = planTimeout)
+    with STAGE_SECONDS.time(stage = 'storage'):
+        taskStore.replace_schedule(userId, schedule)
+    logger.info('schedule planned', extra = {'user': userId, 'tasks': len(taskList), 'parts': len(schedule)})
+    return schedule
+
+@app.route('/plan/stream')
+def plan_stream():
+    apiKey = os.environ.get('DEEPSEEK_API_KEY')
+    if not apiKey:
+        return 'No API key configured.', 503
+    userId = current_user()
+    taskList = taskStore.get_input_tasks(userId)
+    if not taskList:
+        return 'No tasks to plan.', 400
+
+    query = input_tasks_to_lines(taskList)
+
+    def generate():
+        # push each OutputTask to the browser as soon as the model finishes writing it
+        schedule = []
+        try:
+            for outputTask in stream_to_output_tasks(ask_model_stream(apiKey, query)):
+                schedule.append(outputTask)
+                yield f"data: {outputTask}\n\n"
+            # the browser has seen the raw parts, but only a schedule that fits the tasks is kept
+            schedule, report = repair_schedule(schedule, taskList)
+            if not report.ok:
+                logger.warning('streamed schedule repaired', extra = {'user': userId, **report.problem_counts()})
+            with STAGE_SECONDS.time(stage = 'storage'):
+                taskStore.replace_schedule(userId, schedule)
+        except (APIException, CreateTaskException, TaskInterpreterException) as e:
+            logger.warning('streamed planning failed', extra = {'user': userId, 'error': str(e)})
+            yield f"event: error\ndata: {e}\n\n"
+        yield "event: done\ndata: \n\n"
+
+    return Response(stream_with_context(generate()), mimetype = 'text/event-stream')
+
+@app.route('/plan', methods = ['POST'])
+def plan():
+    apiKey = os.environ.get('DEEPSEEK_API_KEY')
+    if not apiKey:
+        return jsonify(error = 'No API key configured.'), 503
+    userId = current_user()
+    taskList = taskStore.get_input_tasks(userId)
+    if not taskList:
+        return jsonify(error = 'No tasks to plan.'), 400
+
+    # identical task lists from the same user share one job while it is unfinished
+    jobKey = userId + make_cache_key(MODEL_NAME, SYSTEM_PROMPT, input_tasks_to_lines(taskList))
+    try:
+        job = jobQueue.submit(jobKey, plan_and_store, apiKey, userId, taskList)
+    except QueueFullException as e:
+        logger.warning('planning queue full', extra = {'user': userId, 'pending': jobQueue.pending})
+        return jsonify(error = str(e)), 429, {'Retry-After': '1'}
+
+    return jsonify(job_id = job.job_id, status = job.status), 202
+
+def job_to_dict(job):
+    result = {'job_id': job.job_id, 'status': job.status}
+    if job.status == 'done':
+        result['tasks'] = [task_to_dict(task) for task in job.result()]
+    elif job.status == 'failed':
+        result['error'] = str(job.error())
+    return result
+
+@app.route('/jobs/<job_id>')
+def job_status(job_id):
+    job = jobQueue.get(job_id)
+    if job is None:
+        return jsonify(error = 'Unknown job.'), 404
+    return jsonify(job_to_dict(job))
+
+@app.route('/jobs/<job_id>/stream')
+def job_stream(job_id):
+    job = jobQueue.get(job_id)
+    if job is None:
+        return jsonify(error = 'Unknown job.'), 404
+
+    def generate():
+        # comment lines keep the connection open until the job finishes
+        while True:
+            try:
+                job.result(timeout = 15)
+                break
+            except FutureTimeoutError:
+                yield ": waiting\n\n"
+            except Exception:
+                break
+        yield f"data: {json.dumps(job_to_dict(job))}\n\n"
+
+    return Response(stream_with_context(generate()), mimetype = 'text/event-stream')
+
+def export_response(userId, fmt):
+    if fmt not in EXPORT_FORMATS:
+        return 'Unknown export format.', 404
+    lines, mimetype = EXPORT_FORMATS[fmt]
+
+    # hashing the stored parts is much cheaper than rendering them, so unchanged schedules are never rendered
+    with STAGE_SECONDS.time(stage = 'export_hash'):
+        etag = f"{fmt}-{schedule_hash(taskStore.iter_schedule(userId))}"
+    # each encoding of the file is a different set of bytes, so it gets its own tag
+    encoding = request.accept_encodings.best_match(ENCODINGS)
+    if encoding:
+        etag = f"{etag}-{encoding}"
+    if request.if_none_match.contains(etag):
+        response = Response(status = 304)
+    else:
+        # stream the file in chunks straight from the database instead of building it in memory
+        chunks = iter_chunks(lines(taskStore.iter_schedule(userId)))
+        if encoding:
+            chunks = compress_chunks(chunks, encoding)
+        response = Response(stream_with_context(chunks), mimetype = mimetype)
+        response.headers['Content-Disposition'] = f'attachment; filename=schedule.{fmt}'
+        if encoding:
+            response.headers['Content-Encoding'] = encoding
+    response.set_etag(etag)
+    response.vary.add('Accept-Encoding')
+    response.headers['Cache-Control'] = 'no-cache'
+    return response
+
+@app.route('/export/schedule.<fmt>')
+def export_schedule(fmt):
+    return export_response(current_user(), fmt)
+
+@app.route('/export/feed')
+def export_feed():
+    token = feedSigner.dumps(current_user())
+    return jsonify({fmt: url_for('calendar_feed', token = token, fmt = fmt, _external = True) for fmt in EXPORT_FORMATS})
+
+@app.route('/export/feed/<token>.<fmt>')
+def calendar_feed(token, fmt):
+    try:
+        userId = feedSigner.loads(token)
+    except BadSignature:
+        return 'Unknown feed.', 404
+    return export_response(userId, fmt)
+
+# pages of the schedule API hold at most this many parts
+defaultPageSize = 200
+maxPageSize = 1000
+
+# schedule streams wake as soon as this process writes a schedule, check for writes by other processes this often, in
+# seconds, and end after streamLifetime
+# each open stream holds a worker thread while it waits, so serve the app with threads (gunicorn -k gthread) or gevent
+# workers, with enough of them for every open page on top of ordinary requests
+streamPollInterval = float(os.environ.get('PLANNER_STREAM_POLL', 5))
+streamLifetime = 300
+
+def json_error(message, status, **extra):
+    return jsonify(error = message, **extra), status
+
+@app.route('/api/tasks', methods = ['POST'])
+def api_add_tasks():
+    # the body is one task, or a list of tasks that are all added together
+    body = request.get_json(silent = True)
+    single = isinstance(body, dict)
+    items = [body] if single else body
+    if not isinstance(items, list) or not items or not all(isinstance(item, dict) for item in items):
+        return json_error('Expected a task or a list of tasks as JSON.', 400)
+
+    with STAGE_SECONDS.time(stage = 'form_parse'):
+        # a task without a description or parts has none and is done in one part, as in the form
+        rows = [(item.get('name'), item.get('date'), item.get('desc') or 'NONE', item.get('parts', 1)) for item in items]
+        inputTasks, errors = rows_to_input_tasks(rows)
+    if errors:
+        return json_error(errors[0][1], 400, errors = [{'index': index, 'error': message} for index, message in errors])
+    add_tasks(current_user(), inputTasks)
+
+    created = [task_to_dict(task) for task in inputTasks]
+    return jsonify(created[0] if single else created), 201
+
+def date_arg(name):
+    value = request.args.get(name)
+    return None if value is None else datetime.date.fromisoformat(value)
+
+@app.route('/api/schedule')
+def api_schedule():
+    # one page of the parts dated from start up to but not including end
+    try:
+        start = date_arg('start')
+        end = date_arg('end')
+        limit = request.args.get('limit', defaultPageSize, type = int)
+        offset = request.args.get('offset', 0, type = int)
+    except ValueError:
+        return json_error('Dates must be in YYYY-MM-DD format.', 400)
+    if not 1 <= limit <= maxPageSize or offset < 0:
+        return json_error(f'limit must be from 1 to {maxPageSize} and offset must not be negative.', 400)
+
+    # reading one part more than the page shows whether another page follows
+    with STAGE_SECONDS.time(stage = 'storage'):
+        schedule = taskStore.get_schedule_copies(current_user(), start, end, limit = limit + 1, offset = offset)
+    nextOffset = offset + limit if len(schedule) > limit else None
+    # each part carries the key that the schedule stream uses for it, with its copies counted over the whole schedule
+    tasks = [{'id': part_id(part_key(task, copies)), **task_to_dict(task)} for task, copies in schedule[:limit]]
+    return jsonify(start = start and start.isoformat(), end = end and end.isoformat(), offset = offset,
+                   next_offset = nextOffset, tasks = tasks)
+
+@app.route('/api/schedule/loads')
+def api_schedule_loads():
+    # the number of parts on each day from start up to but not including end, and the days with more than over parts
+    try:
+        start = date_arg('start')
+        end = date_arg('end')
+    except ValueError:
+        return json_error('Dates must be in YYYY-MM-DD format.', 400)
+    over = request.args.get('over', type = int)
+
+    with STAGE_SECONDS.time(stage = 'storage'):
+        index = DateIndex(taskStore.iter_schedule(current_user(), start, end))
+    result = {'loads': {datetime.date.fromordinal(day).isoformat(): load for day, load in index.day_loads().items()}}
+    if over is not None:
+        result['busy'] = [datetime.date.fromordinal(day).isoformat() for day in index.busy_days(over)]
+    return jsonify(result)
+
+@app.route('/api/schedule/stream')
+def api_schedule_stream():
+    userId = current_user()
+
+    def generate():
+        # the version is read before the schedule, so a write between the two is still seen on the next check
+        version = taskStore.schedule_version(userId)
+        parts = key_parts(taskStore.iter_schedule(userId))
+        # the browser reloads what it shows once the stream is open, and from then on only receives what changed
+        yield f"retry: 1000\n: version {version}\n\n"
+
+        # the stream ends after a while so that it never holds a worker forever, and the browser reconnects
+        deadline = time.monotonic() + streamLifetime
+        lastSent = time.monotonic()
+        while time.monotonic() < deadline:
+            # sleep until a write, but no longer than the next check for other processes, keep-alive, or the end
+            now = time.monotonic()
+            timeout = min(streamPollInterval, lastSent + 15 - now, deadline - now)
+            latest = taskStore.wait_for_version(userId, version, timeout)
+            if latest != version:
+                version = latest
+                latestParts = key_parts(taskStore.iter_schedule(userId))
+                diff = diff_keyed_parts(parts, latestParts)
+                parts = latestParts
+                if diff:
+                    yield f"id: {version}\nevent: diff\ndata: {json.dumps(diff.to_dict())}\n\n"
+                    lastSent = time.monotonic()
+            # comment lines keep proxies from closing a quiet connection
+            if time.monotonic() - lastSent >= 15:
+                yield ": waiting\n\n"
+                lastSent = time.monotonic()
+
+    return Response(stream_with_context(generate()), mimetype = 'text/event-stream',
+                    headers = {'Cache-Control': 'no-cache'})
+
+@app.after_request
+def compress_response(response):
+    # JSON answers are small enough to hash and compress whole, while streams are compressed where they are made
+    if response.is_streamed or response.mimetype != 'application/json' or 'Content-Encoding' in response.headers:
+        return response
+    data = response.get_data()
+
+    if request.method == 'GET' and response.status_code == 200:
+        # the tag is weak because gzip and brotli bodies of the same JSON are equivalent but not byte for byte equal
+        etag = hashlib.blake2b(data, digest_size = 16).hexdigest()
+        if request.if_none_match.contains_weak(etag):
+            response = Response(status = 304)
+            response.set_etag(etag, weak = True)
+            return response
+        response.set_etag(etag, weak = True)
+        response.headers['Cache-Control'] = 'no-cache'
+
+    response.vary.add('Accept-Encoding')
+    encoding = request.accept_encodings.best_match(ENCODINGS)
+    if encoding and len(data) >= MIN_SIZE:
+        with STAGE_SECONDS.time(stage = 'compress'):
+            response.set_data(compress(data, encoding))
+        response.headers['Content-Encoding'] = encoding
+    return response
+
+@app.route('/metrics')
+def metrics():
+    return Response(REGISTRY.render(), mimetype = 'text/plain; version=0.0.4')
+
+@app.before_request
+def start_profile():
+    if profilingEnabled and request.args.get('profile'):
+        g.profiler = cProfile.Profile()
+        g.profiler.enable()
+
+@app.after_request
+def stop_profile(response):
+    profiler = g.pop('profiler', None)
+    if profiler is not None:
+        profiler.disable()
+        stats = io.StringIO()
+        pstats.Stats(profiler, stream = stats).sort_stats('cumulative').print_stats(25)
+        logger.info('request profile', extra = {'path': request.path, 'profile': stats.getvalue()})
+        if profileDir:
+            profiler.dump_stats(os.path.join(profileDir, f"{time.strftime('%Y%m%d-%H%M%S')}-{request.endpoint}.prof"))
+    return response
 
 if __name__ == '__main__':
-    app.run(debug=True)
\ No newline at end of file
+    app.run(debug=True)
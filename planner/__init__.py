@@ -1,6 +1,85 @@
 """
 Importing all relevant Python modules for the Planner.
+
+Modules are only imported when one of their names is first used (PEP 562), so a process that only parses Tasks never
+loads the model client and its HTTP libraries.
 """
 
-from planner.deepseek_processor import *
-from planner.task_interpreter import *
\ No newline at end of file
+import importlib
+from typing import TYPE_CHECKING
+
+# the names each module exports, which must match the module's __all__
+_EXPORTS = {
+    "async_processor": ("AsyncModelClient", "get_async_model_client", "ask_model_async"),
+    "batch_dispatcher": ("BatchDispatcherException", "build_batch_query", "split_batch_reply", "PlanningBatcher",
+                         "get_planning_batcher", "BATCH_SYSTEM_PROMPT", "COMPACT_BATCH_SYSTEM_PROMPT"),
+    "calendar_export": ("CalendarExportException", "ics_lines", "csv_lines", "iter_chunks", "schedule_hash",
+                        "CSV_HEADER", "EXPORT_FORMATS"),
+    "compression": ("CompressionException", "compress", "compress_chunks", "ENCODINGS", "MIN_SIZE"),
+    "date_index": ("DateIndexException", "DateIndex"),
+    "deepseek_processor": ("APIException", "parse_retry_after", "ModelClient", "build_request_data",
+                           "get_model_client", "ask_model", "ask_model_stream", "API_URL", "MODEL_NAME",
+                           "SYSTEM_PROMPT"),
+    "job_queue": ("QueueFullException", "PlanningJob", "JobQueue"),
+    "metrics": ("MetricsException", "CounterMetric", "HistogramMetric", "MetricsRegistry", "REGISTRY", "STAGE_SECONDS",
+                "API_ERRORS", "PARSE_FAILURES", "INVALID_PARTS", "DEFAULT_BUCKETS"),
+    "prompt_builder": ("PromptBuilderException", "estimate_tokens", "encode_tasks", "task_tokens", "chunk_tasks",
+                       "COMPACT_SYSTEM_PROMPT", "COMPACT_OUTPUT_SYSTEM_PROMPT", "DEFAULT_MAX_TOKENS"),
+    "resilience": ("CircuitOpenException", "is_retryable", "backoff_delay", "LatencyTracker", "CircuitBreaker",
+                   "ResilientModelClient", "get_resilient_client"),
+    "response_cache": ("make_cache_key", "ResponseCache"),
+    "schedule_diff": ("ScheduleDiffException", "ScheduleDiff", "part_key", "key_parts", "part_id",
+                      "diff_keyed_parts", "diff_schedules"),
+    "scheduler": ("SchedulerException", "schedule_tasks", "replan_tasks", "place_new_tasks", "build_replan_query",
+                  "plan_tasks", "plan_task_changes", "merge_schedules", "plan_tasks_parallel", "parse_reply"),
+    "task": ("Task", "InputTask", "OutputTask"),
+    "task_interpreter": ("params_to_input_task", "input_tasks_to_lines", "task_to_dict", "params_to_output_task",
+                         "line_to_output_task", "lines_to_output_tasks", "task_display_name",
+                         "offsets_to_output_tasks", "OutputTaskStreamParser", "stream_to_output_tasks",
+                         "iso_date_to_ordinal", "rows_to_input_tasks", "rows_to_output_tasks", "CreateTaskException",
+                         "TasktoLineException", "TaskInterpreterException"),
+    "task_store": ("TaskStoreException", "TaskStore"),
+    "task_table": ("TaskTableException", "TaskTable"),
+    "validator": ("ValidatorException", "ValidationReport", "validate_schedule", "repair_schedule"),
+}
+
+_MODULE_OF = {name: module for module, names in _EXPORTS.items() for name in names}
+
+__all__ = list(_MODULE_OF)
+
+
+def __getattr__(name: str):
+    """
+    Import the module that exports name on first use, and keep its value so that later uses skip this function.
+    """
+    module = _MODULE_OF.get(name)
+    if module is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(f"{__name__}.{module}"), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__() -> list[str]:
+    return sorted(set(globals()) | set(__all__))
+
+
+if TYPE_CHECKING:
+    from planner.async_processor import *
+    from planner.batch_dispatcher import *
+    from planner.calendar_export import *
+    from planner.compression import *
+    from planner.date_index import *
+    from planner.deepseek_processor import *
+    from planner.job_queue import *
+    from planner.metrics import *
+    from planner.prompt_builder import *
+    from planner.resilience import *
+    from planner.response_cache import *
+    from planner.schedule_diff import *
+    from planner.scheduler import *
+    from planner.task import *
+    from planner.task_interpreter import *
+    from planner.task_store import *
+    from planner.task_table import *
+    from planner.validator import *
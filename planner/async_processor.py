@@ -0,0 +1,155 @@
+"""
+Module to ask DeepSeek for plans from asyncio code, keeping many planning calls in flight at once.
+"""
+
+
+
+import asyncio
+import datetime
+import weakref
+
+import aiohttp
+
+from planner.deepseek_processor import (API_URL, MODEL_NAME, SYSTEM_PROMPT, APIException, build_request_data,
+                                        parse_retry_after)
+from planner.metrics import API_ERRORS
+from planner.response_cache import ResponseCache, make_cache_key
+
+
+class AsyncModelClient:
+    """
+    asyncio client for DeepSeek's API with pooled connections and a bounded number of concurrent calls.
+    """
+
+    def __init__(self, api_key: str, api_url: str = API_URL, model: str = MODEL_NAME, max_concurrency: int = 32,
+                 connect_timeout: float = 5.0, read_timeout: float = 120.0) -> None:
+        """
+        Create a new AsyncModelClient that lets at most max_concurrency calls talk to the model at once.
+
+        Further calls wait their turn without holding a connection.
+        """
+        self._api_key = api_key
+        self._api_url = api_url
+        self._model = model
+        self._max_concurrency = max_concurrency
+        self._timeout = aiohttp.ClientTimeout(sock_connect = connect_timeout, sock_read = read_timeout)
+        self._semaphore = asyncio.Semaphore(max_concurrency)
+        self._session = None
+        self._in_flight = 0
+
+    @property
+    def api_url(self):
+        return self._api_url
+
+    @property
+    def model(self):
+        return self._model
+
+    @property
+    def max_concurrency(self):
+        return self._max_concurrency
+
+    @property
+    def in_flight(self):
+        return self._in_flight
+
+    def _get_session(self) -> aiohttp.ClientSession:
+        """
+        Return the client's session, creating it on first use so that it binds to the running event loop.
+        """
+        if self._session is None or self._session.closed:
+            connector = aiohttp.TCPConnector(limit = self._max_concurrency)
+            self._session = aiohttp.ClientSession(connector = connector, timeout = self._timeout, headers = {
+                'Authorization': f'Bearer {self._api_key}',
+                'Content-Type': 'application/json'
+            })
+        return self._session
+
+    async def ask(self, query: str, deadline: float | None = None, cache: ResponseCache | None = None,
+                  today: datetime.date | None = None) -> str:
+        """
+        Given a formatted Task string query, ask the model for a plan to tackle all the tasks.
+
+        deadline is the number of seconds the whole call may take, including the wait for a free slot. Cancelling the
+        awaiting task cancels the request and frees its slot.
+        """
+        if cache is not None:
+            key = make_cache_key(self._model, SYSTEM_PROMPT, query, today)
+            result = cache.get(key)
+            if result is None:
+                result = await self.ask(query, deadline)
+                cache.put(key, result)
+            return result
+
+        try:
+            return await asyncio.wait_for(self._ask(query), deadline)
+        except asyncio.TimeoutError as e:
+            raise APIException(f"Failed to fetch data from API. Deadline of {deadline} seconds exceeded.") from e
+
+    async def _ask(self, query: str) -> str:
+        async with self._semaphore:
+            self._in_flight += 1
+            try:
+                session = self._get_session()
+                async with session.post(self._api_url, json = build_request_data(query, self._model)) as response:
+                    # Return the response if the API call succeeded; otherwise, raise an exception
+                    if response.status == 200:
+                        try:
+                            # the body is read as JSON whatever its content type, so a bad reply fails the same way
+                            return (await response.json(content_type = None))["choices"][0]["message"]["content"]
+                        except (ValueError, KeyError, IndexError, TypeError) as e:
+                            # a reply with an error body or no JSON at all is a failed call, so callers can fall back
+                            API_ERRORS.inc(status = "invalid_reply")
+                            raise APIException("API reply has no message content. " + repr(e)) from e
+                    else:
+                        API_ERRORS.inc(status = str(response.status))
+                        raise APIException("Failed to fetch data from API. Status Code: " + str(response.status),
+                                           response.status, parse_retry_after(response.headers.get('Retry-After')))
+            except aiohttp.ClientError as e:
+                API_ERRORS.inc(status = "none")
+                raise APIException("Failed to fetch data from API. " + str(e)) from e
+            finally:
+                self._in_flight -= 1
+
+    async def close(self) -> None:
+        """
+        Close every pooled connection held by this client.
+        """
+        if self._session is not None:
+            await self._session.close()
+            self._session = None
+
+    async def __aenter__(self) -> "AsyncModelClient":
+        return self
+
+    async def __aexit__(self, *exc) -> None:
+        await self.close()
+
+
+# clients are bound to the event loop they were first used on
+_clients: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, dict[str, AsyncModelClient]]" = weakref.WeakKeyDictionary()
+
+
+def get_async_model_client(api_key: str) -> AsyncModelClient:
+    """
+    Given an API Key, return the running event loop's shared AsyncModelClient for that key.
+    """
+    clients = _clients.setdefault(asyncio.get_running_loop(), {})
+    client = clients.get(api_key)
+    if client is None:
+        client = AsyncModelClient(api_key)
+        clients[api_key] = client
+    return client
+
+
+async def ask_model_async(api_key: str, query: str, deadline: float | None = None,
+                          cache: ResponseCache | None = None) -> str:
+    """
+    Given an API Key and a formatted Task string query, ask the model for a plan without blocking the event loop.
+
+    Given this plan, return the result which should be a formatted sequence of tasks.
+    """
+    return await get_async_model_client(api_key).ask(query, deadline, cache)
+
+
+__all__ = [AsyncModelClient.__name__, get_async_model_client.__name__, ask_model_async.__name__]
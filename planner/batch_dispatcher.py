@@ -0,0 +1,248 @@
+"""
+Module to batch planning requests from several users into one call to the model.
+"""
+
+
+
+import datetime
+import queue
+import re
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+
+from planner.metrics import STAGE_SECONDS
+from planner.prompt_builder import (COMPACT_OUTPUT_SYSTEM_PROMPT, COMPACT_SYSTEM_PROMPT, DEFAULT_MAX_TOKENS, encode_tasks,
+                                    estimate_tokens, task_tokens)
+from planner.resilience import get_resilient_client
+from planner.response_cache import ResponseCache
+from planner.scheduler import parse_reply, plan_tasks_parallel, schedule_tasks
+from planner.task import InputTask
+from planner.validator import repair_schedule
+
+
+class BatchDispatcherException(Exception):
+    """
+    Exceptions when submitting planning requests to a PlanningBatcher.
+    """
+    pass
+
+
+_BATCH_INSTRUCTIONS = (
+    "\nThe input may hold several independent plans, each starting with a line USER [number]. Plan each one on its "
+    "own, and start its output with USER [number]."
+)
+BATCH_SYSTEM_PROMPT = COMPACT_SYSTEM_PROMPT + _BATCH_INSTRUCTIONS
+COMPACT_BATCH_SYSTEM_PROMPT = COMPACT_OUTPUT_SYSTEM_PROMPT + _BATCH_INSTRUCTIONS
+
+_USER_RE = re.compile(r"(?:^|\s)USER\s+(\d+)(?=\s|$)")
+
+
+def build_batch_query(queries: list[str]) -> str:
+    """
+    Given the compact queries of several users, create one query with each labelled USER 1, USER 2, and so on.
+    """
+    return "\n".join(f"USER {label}\n{query}" for label, query in enumerate(queries, 1))
+
+
+def split_batch_reply(reply: str, count: int) -> list[str | None]:
+    """
+    Given the model's reply to a batch query of count users, return each user's part of the reply in order.
+
+    A user the reply has no part for gets None.
+    """
+    parts = [None] * count
+    matches = list(_USER_RE.finditer(reply))
+    for match, following in zip(matches, matches[1:] + [None]):
+        label = int(match.group(1))
+        if 1 <= label <= count:
+            parts[label - 1] = reply[match.end():following.start() if following else len(reply)].strip()
+    return parts
+
+
+class _Request:
+    """
+    A planning request waiting for its batch.
+    """
+    __slots__ = ("input_tasks", "today", "tokens", "future")
+
+    def __init__(self, input_tasks: list[InputTask], today: datetime.date, tokens: int) -> None:
+        self.input_tasks = input_tasks
+        self.today = today
+        self.tokens = tokens
+        self.future = Future()
+
+
+class PlanningBatcher:
+    """
+    Collects the planning requests that arrive within a short window and sends them to the model as one batch.
+
+    Every user in a batch shares one copy of the system prompt, so a batch costs far fewer prompt tokens and calls
+    than planning each user alone. Each caller gets a future for its own schedule.
+    """
+
+    def __init__(self, api_key: str, window: float = 0.05, max_batch: int = 16,
+                 max_tokens: int = DEFAULT_MAX_TOKENS, workers: int = 4, cache: ResponseCache | None = None,
+                 timeout: float | None = None, compact_output: bool = False) -> None:
+        """
+        Create a new PlanningBatcher that waits up to window seconds after a request for more requests to batch with it.
+
+        A batch holds at most max_batch requests, and its query and reply stay within max_tokens. Up to workers batches
+        are sent at once. Single requests are planned with plan_tasks_parallel, using the cache if one is given. With
+        compact_output, the model answers in the format of COMPACT_OUTPUT_SYSTEM_PROMPT.
+        """
+        self._api_key = api_key
+        self._window = window
+        self._max_batch = max_batch
+        self._max_tokens = max_tokens
+        self._cache = cache
+        self._timeout = timeout
+        self._compact_output = compact_output
+        self._system_prompt = COMPACT_BATCH_SYSTEM_PROMPT if compact_output else BATCH_SYSTEM_PROMPT
+        # leave room for the system prompt
+        self._budget = max_tokens - estimate_tokens(self._system_prompt)
+        self._requests = queue.Queue()
+        self._executor = ThreadPoolExecutor(workers)
+        self._closed = False
+        self._thread = threading.Thread(target = self._collect, daemon = True)
+        self._thread.start()
+
+    @property
+    def window(self):
+        return self._window
+
+    def submit(self, input_tasks: list[InputTask], today: datetime.date | None = None) -> Future:
+        """
+        Given a list of InputTasks, return a future for their schedule of OutputTasks.
+
+        Like plan_tasks, tasks the model fails to plan are placed by the local scheduler instead.
+        """
+        if self._closed:
+            raise BatchDispatcherException("PlanningBatcher is closed.")
+        if not isinstance(input_tasks, list):
+            raise BatchDispatcherException("Input Task list is not a list.")
+        for task in input_tasks:
+            if not isinstance(task, InputTask):
+                raise BatchDispatcherException("Object in list is not an InputTask.")
+        if today is None:
+            today = datetime.date.today()
+
+        # plus the user's label and date lines
+        request = _Request(input_tasks, today,
+                           sum(task_tokens(task, self._compact_output) for task in input_tasks) + 16)
+        self._requests.put(request)
+        return request.future
+
+    def _collect(self) -> None:
+        """
+        Group the requests into batches until the batcher is closed.
+        """
+        while True:
+            request = self._requests.get()
+            if request is None:
+                return
+            if request.tokens > self._budget:
+                self._executor.submit(self._plan_alone, request)
+                continue
+
+            batch = [request]
+            tokens = request.tokens
+            deadline = time.monotonic() + self._window
+            while len(batch) < self._max_batch:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                try:
+                    request = self._requests.get(timeout = remaining)
+                except queue.Empty:
+                    break
+                if request is None:
+                    self._requests.put(None)
+                    break
+                if request.tokens > self._budget:
+                    self._executor.submit(self._plan_alone, request)
+                elif tokens + request.tokens > self._budget:
+                    # a request that does not fit starts the next batch
+                    self._dispatch(batch)
+                    batch = [request]
+                    tokens = request.tokens
+                    deadline = time.monotonic() + self._window
+                else:
+                    batch.append(request)
+                    tokens += request.tokens
+            self._dispatch(batch)
+
+    def _dispatch(self, batch: list[_Request]) -> None:
+        if len(batch) == 1:
+            self._executor.submit(self._plan_alone, batch[0])
+        else:
+            self._executor.submit(self._plan_batch, batch)
+
+    def _plan_alone(self, request: _Request) -> None:
+        try:
+            schedule = plan_tasks_parallel(self._api_key, request.input_tasks, request.today, self._cache,
+                                           self._timeout, self._max_tokens, compact_output = self._compact_output)
+            request.future.set_result(repair_schedule(schedule, request.input_tasks, request.today)[0])
+        except Exception as e:
+            request.future.set_exception(e)
+
+    def _plan_batch(self, requests: list[_Request]) -> None:
+        """
+        Plan a batch of requests in one call, placing any user the model fails on or leaves out with the local
+        scheduler, and repairing the parts the model got wrong for the rest.
+        """
+        try:
+            with STAGE_SECONDS.time(stage = "prompt_build"):
+                query = build_batch_query([encode_tasks(request.input_tasks, request.today) for request in requests])
+            reply = get_resilient_client(self._api_key).ask(query, system_prompt = self._system_prompt,
+                                                            deadline = self._timeout)
+            parts = split_batch_reply(reply, len(requests))
+        except Exception:
+            # this runs on the executor, so any error has to end in the local scheduler or every future would hang
+            parts = [None] * len(requests)
+
+        for request, part in zip(requests, parts):
+            try:
+                schedule = [] if part is None else parse_reply(part, request.input_tasks, request.today)
+                if schedule:
+                    schedule = repair_schedule(schedule, request.input_tasks, request.today)[0]
+            except Exception:
+                # any error with one user's part, not only a malformed reply, leaves that user to the local scheduler
+                schedule = []
+            try:
+                if not schedule and request.input_tasks:
+                    schedule = schedule_tasks(request.input_tasks, request.today)
+                request.future.set_result(schedule)
+            except Exception as e:
+                request.future.set_exception(e)
+
+    def close(self, wait: bool = True) -> None:
+        """
+        Send the requests already submitted and stop taking new ones.
+        """
+        if not self._closed:
+            self._closed = True
+            self._requests.put(None)
+            self._thread.join()
+            self._executor.shutdown(wait = wait)
+
+
+_batchers: dict[tuple[str, bool], PlanningBatcher] = {}
+_batchers_lock = threading.Lock()
+
+
+def get_planning_batcher(api_key: str, compact_output: bool = False) -> PlanningBatcher:
+    """
+    Given an API Key and whether to ask for compact replies, return the shared PlanningBatcher for them, creating it on
+    first use.
+    """
+    with _batchers_lock:
+        batcher = _batchers.get((api_key, compact_output))
+        if batcher is None:
+            batcher = PlanningBatcher(api_key, compact_output = compact_output)
+            _batchers[(api_key, compact_output)] = batcher
+        return batcher
+
+
+__all__ = [BatchDispatcherException.__name__, build_batch_query.__name__, split_batch_reply.__name__,
+        PlanningBatcher.__name__, get_planning_batcher.__name__, 'BATCH_SYSTEM_PROMPT', 'COMPACT_BATCH_SYSTEM_PROMPT']
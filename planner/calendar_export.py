@@ -0,0 +1,176 @@
+"""
+Module to export schedules of OutputTasks to calendars as iCalendar (.ics) or CSV files, one line at a time.
+"""
+
+
+
+import csv
+import datetime
+import hashlib
+from collections.abc import Iterable, Iterator
+
+from planner.task import OutputTask
+
+
+class CalendarExportException(Exception):
+    """
+    Exceptions when exporting a schedule.
+    """
+    pass
+
+
+# columns of a CSV file that Google Calendar and Outlook both import
+CSV_HEADER = ("Subject", "Start Date", "End Date", "All Day Event", "Description")
+_ONE_DAY = datetime.timedelta(days = 1)
+
+
+def _summary(task: OutputTask) -> str:
+    """
+    Return the title of a part's calendar event, such as Essay (2/3).
+    """
+    name = task.name if task.name and task.name != "NONE" else task.desc
+    return name if task.total_parts == 1 else f"{name} ({task.part_num}/{task.total_parts})"
+
+
+def _description(task: OutputTask) -> str:
+    return "" if task.desc == "NONE" else task.desc
+
+
+def _check_task(task) -> OutputTask:
+    if not isinstance(task, OutputTask):
+        raise CalendarExportException("Object in schedule is not an OutputTask.")
+    return task
+
+
+def _escape_text(text: str) -> str:
+    return text.replace("\\", "\\\\").replace(";", "\\;").replace(",", "\\,").replace("\r\n", "\\n").replace("\n", "\\n")
+
+
+def _fold(line: str) -> str:
+    """
+    Return an iCalendar content line ending in CRLF, folded so that no line is longer than 75 octets.
+    """
+    if len(line) <= 18 or len(line.encode()) <= 75:
+        return line + "\r\n"
+    folded = []
+    current = []
+    size = 0
+    limit = 75
+    for char in line:
+        char_size = len(char.encode())
+        if size + char_size > limit:
+            folded.append("".join(current))
+            current = []
+            size = 0
+            # continuation lines start with a space, which counts towards their length
+            limit = 74
+        current.append(char)
+        size += char_size
+    folded.append("".join(current))
+    return "\r\n ".join(folded) + "\r\n"
+
+
+def ics_lines(output_tasks: Iterable[OutputTask], calendar_name: str = "Planner",
+              stamp: datetime.datetime | None = None) -> Iterator[str]:
+    """
+    Given OutputTasks, yield the lines of an iCalendar file with an all-day event for each part.
+
+    Each event keeps the same UID when its part moves to another day, so calendar clients update it instead of adding
+    a new one. stamp is the time the file is created, by default now.
+    """
+    if stamp is None:
+        stamp = datetime.datetime.now(datetime.timezone.utc)
+    dtstamp = stamp.astimezone(datetime.timezone.utc).strftime("%Y%m%dT%H%M%SZ")
+
+    yield "BEGIN:VCALENDAR\r\n"
+    yield "VERSION:2.0\r\n"
+    yield "PRODID:-//Planner-AI//Planner//EN\r\n"
+    yield "CALSCALE:GREGORIAN\r\n"
+    yield _fold("X-WR-CALNAME:" + _escape_text(calendar_name))
+
+    # the same part of the same task can be scheduled twice, so repeats get a count in their UID
+    seen = {}
+    for task in output_tasks:
+        _check_task(task)
+        key = (task.name, task.desc, task.part_num, task.total_parts)
+        count = seen.get(key, 0)
+        seen[key] = count + 1
+        uid = hashlib.blake2b(repr(key + (count,)).encode(), digest_size = 12).hexdigest()
+        start = task.date
+        yield (f"BEGIN:VEVENT\r\nUID:{uid}@planner-ai\r\nDTSTAMP:{dtstamp}\r\n"
+               f"DTSTART;VALUE=DATE:{start:%Y%m%d}\r\nDTEND;VALUE=DATE:{start + _ONE_DAY:%Y%m%d}\r\n")
+        yield _fold("SUMMARY:" + _escape_text(_summary(task)))
+        description = _description(task)
+        if description:
+            yield _fold("DESCRIPTION:" + _escape_text(description))
+        yield "TRANSP:TRANSPARENT\r\nEND:VEVENT\r\n"
+
+    yield "END:VCALENDAR\r\n"
+
+
+class _LineBuffer:
+    """
+    A file-like object for csv.writer that keeps only the last row written.
+    """
+    __slots__ = ("line",)
+
+    def write(self, line: str) -> None:
+        self.line = line
+
+
+def csv_lines(output_tasks: Iterable[OutputTask]) -> Iterator[str]:
+    """
+    Given OutputTasks, yield the lines of a CSV file with an all-day event for each part.
+
+    The columns are those of CSV_HEADER, with dates written as MM/DD/YYYY for Google Calendar and Outlook.
+    """
+    buffer = _LineBuffer()
+    writer = csv.writer(buffer)
+    writer.writerow(CSV_HEADER)
+    yield buffer.line
+    for task in output_tasks:
+        _check_task(task)
+        date = f"{task.date:%m/%d/%Y}"
+        writer.writerow((_summary(task), date, date, "True", _description(task)))
+        yield buffer.line
+
+
+def iter_chunks(lines: Iterable[str], chunk_size: int = 16384) -> Iterator[str]:
+    """
+    Given lines of text, yield them joined into chunks of about chunk_size characters.
+
+    Sending a few large chunks costs far less than sending every short line on its own.
+    """
+    chunk = []
+    size = 0
+    for line in lines:
+        chunk.append(line)
+        size += len(line)
+        if size >= chunk_size:
+            yield "".join(chunk)
+            chunk = []
+            size = 0
+    if chunk:
+        yield "".join(chunk)
+
+
+def schedule_hash(output_tasks: Iterable[OutputTask]) -> str:
+    """
+    Given OutputTasks, return a hash of the schedule that changes whenever any part is added, removed, or changed.
+
+    Used as the ETag of exports, so the hash is computed one part at a time without rendering anything.
+    """
+    digest = hashlib.blake2b(digest_size = 16)
+    for task in output_tasks:
+        _check_task(task)
+        digest.update(f"{task.ordinal}\x1f{task.name}\x1f{task.desc}\x1f{task.part_num}\x1f{task.total_parts}\x1e"
+                      .encode())
+    return digest.hexdigest()
+
+
+# the lines and media type of each export format
+EXPORT_FORMATS = {"ics": (ics_lines, "text/calendar"), "csv": (csv_lines, "text/csv")}
+
+
+__all__ = [CalendarExportException.__name__, ics_lines.__name__, csv_lines.__name__, iter_chunks.__name__,
+        schedule_hash.__name__, 'CSV_HEADER', 'EXPORT_FORMATS']
@@ -0,0 +1,72 @@
+"""
+Module to compress HTTP response bodies with gzip, or with brotli when the brotli package is installed.
+"""
+
+
+
+import zlib
+from collections.abc import Iterable, Iterator
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+
+class CompressionException(Exception):
+    """
+    Exceptions when compressing a response body.
+    """
+    pass
+
+
+# content codings this server can produce, best first
+ENCODINGS = ("br", "gzip") if brotli is not None else ("gzip",)
+# bodies smaller than this are sent as they are, since compressing them saves less than its headers cost
+MIN_SIZE = 512
+# low levels compress JSON nearly as well as the highest ones in a fraction of the time
+GZIP_LEVEL = 6
+BROTLI_QUALITY = 5
+
+
+def _gzip_compressor():
+    # wbits of 16 + 15 writes a gzip header and trailer around the deflate stream
+    return zlib.compressobj(GZIP_LEVEL, zlib.DEFLATED, 16 + zlib.MAX_WBITS)
+
+
+def compress(data: bytes, encoding: str) -> bytes:
+    """
+    Given a body and one of ENCODINGS, return the compressed body.
+    """
+    if encoding == "gzip":
+        compressor = _gzip_compressor()
+        return compressor.compress(data) + compressor.flush()
+    if encoding == "br" and brotli is not None:
+        return brotli.compress(data, quality = BROTLI_QUALITY)
+    raise CompressionException(f"Encoding {encoding} is not supported.")
+
+
+def compress_chunks(chunks: Iterable[str | bytes], encoding: str) -> Iterator[bytes]:
+    """
+    Given the chunks of a streamed body and one of ENCODINGS, yield the compressed stream.
+
+    Each chunk is compressed as it arrives, so the body is never held in memory all at once.
+    """
+    if encoding == "gzip":
+        compressor = _gzip_compressor()
+        process, finish = compressor.compress, compressor.flush
+    elif encoding == "br" and brotli is not None:
+        compressor = brotli.Compressor(quality = BROTLI_QUALITY)
+        process, finish = compressor.process, compressor.finish
+    else:
+        raise CompressionException(f"Encoding {encoding} is not supported.")
+
+    for chunk in chunks:
+        data = process(chunk.encode() if isinstance(chunk, str) else chunk)
+        # the compressor keeps small inputs until it has enough to write a block
+        if data:
+            yield data
+    yield finish()
+
+
+__all__ = [CompressionException.__name__, compress.__name__, compress_chunks.__name__, 'ENCODINGS', 'MIN_SIZE']
@@ -0,0 +1,175 @@
+"""
+Module to index a schedule of OutputTasks by date, for range queries and per-day loads without scanning every part.
+"""
+
+
+
+import datetime
+from array import array
+from bisect import bisect_left, bisect_right
+from collections import Counter
+from collections.abc import Iterable, Iterator
+from operator import attrgetter
+
+from planner.task import OutputTask
+
+
+class DateIndexException(Exception):
+    """
+    Exceptions when building or changing a DateIndex.
+    """
+    pass
+
+
+# more parts than this added at once are sorted in together instead of inserted one at a time
+_BULK_SIZE = 32
+
+
+def _ordinal(day: datetime.date | int) -> int:
+    return day.toordinal() if isinstance(day, datetime.date) else day
+
+
+def _check_task(task) -> OutputTask:
+    if not isinstance(task, OutputTask):
+        raise DateIndexException("Object in schedule is not an OutputTask.")
+    return task
+
+
+class DateIndex:
+    """
+    A schedule of OutputTasks kept in date order, with the number of parts on each day.
+
+    The date ordinals of the parts are kept in a sorted array next to them, so the parts of any date range are found by
+    bisection in O(log N + K) time for K parts in the range, and each day's load is kept in a Counter. Dates given to
+    the queries may be datetime.date objects or date ordinals, and ranges run from start up to but not including end,
+    as in TaskStore.
+    """
+
+    def __init__(self, output_tasks: Iterable[OutputTask] = ()) -> None:
+        """
+        Create a new DateIndex, optionally of existing OutputTasks. Parts on the same day keep the order given.
+        """
+        self._tasks = sorted(map(_check_task, output_tasks), key = attrgetter('ordinal'))
+        self._ordinals = array('i', (task.ordinal for task in self._tasks))
+        self._loads = Counter(self._ordinals)
+
+    def __len__(self) -> int:
+        return len(self._tasks)
+
+    def __iter__(self) -> Iterator[OutputTask]:
+        return iter(self._tasks)
+
+    def __contains__(self, task) -> bool:
+        if not isinstance(task, OutputTask):
+            return False
+        low, high = self._bounds(task.ordinal, task.ordinal + 1)
+        return task in self._tasks[low:high]
+
+    def tasks(self) -> list[OutputTask]:
+        """
+        Return a list of every part in date order.
+        """
+        return list(self._tasks)
+
+    def insert(self, task: OutputTask) -> None:
+        """
+        Given an OutputTask, add it after every part already on its day.
+        """
+        ordinal = _check_task(task).ordinal
+        index = bisect_right(self._ordinals, ordinal)
+        self._ordinals.insert(index, ordinal)
+        self._tasks.insert(index, task)
+        self._loads[ordinal] += 1
+
+    def extend(self, output_tasks: Iterable[OutputTask]) -> None:
+        """
+        Given OutputTasks, add each after every part already on its day.
+
+        Many parts are appended and sorted in together, which takes O(N + K log K) time since the existing parts are
+        already in order, rather than shifting the arrays once for every part.
+        """
+        added = [_check_task(task) for task in output_tasks]
+        if len(added) <= _BULK_SIZE:
+            for task in added:
+                self.insert(task)
+            return
+        self._tasks.extend(added)
+        self._tasks.sort(key = attrgetter('ordinal'))
+        self._ordinals = array('i', (task.ordinal for task in self._tasks))
+        self._loads.update(task.ordinal for task in added)
+
+    def remove(self, task: OutputTask) -> None:
+        """
+        Given an OutputTask, remove one part equal to it.
+        """
+        ordinal = _check_task(task).ordinal
+        low, high = self._bounds(ordinal, ordinal + 1)
+        for index in range(low, high):
+            if self._tasks[index] == task:
+                del self._tasks[index]
+                del self._ordinals[index]
+                self._loads[ordinal] -= 1
+                if not self._loads[ordinal]:
+                    del self._loads[ordinal]
+                return
+        raise DateIndexException("OutputTask is not in the index.")
+
+    def _bounds(self, start: datetime.date | int | None, end: datetime.date | int | None) -> tuple[int, int]:
+        """
+        Return the positions of the first part on or after start and of the first part on or after end.
+        """
+        low = 0 if start is None else bisect_left(self._ordinals, _ordinal(start))
+        high = len(self._ordinals) if end is None else bisect_left(self._ordinals, _ordinal(end), low)
+        return low, high
+
+    def between(self, start: datetime.date | int | None = None,
+                end: datetime.date | int | None = None) -> list[OutputTask]:
+        """
+        Given a date range, either end of which can be left out, return the parts in it in date order.
+        """
+        low, high = self._bounds(start, end)
+        return self._tasks[low:high]
+
+    def on_day(self, day: datetime.date | int) -> list[OutputTask]:
+        """
+        Given a date, return the parts on it.
+        """
+        ordinal = _ordinal(day)
+        return self.between(ordinal, ordinal + 1)
+
+    def load(self, day: datetime.date | int) -> int:
+        """
+        Given a date, return the number of parts on it.
+        """
+        return self._loads.get(_ordinal(day), 0)
+
+    def day_loads(self, start: datetime.date | int | None = None,
+                  end: datetime.date | int | None = None) -> dict[int, int]:
+        """
+        Given a date range, either end of which can be left out, return the ordinal and number of parts of every day in
+        it that has parts, in date order.
+
+        Each day is skipped over by bisection, so this takes O(D log N) time for D days with parts in the range.
+        """
+        low, high = self._bounds(start, end)
+        ordinals = self._ordinals
+        loads = {}
+        while low < high:
+            ordinal = ordinals[low]
+            following = bisect_right(ordinals, ordinal, low, high)
+            loads[ordinal] = following - low
+            low = following
+        return loads
+
+    def busy_days(self, limit: int, start: datetime.date | int | None = None,
+                  end: datetime.date | int | None = None) -> list[int]:
+        """
+        Given a number of parts and a date range, either end of which can be left out, return the ordinals of the days
+        in the range with more than limit parts, in date order.
+        """
+        if start is None and end is None:
+            return sorted(ordinal for ordinal, load in self._loads.items() if load > limit)
+        return [ordinal for ordinal, load in self.day_loads(start, end).items() if load > limit]
+
+
+__all__ = [DateIndexException.__name__, DateIndex.__name__]
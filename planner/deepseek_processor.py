@@ -4,130 +4,385 @@ Module to ask DeepSeek about the ideal order of Tasks and their splits.
 
 
 
-import requests
+import datetime
+import functools
+import json
+import threading
+import time
+from collections.abc import Iterator
+from typing import TYPE_CHECKING
+
+from planner.metrics import API_ERRORS, STAGE_SECONDS
+from planner.response_cache import ResponseCache, make_cache_key
+
+# requests and urllib3 take longer to import than the rest of the planner, so they are only imported once the first
+# ModelClient is created
+if TYPE_CHECKING:
+    import requests
+
+API_URL = 'https://openrouter.ai/api/v1/chat/completions'
+MODEL_NAME = 'deepseek/deepseek-chat:free'
+
+SYSTEM_PROMPT = (
+    "You are an AI planner helper that, given a list of tasks and/or events and their details, "
+    "will sort these tasks in a manner that best helps the requestor.\n"
+
+    "A task will be given in the following format:\n"
+
+    "TASK [Name or NONE] DUE [DD] [MM] [YYYY] DESC [Description or "
+    "NONE] PARTS [Number of parts that this task should be split into, which is at least 1]\n\n"
+
+
+    "Return the ideal schedule in a space separated list within the following format:\n"
+    "TASK [Name or Generated Name if name of NONE is given] DATE [DD] [MM] [YYYY] DESC [The "
+    "previously given description or NONE if no description was given] PARTS [Part Number] "
+    "[Total Number of Parts for this Task]\n\n"
+
+
+    "To explain the this format more, an input task may or may not have a name, must have a "
+    "date, may have a description, and may have a requested integer number of parts that the "
+    "task should be broken up into.\n"
+
+    "Your output task should always have a name. This name will either be the one given by "
+    "the input task or be one generated from the task's context. Because each task has a due "
+    "date. Organize and prioritize the tasks in a way that ensures earlier and more important "
+    "tasks are completed first while less important or later due tasks have later completion"
+    "dates. Our goal is to reduce procrastination while balancing task workload on each day. "
+    "You may always assume that the the task query date aligns with the real-world date of today "
+    "unless otherwise stated. If a due date is before today's date, increase the priority of that "
+    "task as that task is late. A task should always be copmleted before its due date. Finally, "
+    "create more tasks when a task is requested to be broken into a certain number of parts and "
+    "schedule these task parts according to the previous guidelines.\n"
+
+    "Here's an example, assuming that today is January 1, 2000:\n"
+
+    "Input: TASK Math Homework DUE 08 01 2000 DESC NONE PARTS 1\n"
+
+    "Output: TASK Math Homework DATE 01 01 2000 DESC NONE PARTS 1 1\n"
+
+    "Explanation: Because a task name was already given, we use that task name. Because today "
+    "is January 1, 2000, the due date for Math Homework is January 8, 2000, and because we have "
+    "no other tasks queued up, we assign this task to be completed today so as not to "
+    "procrastinate. Since there are no extra parts to split this task up into, we simply return "
+    "a part number of 1 with a total number of parts of 1.\n\n"
+
+
+    "Here's another example, once again assuming that today is January 1, 2000:\n"
+
+    "Input: TASK Math Homework DUE 08 01 2000 DESC NONE PARTS NONE TASK Reading Homework DUE 05 "
+    "01 2000 DESC NONE PARTS 2 TASK NONE DUE 15 01 2000 DESC Book report for the Great Gatsby "
+    "PARTS 3 TASK Study DUE 08 01 2000 DESC Studying for a History Quiz PARTS 9\n"
+
+    "Output: TASK Math Homework DATE 03 01 2000 DESC NONE PARTS 1 1 TASK Reading Homework DATE "
+    "01 01 2000 DESC NONE PARTS 1 2 TASK Reading Homework DATE 02 01 2000 DESC NONE PARTS 2 2 "
+    "TASK Great Gatsby Book Report DATE 09 01 2000 DESC Book report for the Great Gatsby PARTS 1 "
+    "3 TASK Great Gatsby Book Report DATE 10 01 2000 DESC Book report for the Great Gatsby PARTS "
+    "2 3 TASK Great Gatsby Book Report DATE 11 01 2000 DESC Book report for the Great Gatsby "
+    "PARTS 3 3 TASK Study DATE 01 01 2000 DESC Studying for a History Quiz PARTS 1 9 TASK Study "
+    "DATE 02 01 2000 DESC Studying for a History Quiz PARTS 2 9 TASK Study DATE 03 01 2000 DESC "
+    "Studying for a History Quiz PARTS 3 9 TASK Study DATE 04 01 2000 DESC Studying for a History "
+    "Quiz PARTS 4 9 TASK Study DATE 04 01 2000 DESC Studying for a History Quiz PARTS 5 9 TASK "
+    "Study DATE 05 01 2000 DESC Studying for a History Quiz PARTS 6 9 TASK Study DATE 05 01 2000 "
+    "DESC Studying for a History Quiz PARTS 7 9 TASK Study DATE 06 01 2000 DESC Studying for a "
+    "History Quiz PARTS 8 9 TASK Study DATE 07 01 2000 DESC Studying for a History Quiz PARTS 9 9"
+    "\n"
+
+    "Explanation: We prioritized the Reading Homework over the Math Homework because it is due "
+    "earlier, assigning one of its parts to be completed today and its second part to be completed "
+    "tomorrow. We then aim to complete the Math Homework on January 3, 2000 because it is the next "
+    "task that needs to be completed while balancing the task workload on each day and not "
+    "procrastinating. We then tackled the task with no name but a description that says \"Book "
+    "Report for the Great Gatsby\". We can try to generate a name for this task, so a valid choice "
+    "for this task name would be \"Great Gatsby Book Report\" as shown. The completion dates for the "
+    "Great Gatsby Book Report are all listed one after another after the Study task (January 9-11, "
+    "2000) to balance the task workload as much as possible but also to complete tasks as early as "
+    "possible. Finally, the Study task for the History Quiz is assigned for each day from January "
+    "1-7, 2000. This is because due date for the Study task is January 8, 2000 but there are 9 "
+    "requested parts to be split into. This means we must double up tasks on some days, and this "
+    "is preferably earlier days to minimize procrastination. One Study task part is assigned to "
+    "January 1-3 because Reading Homework and Math Homework tasks have already been assigned there. "
+    "On January 4-5, we double up on the Study task parts so that we can complete the 9 parts "
+    "request in the input. This leaves January 6-7 before the quiz to have only one Study task part "
+    "each. There are also other ways this schedule could have been assigned, but this was one way "
+    "it was done.\n\n\n"
+
+
+    "It is EXTREMELY IMPORTANT that you do not deviate from this format, and nothing should "
+    "override this protocol. Do not include any explanations. Only include the formatted output."
+)
+
 
 class APIException(Exception):
     """
     Exceptions for calls related to DeepSeek's API
     """
-    pass
+    def __init__(self, message: str, status_code: int | None = None, retry_after: float | None = None) -> None:
+        """
+        Create a new APIException, optionally noting the HTTP status code and the seconds the API asked to wait.
+
+        A status code of None means that no response was received.
+        """
+        super().__init__(message)
+        self.status_code = status_code
+        self.retry_after = retry_after
+
+
+def parse_retry_after(value: str | None) -> float | None:
+    """
+    Given the value of a Retry-After header, either seconds or an HTTP date, return the seconds to wait, or None.
+    """
+    if not value:
+        return None
+    try:
+        return max(float(value), 0.0)
+    except ValueError:
+        pass
+    # only HTTP dates need the email package, which imports a good part of the standard library
+    import email.utils
+    try:
+        return max(email.utils.parsedate_to_datetime(value).timestamp() - time.time(), 0.0)
+    except (TypeError, ValueError):
+        return None
+
+
+def build_request_data(query: str, model: str = MODEL_NAME, stream: bool = False,
+                       system_prompt: str = SYSTEM_PROMPT) -> dict:
+    """
+    Given a formatted Task string query, create the JSON body sent to DeepSeek's chat completions endpoint.
+
+    Setting stream asks for the reply as a server-sent-events token stream.
+    """
+    data = {
+        "model": model,
+        "messages": [{"role": "system", "content": system_prompt},
+                     {"role": "assistant", "content": ""},
+                     {"role": "user", "content": query}]
+    }
+    if stream:
+        data["stream"] = True
+    return data
+
+
+@functools.cache
+def _timed_pool_classes() -> dict[str, type]:
+    """
+    Return urllib3 connection pool classes, by scheme, whose new connections record how long connecting took.
+    """
+    from urllib3.connection import HTTPConnection, HTTPSConnection
+    from urllib3.connectionpool import HTTPConnectionPool, HTTPSConnectionPool
+
+    class _TimedHTTPConnection(HTTPConnection):
+        def connect(self) -> None:
+            with STAGE_SECONDS.time(stage = "model_connect"):
+                super().connect()
+
+    class _TimedHTTPSConnection(HTTPSConnection):
+        def connect(self) -> None:
+            # includes the TLS handshake
+            with STAGE_SECONDS.time(stage = "model_connect"):
+                super().connect()
+
+    class _TimedHTTPConnectionPool(HTTPConnectionPool):
+        ConnectionCls = _TimedHTTPConnection
+
+    class _TimedHTTPSConnectionPool(HTTPSConnectionPool):
+        ConnectionCls = _TimedHTTPSConnection
+
+    return {"http": _TimedHTTPConnectionPool, "https": _TimedHTTPSConnectionPool}
+
+
+class ModelClient:
+    """
+    Reusable client for DeepSeek's API that keeps pooled, keep-alive connections to the chat completions endpoint.
+
+    All threads share one connection pool, so repeated planning calls skip the TCP and TLS handshakes.
+    """
+
+    def __init__(self, api_key: str, api_url: str = API_URL, model: str = MODEL_NAME, pool_size: int = 10,
+                 connect_timeout: float = 5.0, read_timeout: float = 120.0) -> None:
+        """
+        Create a new ModelClient with a connection pool holding up to pool_size open connections.
+        """
+        self._api_key = api_key
+        self._api_url = api_url
+        self._model = model
+        self._connect_timeout = connect_timeout
+        self._read_timeout = read_timeout
+        from requests.adapters import HTTPAdapter
+        # urllib3's pool manager is thread-safe, so one adapter is shared by every thread's session
+        self._adapter = HTTPAdapter(pool_connections = pool_size, pool_maxsize = pool_size, pool_block = True)
+        # time new connections only; reused keep-alive connections skip the connect stage entirely
+        self._adapter.poolmanager.pool_classes_by_scheme = _timed_pool_classes()
+        self._local = threading.local()
+
+    @property
+    def api_url(self):
+        return self._api_url
+
+    @property
+    def model(self):
+        return self._model
+
+    def _session(self) -> "requests.Session":
+        """
+        Return this thread's Session, creating it on first use.
+
+        Sessions keep cookies and other mutable state, so each thread gets its own on top of the shared pool.
+        """
+        session = getattr(self._local, "session", None)
+        if session is None:
+            import requests
+            session = requests.Session()
+            session.mount('https://', self._adapter)
+            session.mount('http://', self._adapter)
+            session.headers.update({
+                'Authorization': f'Bearer {self._api_key}',
+                'Content-Type': 'application/json',
+                'Connection': 'keep-alive'
+            })
+            self._local.session = session
+        return session
+
+    def ask(self, query: str, connect_timeout: float | None = None, read_timeout: float | None = None,
+            cache: ResponseCache | None = None, today: datetime.date | None = None,
+            system_prompt: str = SYSTEM_PROMPT) -> str:
+        """
+        Given a formatted Task string query, ask the model for a plan to tackle all the tasks.
+
+        The connect and read timeouts default to the ones given when the client was created. If a cache is given,
+        a plan already made for the same query on the same day (today by default) is returned without calling the model.
+        """
+        if cache is not None:
+            key = make_cache_key(self._model, system_prompt, query, today)
+            result = cache.get(key)
+            if result is None:
+                result = self.ask(query, connect_timeout, read_timeout, system_prompt = system_prompt)
+                cache.put(key, result)
+            return result
+
+        if connect_timeout is None:
+            connect_timeout = self._connect_timeout
+        if read_timeout is None:
+            read_timeout = self._read_timeout
+
+        from requests import RequestException
+        start = time.perf_counter()
+        try:
+            response = self._session().post(self._api_url,
+                                            json = build_request_data(query, self._model, system_prompt = system_prompt),
+                                            timeout = (connect_timeout, read_timeout))
+        except RequestException as e:
+            API_ERRORS.inc(status = "none")
+            raise APIException("Failed to fetch data from API. " + str(e)) from e
+        # elapsed runs until the response headers arrived
+        STAGE_SECONDS.observe(response.elapsed.total_seconds(), stage = "model_ttfb")
+        STAGE_SECONDS.observe(time.perf_counter() - start, stage = "model_total")
+
+        # Return the response if the API call succeeded; otherwise, raise an exception
+        if response.status_code == 200:
+            try:
+                return response.json()["choices"][0]["message"]["content"]
+            except (ValueError, KeyError, IndexError, TypeError) as e:
+                # a reply with an error body or no JSON at all is a failed call, so callers can fall back
+                API_ERRORS.inc(status = "invalid_reply")
+                raise APIException("API reply has no message content. " + repr(e)) from e
+        else:
+            API_ERRORS.inc(status = str(response.status_code))
+            raise APIException("Failed to fetch data from API. Status Code: " + str(response.status_code),
+                               response.status_code, parse_retry_after(response.headers.get('Retry-After')))
+
+    def ask_stream(self, query: str, connect_timeout: float | None = None,
+                   read_timeout: float | None = None) -> Iterator[str]:
+        """
+        Given a formatted Task string query, ask the model for a plan and yield the plan's text as it is generated.
+
+        The read timeout applies to the gap between streamed chunks rather than to the whole reply.
+        """
+        if connect_timeout is None:
+            connect_timeout = self._connect_timeout
+        if read_timeout is None:
+            read_timeout = self._read_timeout
+
+        from requests import RequestException
+        start = time.perf_counter()
+        try:
+            with self._session().post(self._api_url, json = build_request_data(query, self._model, stream = True),
+                                      timeout = (connect_timeout, read_timeout), stream = True) as response:
+                STAGE_SECONDS.observe(response.elapsed.total_seconds(), stage = "model_ttfb")
+                if response.status_code != 200:
+                    API_ERRORS.inc(status = str(response.status_code))
+                    raise APIException("Failed to fetch data from API. Status Code: " + str(response.status_code),
+                                       response.status_code, parse_retry_after(response.headers.get('Retry-After')))
+
+                for line in response.iter_lines(chunk_size = None):
+                    # skip blank separators and ": comment" keep-alives
+                    if not line.startswith(b"data:"):
+                        continue
+                    payload = line[5:].strip()
+                    if payload == b"[DONE]":
+                        break
+                    try:
+                        content = json.loads(payload)["choices"][0]["delta"].get("content")
+                    except (ValueError, KeyError, IndexError, TypeError, AttributeError) as e:
+                        API_ERRORS.inc(status = "invalid_reply")
+                        raise APIException("API stream chunk has no delta. " + repr(e)) from e
+                    if content:
+                        yield content
+                STAGE_SECONDS.observe(time.perf_counter() - start, stage = "model_total")
+        except RequestException as e:
+            API_ERRORS.inc(status = "none")
+            raise APIException("Failed to fetch data from API. " + str(e)) from e
+
+    def close(self) -> None:
+        """
+        Close every pooled connection held by this client.
+        """
+        self._adapter.close()
+
+    def __enter__(self) -> "ModelClient":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+
+_clients: dict[str, ModelClient] = {}
+_clients_lock = threading.Lock()
+
+
+def get_model_client(api_key: str) -> ModelClient:
+    """
+    Given an API Key, return the shared ModelClient for that key, creating it on first use.
+    """
+    with _clients_lock:
+        client = _clients.get(api_key)
+        if client is None:
+            client = ModelClient(api_key)
+            _clients[api_key] = client
+        return client
 
 
-def ask_model(api_key: str, query: str) -> str | None:
+def ask_model(api_key: str, query: str, cache: ResponseCache | None = None) -> str | None:
     """
     Given an API Key and a formatted Task string query, ask the model for a plan to tackle all the tasks.
     
-    Given this plan, return the result which should be a formatted sequence of tasks.
+    Given this plan, return the result which should be a formatted sequence of tasks. Repeated queries are answered
+    from the cache when one is given.
     """
+    return get_model_client(api_key).ask(query, cache = cache)
 
-    API_URL = 'https://openrouter.ai/api/v1/chat/completions'
 
-    # Define the headers for the API request
-    headers = {
-        'Authorization': f'Bearer {api_key}',
-        'Content-Type': 'application/json'
-    }
+def ask_model_stream(api_key: str, query: str) -> Iterator[str]:
+    """
+    Given an API Key and a formatted Task string query, ask the model for a plan to tackle all the tasks.
 
-    # Initialize the data sent to DeepSeek
-    data = {
-        "model": "deepseek/deepseek-chat:free",
-        "messages":[{"role": "system", "content": "You are an AI planner helper that, given a list of tasks and/or events and their details, "
-                                                    "will sort these tasks in a manner that best helps the requestor.\n"
-
-                                                    "A task will be given in the following format:\n"
-
-                                                    "TASK [Name or NONE] DUE [DD] [MM] [YYYY] DESC [Description or "
-                                                    "NONE] PARTS [Number of parts that this task should be split into, which is at least 1]\n\n"
-
-
-                                                    "Return the ideal schedule in a space separated list within the following format:\n"
-                                                    "TASK [Name or Generated Name if name of NONE is given] DATE [DD] [MM] [YYYY] DESC [The "
-                                                    "previously given description or NONE if no description was given] PARTS [Part Number] "
-                                                    "[Total Number of Parts for this Task]\n\n"
-
-
-                                                    "To explain the this format more, an input task may or may not have a name, must have a "
-                                                    "date, may have a description, and may have a requested integer number of parts that the "
-                                                    "task should be broken up into.\n"
-
-                                                    "Your output task should always have a name. This name will either be the one given by "
-                                                    "the input task or be one generated from the task's context. Because each task has a due "
-                                                    "date. Organize and prioritize the tasks in a way that ensures earlier and more important "
-                                                    "tasks are completed first while less important or later due tasks have later completion"
-                                                    "dates. Our goal is to reduce procrastination while balancing task workload on each day. "
-                                                    "You may always assume that the the task query date aligns with the real-world date of today "
-                                                    "unless otherwise stated. If a due date is before today's date, increase the priority of that "
-                                                    "task as that task is late. A task should always be copmleted before its due date. Finally, "
-                                                    "create more tasks when a task is requested to be broken into a certain number of parts and "
-                                                    "schedule these task parts according to the previous guidelines.\n"
-
-                                                    "Here's an example, assuming that today is January 1, 2000:\n"
-
-                                                    "Input: TASK Math Homework DUE 08 01 2000 DESC NONE PARTS 1\n"
-                                                    
-                                                    "Output: TASK Math Homework DATE 01 01 2000 DESC NONE PARTS 1 1\n"
-
-                                                    "Explanation: Because a task name was already given, we use that task name. Because today "
-                                                    "is January 1, 2000, the due date for Math Homework is January 8, 2000, and because we have "
-                                                    "no other tasks queued up, we assign this task to be completed today so as not to "
-                                                    "procrastinate. Since there are no extra parts to split this task up into, we simply return "
-                                                    "a part number of 1 with a total number of parts of 1.\n\n"
-
-
-                                                    "Here's another example, once again assuming that today is January 1, 2000:\n"
-
-                                                    "Input: TASK Math Homework DUE 08 01 2000 DESC NONE PARTS NONE TASK Reading Homework DUE 05 "
-                                                    "01 2000 DESC NONE PARTS 2 TASK NONE DUE 15 01 2000 DESC Book report for the Great Gatsby "
-                                                    "PARTS 3 TASK Study DUE 08 01 2000 DESC Studying for a History Quiz PARTS 9\n"
-
-                                                    "Output: TASK Math Homework DATE 03 01 2000 DESC NONE PARTS 1 1 TASK Reading Homework DATE "
-                                                    "01 01 2000 DESC NONE PARTS 1 2 TASK Reading Homework DATE 02 01 2000 DESC NONE PARTS 2 2 "
-                                                    "TASK Great Gatsby Book Report DATE 09 01 2000 DESC Book report for the Great Gatsby PARTS 1 "
-                                                    "3 TASK Great Gatsby Book Report DATE 10 01 2000 DESC Book report for the Great Gatsby PARTS "
-                                                    "2 3 TASK Great Gatsby Book Report DATE 11 01 2000 DESC Book report for the Great Gatsby "
-                                                    "PARTS 3 3 TASK Study DATE 01 01 2000 DESC Studying for a History Quiz PARTS 1 9 TASK Study "
-                                                    "DATE 02 01 2000 DESC Studying for a History Quiz PARTS 2 9 TASK Study DATE 03 01 2000 DESC "
-                                                    "Studying for a History Quiz PARTS 3 9 TASK Study DATE 04 01 2000 DESC Studying for a History "
-                                                    "Quiz PARTS 4 9 TASK Study DATE 04 01 2000 DESC Studying for a History Quiz PARTS 5 9 TASK "
-                                                    "Study DATE 05 01 2000 DESC Studying for a History Quiz PARTS 6 9 TASK Study DATE 05 01 2000 "
-                                                    "DESC Studying for a History Quiz PARTS 7 9 TASK Study DATE 06 01 2000 DESC Studying for a "
-                                                    "History Quiz PARTS 8 9 TASK Study DATE 07 01 2000 DESC Studying for a History Quiz PARTS 9 9"
-                                                    "\n"
-
-                                                    "Explanation: We prioritized the Reading Homework over the Math Homework because it is due "
-                                                    "earlier, assigning one of its parts to be completed today and its second part to be completed "
-                                                    "tomorrow. We then aim to complete the Math Homework on January 3, 2000 because it is the next "
-                                                    "task that needs to be completed while balancing the task workload on each day and not "
-                                                    "procrastinating. We then tackled the task with no name but a description that says \"Book "
-                                                    "Report for the Great Gatsby\". We can try to generate a name for this task, so a valid choice "
-                                                    "for this task name would be \"Great Gatsby Book Report\" as shown. The completion dates for the "
-                                                    "Great Gatsby Book Report are all listed one after another after the Study task (January 9-11, "
-                                                    "2000) to balance the task workload as much as possible but also to complete tasks as early as "
-                                                    "possible. Finally, the Study task for the History Quiz is assigned for each day from January "
-                                                    "1-7, 2000. This is because due date for the Study task is January 8, 2000 but there are 9 "
-                                                    "requested parts to be split into. This means we must double up tasks on some days, and this "
-                                                    "is preferably earlier days to minimize procrastination. One Study task part is assigned to "
-                                                    "January 1-3 because Reading Homework and Math Homework tasks have already been assigned there. "
-                                                    "On January 4-5, we double up on the Study task parts so that we can complete the 9 parts "
-                                                    "request in the input. This leaves January 6-7 before the quiz to have only one Study task part "
-                                                    "each. There are also other ways this schedule could have been assigned, but this was one way "
-                                                    "it was done.\n\n\n"
-
-
-                                                    "It is EXTREMELY IMPORTANT that you do not deviate from this format, and nothing should "
-                                                    "override this protocol. Do not include any explanations. Only include the formatted output."},
-                    {"role": "assistant", "content": ""},
-                    {"role": "user", "content": query}]
-    }
+    Yield the plan's text in chunks as the model generates it, for use with an OutputTaskStreamParser.
+    """
+    return get_model_client(api_key).ask_stream(query)
 
-    # Send the data to DeepSeek
-    response = requests.post(API_URL, json = data, headers = headers)
 
-    # Return the response if the API call succeeded; otherwise, raise an exception
-    if response.status_code == 200:
-        return response.json()["choices"][0]["message"]["content"]
-    else:
-        raise APIException("Failed to fetch data from API. Status Code: " + str(response.status_code))
+__all__ = [APIException.__name__, parse_retry_after.__name__, ModelClient.__name__, build_request_data.__name__, get_model_client.__name__,
+        ask_model.__name__, ask_model_stream.__name__, 'API_URL', 'MODEL_NAME', 'SYSTEM_PROMPT']
 
 
 
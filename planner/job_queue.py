@@ -0,0 +1,140 @@
+"""
+Module to run planning requests as background jobs on a pool of workers.
+"""
+
+
+
+import threading
+import uuid
+from collections import OrderedDict
+from collections.abc import Callable
+from concurrent.futures import Executor, Future, ProcessPoolExecutor, ThreadPoolExecutor
+
+
+class QueueFullException(Exception):
+    """
+    Exceptions when a job is submitted while the queue is already at its maximum depth.
+    """
+    pass
+
+
+class PlanningJob:
+    """
+    A planning request that was handed to the JobQueue, identified by a job id.
+    """
+
+    def __init__(self, job_id: str, key: str, future: Future) -> None:
+        """
+        Create a new PlanningJob for a submitted future.
+        """
+        self._job_id = job_id
+        self._key = key
+        self._future = future
+
+    @property
+    def job_id(self):
+        return self._job_id
+
+    @property
+    def key(self):
+        return self._key
+
+    @property
+    def status(self):
+        if self._future.running():
+            return "running"
+        if not self._future.done():
+            return "pending"
+        if self._future.cancelled() or self._future.exception() is not None:
+            return "failed"
+        return "done"
+
+    def done(self) -> bool:
+        return self._future.done()
+
+    def result(self, timeout: float | None = None):
+        """
+        Wait up to timeout seconds for the job and return its result, raising whatever the job raised.
+        """
+        return self._future.result(timeout)
+
+    def error(self) -> BaseException | None:
+        """
+        Return the exception the job raised, or None if it has not failed.
+        """
+        if not self._future.done() or self._future.cancelled():
+            return None
+        return self._future.exception()
+
+
+class JobQueue:
+    """
+    Runs planning jobs on a thread or process pool with a bounded number of unfinished jobs.
+
+    Identical unfinished jobs, as given by their key, are coalesced into one so that double submits share one call.
+    """
+
+    def __init__(self, workers: int = 4, max_pending: int = 32, use_processes: bool = False,
+                 max_finished: int = 1024) -> None:
+        """
+        Create a new JobQueue with the given number of workers.
+
+        At most max_pending jobs may be waiting or running at once, and the last max_finished finished jobs are kept
+        for polling. Processes need the job function and its arguments to be picklable.
+        """
+        self._executor: Executor = ProcessPoolExecutor(workers) if use_processes else ThreadPoolExecutor(workers)
+        self._max_pending = max_pending
+        self._max_finished = max_finished
+        self._lock = threading.Lock()
+        self._unfinished: dict[str, PlanningJob] = {}
+        self._by_id: OrderedDict[str, PlanningJob] = OrderedDict()
+
+    @property
+    def pending(self):
+        return len(self._unfinished)
+
+    def submit(self, key: str, func: Callable, *args, **kwargs) -> PlanningJob:
+        """
+        Given a key identifying the request and a function with its arguments, run the function as a job.
+
+        Returns the job that is already running for the same key if there is one. Raises a QueueFullException if
+        max_pending jobs are unfinished.
+        """
+        with self._lock:
+            job = self._unfinished.get(key)
+            if job is not None:
+                return job
+            if len(self._unfinished) >= self._max_pending:
+                raise QueueFullException(f"Planning queue is full ({self._max_pending} jobs pending).")
+
+            job = PlanningJob(uuid.uuid4().hex, key, self._executor.submit(func, *args, **kwargs))
+            self._unfinished[key] = job
+            self._by_id[job.job_id] = job
+            # forget the oldest finished jobs; unfinished ones are kept until they finish
+            while len(self._by_id) > self._max_pending + self._max_finished:
+                oldest_id, oldest = next(iter(self._by_id.items()))
+                if oldest.done():
+                    del self._by_id[oldest_id]
+                else:
+                    self._by_id.move_to_end(oldest_id)
+
+        job._future.add_done_callback(lambda _: self._finish(job))
+        return job
+
+    def _finish(self, job: PlanningJob) -> None:
+        with self._lock:
+            if self._unfinished.get(job.key) is job:
+                del self._unfinished[job.key]
+
+    def get(self, job_id: str) -> PlanningJob | None:
+        """
+        Given a job id, return the job, or None if it is unknown or was finished too long ago.
+        """
+        with self._lock:
+            return self._by_id.get(job_id)
+
+    def shutdown(self, wait: bool = True) -> None:
+        self._executor.shutdown(wait = wait)
+
+
+__all__ = [QueueFullException.__name__, PlanningJob.__name__, JobQueue.__name__]
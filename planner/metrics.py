@@ -0,0 +1,197 @@
+"""
+Module to record timings and counts on the Planner's hot paths and to expose them in Prometheus text format.
+"""
+
+
+
+import bisect
+import threading
+import time
+from collections.abc import Iterator
+from contextlib import contextmanager
+
+
+class MetricsException(Exception):
+    """
+    Exceptions when registering or recording metrics.
+    """
+    pass
+
+
+# seconds, from a cache hit up to a slow model reply
+DEFAULT_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\"", "\\\"").replace("\n", "\\n")
+
+
+def _label_text(label_names: tuple[str, ...], label_values: tuple[str, ...], extra: str = "") -> str:
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(label_names, label_values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+class _Metric:
+    """
+    Parent class for metrics, holding one value per combination of label values.
+    """
+    kind = ""
+
+    def __init__(self, name: str, help_text: str, label_names: tuple[str, ...] = ()) -> None:
+        self._name = name
+        self._help = help_text
+        self._label_names = tuple(label_names)
+        self._lock = threading.Lock()
+        self._values = {}
+        # a metric without labels is rendered as zero before anything is recorded
+        if not self._label_names:
+            self._values[()] = self._initial()
+
+    def _initial(self):
+        return 0
+
+    @property
+    def name(self):
+        return self._name
+
+    def _key(self, labels: dict[str, str]) -> tuple[str, ...]:
+        if labels.keys() != set(self._label_names):
+            raise MetricsException(f"Metric {self._name} takes the labels {', '.join(self._label_names) or 'none'}.")
+        return tuple(str(labels[name]) for name in self._label_names)
+
+    def render(self) -> list[str]:
+        """
+        Return the lines of this metric in Prometheus text format.
+        """
+        lines = [f"# HELP {self._name} {self._help}", f"# TYPE {self._name} {self.kind}"]
+        with self._lock:
+            items = sorted(self._values.items())
+        for key, value in items:
+            lines.extend(self._render_value(key, value))
+        return lines
+
+    def _render_value(self, key: tuple[str, ...], value) -> list[str]:
+        return [f"{self._name}{_label_text(self._label_names, key)} {value}"]
+
+
+class CounterMetric(_Metric):
+    """
+    A count that only goes up, such as the number of failed calls.
+    """
+    kind = "counter"
+
+    def inc(self, amount: float = 1, **labels: str) -> None:
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def value(self, **labels: str) -> float:
+        return self._values.get(self._key(labels), 0)
+
+
+class HistogramMetric(_Metric):
+    """
+    Counts of observed values, such as durations in seconds, in cumulative buckets, with their sum and count.
+    """
+    kind = "histogram"
+
+    def __init__(self, name: str, help_text: str, label_names: tuple[str, ...] = (),
+                 buckets: tuple[float, ...] = DEFAULT_BUCKETS) -> None:
+        self._buckets = tuple(sorted(buckets))
+        super().__init__(name, help_text, label_names)
+
+    def _initial(self) -> list:
+        # one count per bucket plus one for values above every bucket, then the sum
+        return [0] * (len(self._buckets) + 1) + [0.0]
+
+    def observe(self, value: float, **labels: str) -> None:
+        key = self._key(labels)
+        index = bisect.bisect_left(self._buckets, value)
+        with self._lock:
+            counts = self._values.get(key)
+            if counts is None:
+                counts = self._values[key] = self._initial()
+            counts[index] += 1
+            counts[-1] += value
+
+    @contextmanager
+    def time(self, **labels: str) -> Iterator[None]:
+        """
+        Observe the seconds spent in the with block, even if it raises.
+        """
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - start, **labels)
+
+    def count(self, **labels: str) -> int:
+        counts = self._values.get(self._key(labels))
+        return 0 if counts is None else sum(counts[:-1])
+
+    def _render_value(self, key: tuple[str, ...], counts: list) -> list[str]:
+        lines = []
+        total = 0
+        for bound, count in zip(self._buckets + (float("inf"),), counts):
+            total += count
+            le = 'le="+Inf"' if bound == float("inf") else f'le="{bound!r}"'
+            lines.append(f"{self._name}_bucket{_label_text(self._label_names, key, le)} {total}")
+        labels = _label_text(self._label_names, key)
+        lines.append(f"{self._name}_sum{labels} {counts[-1]}")
+        lines.append(f"{self._name}_count{labels} {total}")
+        return lines
+
+
+class MetricsRegistry:
+    """
+    Holds every metric by name so that they can be rendered together.
+    """
+
+    def __init__(self) -> None:
+        """
+        Create a new, empty MetricsRegistry.
+        """
+        self._metrics = {}
+        self._lock = threading.Lock()
+
+    def _register(self, metric: _Metric) -> _Metric:
+        with self._lock:
+            if metric.name in self._metrics:
+                raise MetricsException(f"Metric {metric.name} is already registered.")
+            self._metrics[metric.name] = metric
+        return metric
+
+    def counter(self, name: str, help_text: str, label_names: tuple[str, ...] = ()) -> CounterMetric:
+        return self._register(CounterMetric(name, help_text, label_names))
+
+    def histogram(self, name: str, help_text: str, label_names: tuple[str, ...] = (),
+                  buckets: tuple[float, ...] = DEFAULT_BUCKETS) -> HistogramMetric:
+        return self._register(HistogramMetric(name, help_text, label_names, buckets))
+
+    def render(self) -> str:
+        """
+        Return every metric in Prometheus text format.
+        """
+        with self._lock:
+            metrics = list(self._metrics.values())
+        return "\n".join(line for metric in metrics for line in metric.render()) + "\n"
+
+
+REGISTRY = MetricsRegistry()
+
+STAGE_SECONDS = REGISTRY.histogram(
+    "planner_stage_seconds", "Seconds spent in each stage of handling a planning request.", ("stage",))
+API_ERRORS = REGISTRY.counter(
+    "planner_api_errors_total", "Failed calls to the model, by HTTP status or none if no response arrived.",
+    ("status",))
+PARSE_FAILURES = REGISTRY.counter(
+    "planner_parse_failures_total", "Model replies that could not be interpreted as OutputTasks.")
+INVALID_PARTS = REGISTRY.counter(
+    "planner_invalid_parts_total", "Parts of the model's schedules that broke the input's constraints, by problem.",
+    ("problem",))
+
+
+__all__ = [MetricsException.__name__, CounterMetric.__name__, HistogramMetric.__name__, MetricsRegistry.__name__,
+        'REGISTRY', 'STAGE_SECONDS', 'API_ERRORS', 'PARSE_FAILURES', 'INVALID_PARTS', 'DEFAULT_BUCKETS']
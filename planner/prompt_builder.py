@@ -0,0 +1,181 @@
+"""
+Module to build compact planning prompts for the model and to split large task lists into prompts that fit its budget.
+"""
+
+
+
+import datetime
+import re
+from collections import Counter
+from collections.abc import Mapping
+
+from planner.task import InputTask
+
+
+class PromptBuilderException(Exception):
+    """
+    Exceptions when building prompts for the model.
+    """
+    pass
+
+
+_PLANNING_RULES = (
+    "You are a planner. Schedule the given tasks to reduce procrastination while balancing the number of task parts "
+    "on each day. Do earlier-due tasks first, never schedule a part on or after its due date, and schedule late tasks "
+    "and tasks due today for today. Split every task into its number of parts, with parts in order on the same or "
+    "later days."
+)
+
+_INPUT_FORMAT = (
+    "Input: the first line gives today as DD MM YYYY. Each task is one line of id;days until due;parts;name;"
+    "description, where - means NONE. $N stands for the text given on a line $N=text. An optional line "
+    "Busy: D*N ... means N parts are already scheduled D days from today.\n"
+)
+
+COMPACT_SYSTEM_PROMPT = (
+    _PLANNING_RULES + " If a task has no name, generate a short one from its description.\n" + _INPUT_FORMAT +
+
+    "Output, with nothing else: for every part, TASK [name] DATE [DD] [MM] [YYYY] DESC [description or NONE] PARTS "
+    "[part number] [total parts], separated by spaces. Always write names and descriptions out in full.\n"
+
+    "Example: Today 01 01 2000\n1;4;2;Reading;-\n2;14;1;-;Book report\n"
+    "Output: TASK Reading DATE 01 01 2000 DESC NONE PARTS 1 2 TASK Reading DATE 02 01 2000 DESC NONE PARTS 2 2 "
+    "TASK Book Report DATE 03 01 2000 DESC Book report PARTS 1 1"
+)
+
+# Asks for only the task ids and the day of each part, which the decoder expands using the InputTasks
+COMPACT_OUTPUT_SYSTEM_PROMPT = (
+    _PLANNING_RULES + "\n" + _INPUT_FORMAT +
+
+    "Output, with nothing else: one line per task of id:days, where days are the days from today of its parts in "
+    "order, separated by commas.\n"
+
+    "Example: Today 01 01 2000\n1;4;2;Reading;-\n2;14;1;-;Book report\n"
+    "Output: 1:0,1\n2:2"
+)
+
+# Roughly what a BPE tokenizer does: short words and runs of up to three digits are one token, longer words are
+# split about every six letters, and every other symbol is its own token
+_TOKEN_RE = re.compile(r"[A-Za-z]+|\d{1,3}|[^\sA-Za-z\d]")
+
+# The longest plausible output part: TASK, name, DATE, day, month, year, DESC, description, PARTS, and two numbers
+_OUTPUT_PART_TOKENS = 12
+# In the compact output, a task is its id and a colon, and each part a number and a comma
+_OUTPUT_TASK_ID_TOKENS = 3
+_OUTPUT_OFFSET_TOKENS = 2
+# A busy days line has at most one D*N entry for each day until the last due date
+_BUSY_DAY_TOKENS = 3
+
+DEFAULT_MAX_TOKENS = 8000
+
+
+def estimate_tokens(text: str) -> int:
+    """
+    Given a string, return an estimate of the number of tokens the model will count for it.
+
+    The estimate does not depend on the model's tokenizer, so it is only good for budgeting, usually to within a fifth.
+    """
+    tokens = 0
+    for piece in _TOKEN_RE.findall(text):
+        tokens += 1 + (len(piece) - 1) // 6 if piece[0].isalpha() else 1
+    return tokens
+
+
+def _check_tasks(input_tasks: list[InputTask]) -> None:
+    if not isinstance(input_tasks, list):
+        raise PromptBuilderException("Input Task list is not a list.")
+    for task in input_tasks:
+        if not isinstance(task, InputTask):
+            raise PromptBuilderException("Object in list is not an InputTask.")
+
+
+def _field(text: str) -> str:
+    # the separator and the NONE marker cannot appear inside a field
+    return "-" if not text or text == "NONE" else text.replace(";", ",").replace("\n", " ")
+
+
+def encode_tasks(input_tasks: list[InputTask], today: datetime.date | None = None,
+                 busy: Mapping[int, int] | None = None) -> str:
+    """
+    Given a list of InputTasks, create the compact query for COMPACT_SYSTEM_PROMPT.
+
+    Due dates are given as days from today, and names and descriptions used by more than one task are written once and
+    referred to by a short id. busy maps days from today to the number of parts already scheduled on them.
+    """
+    _check_tasks(input_tasks)
+    if today is None:
+        today = datetime.date.today()
+    start = today.toordinal()
+
+    counts = Counter()
+    for task in input_tasks:
+        counts[_field(task.name)] += 1
+        counts[_field(task.desc)] += 1
+    refs = {}
+    lines = [f"Today {today.day:02d} {today.month:02d} {today.year:04d}"]
+    for text, count in counts.items():
+        # short text costs about as much as its reference plus its share of the legend line
+        if count > 1 and len(text) > 8:
+            refs[text] = f"${len(refs) + 1}"
+            lines.append(f"{refs[text]}={text}")
+
+    for task_id, task in enumerate(input_tasks, 1):
+        name = _field(task.name)
+        desc = _field(task.desc)
+        lines.append(f"{task_id};{task.ordinal - start};{task.parts};{refs.get(name, name)};{refs.get(desc, desc)}")
+
+    if busy:
+        lines.append("Busy: " + " ".join(f"{day}*{count}" for day, count in sorted(busy.items())
+                                         if day >= 0 and count > 0))
+    return "\n".join(lines)
+
+
+def task_tokens(task: InputTask, compact_output: bool = False) -> int:
+    """
+    Given an InputTask, return an estimate of the tokens it takes in a compact query plus the tokens of its parts
+    in the model's reply, written in the format of COMPACT_OUTPUT_SYSTEM_PROMPT if compact_output is set.
+    """
+    query = estimate_tokens(f"{task.parts};{_field(task.name)};{_field(task.desc)}") + 4
+    if compact_output:
+        return query + _OUTPUT_TASK_ID_TOKENS + max(task.parts, 1) * _OUTPUT_OFFSET_TOKENS
+    return query + max(task.parts, 1) * (_OUTPUT_PART_TOKENS + estimate_tokens(task.name) + estimate_tokens(task.desc))
+
+
+def chunk_tasks(input_tasks: list[InputTask], today: datetime.date | None = None,
+                max_tokens: int = DEFAULT_MAX_TOKENS, compact_output: bool = False) -> list[list[InputTask]]:
+    """
+    Given a list of InputTasks and a token budget for each request, split the tasks into chunks by due date.
+
+    Each chunk holds the tasks due in one window of dates, and its compact query, busy days line, and the model's reply
+    together stay within max_tokens, counting COMPACT_SYSTEM_PROMPT, or COMPACT_OUTPUT_SYSTEM_PROMPT and its shorter
+    reply if compact_output is set. A task that does not fit on its own gets a chunk to itself.
+    """
+    _check_tasks(input_tasks)
+    if today is None:
+        today = datetime.date.today()
+    start = today.toordinal()
+    # leave room for the system prompt and the date line
+    system_prompt = COMPACT_OUTPUT_SYSTEM_PROMPT if compact_output else COMPACT_SYSTEM_PROMPT
+    budget = max_tokens - estimate_tokens(system_prompt) - 16
+    if budget <= 0:
+        raise PromptBuilderException("Token budget is smaller than the system prompt.")
+
+    chunks = []
+    chunk = []
+    used = 0
+    for task in sorted(input_tasks, key = lambda task: task.ordinal):
+        tokens = task_tokens(task, compact_output)
+        # tasks are sorted, so the busy days line of the chunk reaches up to this task's due date
+        if chunk and used + tokens + _BUSY_DAY_TOKENS * max(task.ordinal - start, 0) > budget:
+            chunks.append(chunk)
+            chunk = []
+            used = 0
+        chunk.append(task)
+        used += tokens
+    if chunk:
+        chunks.append(chunk)
+    return chunks
+
+
+__all__ = [PromptBuilderException.__name__, estimate_tokens.__name__, encode_tasks.__name__, task_tokens.__name__,
+        chunk_tasks.__name__, 'COMPACT_SYSTEM_PROMPT', 'COMPACT_OUTPUT_SYSTEM_PROMPT', 'DEFAULT_MAX_TOKENS']
@@ -0,0 +1,285 @@
+"""
+Module to make calls to DeepSeek resilient: retries with backoff, hedged requests, and a circuit breaker.
+"""
+
+
+
+import datetime
+import random
+import threading
+import time
+import weakref
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+
+from planner.deepseek_processor import SYSTEM_PROMPT, APIException, ModelClient, get_model_client
+from planner.response_cache import ResponseCache, make_cache_key
+
+
+class CircuitOpenException(APIException):
+    """
+    Exceptions when a call is refused because the circuit breaker is open.
+    """
+    pass
+
+
+def is_retryable(error: APIException) -> bool:
+    """
+    Given an APIException, return whether the call may succeed if it is tried again.
+
+    No response at all, rate limiting, and server errors are worth retrying; other client errors are not.
+    """
+    return error.status_code is None or error.status_code == 429 or error.status_code >= 500
+
+
+def backoff_delay(attempt: int, base_delay: float = 0.5, max_delay: float = 30.0, retry_after: float | None = None,
+                  rng: random.Random | None = None) -> float:
+    """
+    Given the number of attempts that already failed, return the seconds to wait before the next one.
+
+    Uses exponential backoff with full jitter, so that clients that failed together do not retry together, and never
+    waits less than the Retry-After the API asked for.
+    """
+    delay = (rng or random).uniform(0, min(max_delay, base_delay * 2 ** attempt))
+    if retry_after is not None:
+        delay = max(delay, retry_after)
+    return delay
+
+
+class LatencyTracker:
+    """
+    Keeps the latencies of the most recent successful calls to estimate percentiles.
+    """
+
+    def __init__(self, window: int = 256) -> None:
+        """
+        Create a new LatencyTracker remembering up to window latencies.
+        """
+        self._latencies = deque(maxlen = window)
+        self._lock = threading.Lock()
+
+    def record(self, seconds: float) -> None:
+        with self._lock:
+            self._latencies.append(seconds)
+
+    def __len__(self) -> int:
+        return len(self._latencies)
+
+    def percentile(self, percent: float) -> float | None:
+        """
+        Given a percentage, return that percentile of the recorded latencies, or None if none were recorded.
+        """
+        with self._lock:
+            latencies = sorted(self._latencies)
+        if not latencies:
+            return None
+        return latencies[min(int(len(latencies) * percent / 100), len(latencies) - 1)]
+
+
+class CircuitBreaker:
+    """
+    Stops calls to an upstream that keeps failing, so callers fail fast instead of waiting on it.
+
+    The breaker opens after failure_threshold failures in a row. Once reset_timeout seconds have passed, one trial call
+    is let through (half open); its success closes the breaker and its failure opens it again.
+    """
+
+    def __init__(self, failure_threshold: int = 5, reset_timeout: float = 30.0) -> None:
+        """
+        Create a new, closed CircuitBreaker.
+        """
+        self._failure_threshold = failure_threshold
+        self._reset_timeout = reset_timeout
+        self._lock = threading.Lock()
+        self._failures = 0
+        self._opened_at = None
+        self._trial = False
+
+    @property
+    def state(self):
+        with self._lock:
+            if self._opened_at is None:
+                return "closed"
+            if self._trial or time.monotonic() - self._opened_at >= self._reset_timeout:
+                return "half_open"
+            return "open"
+
+    def allow(self) -> bool:
+        """
+        Return whether a call may go through now, counting it as the trial call if the breaker is half open.
+        """
+        with self._lock:
+            if self._opened_at is None:
+                return True
+            if self._trial or time.monotonic() - self._opened_at < self._reset_timeout:
+                return False
+            self._trial = True
+            return True
+
+    def record_success(self) -> None:
+        with self._lock:
+            self._failures = 0
+            self._opened_at = None
+            self._trial = False
+
+    def record_failure(self) -> None:
+        with self._lock:
+            self._failures += 1
+            if self._trial or self._failures >= self._failure_threshold:
+                self._opened_at = time.monotonic()
+                self._trial = False
+
+
+class ResilientModelClient:
+    """
+    Wraps a ModelClient with retries, optional hedged requests, and a circuit breaker.
+
+    Failed calls are retried with exponential backoff and jitter, honoring Retry-After. With hedging on, a second
+    request is sent when the first has taken longer than the p95 latency of recent calls, and whichever answers first
+    wins. While the circuit breaker is open, calls raise a CircuitOpenException right away, which callers can catch as
+    an APIException to fall back to the local scheduler; cached plans are still returned.
+    """
+
+    def __init__(self, client: ModelClient, retries: int = 3, base_delay: float = 0.5, max_delay: float = 30.0,
+                 hedge: bool = False, hedge_percentile: float = 95, hedge_min_samples: int = 20,
+                 breaker: CircuitBreaker | None = None, workers: int = 8) -> None:
+        """
+        Create a new ResilientModelClient around client, trying each call up to retries more times.
+
+        Hedging only starts once hedge_min_samples latencies are known. workers bounds the threads used for hedging.
+        """
+        self._client = client
+        self._retries = retries
+        self._base_delay = base_delay
+        self._max_delay = max_delay
+        self._hedge = hedge
+        self._hedge_percentile = hedge_percentile
+        self._hedge_min_samples = hedge_min_samples
+        self._breaker = breaker or CircuitBreaker()
+        self._latencies = LatencyTracker()
+        self._executor = ThreadPoolExecutor(workers) if hedge else None
+        self._rng = random.Random()
+
+    @property
+    def client(self):
+        return self._client
+
+    @property
+    def breaker(self):
+        return self._breaker
+
+    @property
+    def latencies(self):
+        return self._latencies
+
+    def ask(self, query: str, connect_timeout: float | None = None, read_timeout: float | None = None,
+            cache: ResponseCache | None = None, today: datetime.date | None = None,
+            system_prompt: str = SYSTEM_PROMPT, deadline: float | None = None) -> str:
+        """
+        Given a formatted Task string query, ask the model for a plan to tackle all the tasks, retrying failed calls.
+
+        Takes the same arguments as ModelClient.ask, plus a deadline in seconds for all attempts and waits together.
+        Raises the last APIException if every attempt failed or the deadline ran out, or a CircuitOpenException if the
+        upstream is known to be unhealthy.
+        """
+        if cache is not None:
+            key = make_cache_key(self._client.model, system_prompt, query, today)
+            result = cache.get(key)
+            if result is None:
+                result = self.ask(query, connect_timeout, read_timeout, system_prompt = system_prompt,
+                                  deadline = deadline)
+                cache.put(key, result)
+            return result
+
+        start = time.monotonic()
+        attempt = 0
+        while True:
+            if not self._breaker.allow():
+                raise CircuitOpenException("Failed to fetch data from API. The API is failing, not calling it for now.")
+
+            timeout = read_timeout
+            if deadline is not None:
+                remaining = deadline - (time.monotonic() - start)
+                timeout = remaining if timeout is None else min(timeout, remaining)
+            try:
+                result = self._attempt(query, connect_timeout, timeout, system_prompt)
+            except APIException as e:
+                if is_retryable(e):
+                    self._breaker.record_failure()
+                else:
+                    # the upstream answered, so it is healthy even if it did not like this request
+                    self._breaker.record_success()
+                if not is_retryable(e) or attempt >= self._retries:
+                    raise
+                delay = backoff_delay(attempt, self._base_delay, self._max_delay, e.retry_after, self._rng)
+                if deadline is not None and time.monotonic() - start + delay >= deadline:
+                    raise
+                time.sleep(delay)
+                attempt += 1
+            except BaseException:
+                # any other error still ends the call, and a half-open breaker must not wait on its trial forever
+                self._breaker.record_failure()
+                raise
+            else:
+                self._breaker.record_success()
+                return result
+
+    def _timed_ask(self, query: str, connect_timeout: float | None, read_timeout: float | None,
+                   system_prompt: str) -> str:
+        start = time.monotonic()
+        result = self._client.ask(query, connect_timeout, read_timeout, system_prompt = system_prompt)
+        self._latencies.record(time.monotonic() - start)
+        return result
+
+    def _attempt(self, query: str, connect_timeout: float | None, read_timeout: float | None,
+                 system_prompt: str) -> str:
+        """
+        Make one attempt at the call, sending a hedged second request if the first is slower than usual.
+        """
+        args = (query, connect_timeout, read_timeout, system_prompt)
+        if not self._hedge or len(self._latencies) < self._hedge_min_samples:
+            return self._timed_ask(*args)
+
+        first = self._executor.submit(self._timed_ask, *args)
+        done, _ = wait([first], timeout = self._latencies.percentile(self._hedge_percentile))
+        if done:
+            return first.result()
+
+        # the slower request cannot be cancelled, so it finishes in the background and is only recorded
+        pending = {first, self._executor.submit(self._timed_ask, *args)}
+        error = None
+        while pending:
+            done, pending = wait(pending, return_when = FIRST_COMPLETED)
+            for future in done:
+                if future.exception() is None:
+                    return future.result()
+                error = future.exception()
+        raise error
+
+    def close(self) -> None:
+        """
+        Stop the hedging threads; the wrapped ModelClient is left open.
+        """
+        if self._executor is not None:
+            self._executor.shutdown(wait = False)
+
+
+_resilient_clients: "weakref.WeakKeyDictionary[ModelClient, ResilientModelClient]" = weakref.WeakKeyDictionary()
+_resilient_clients_lock = threading.Lock()
+
+
+def get_resilient_client(api_key: str) -> ResilientModelClient:
+    """
+    Given an API Key, return the shared ResilientModelClient around the shared ModelClient for that key.
+    """
+    client = get_model_client(api_key)
+    with _resilient_clients_lock:
+        resilient = _resilient_clients.get(client)
+        if resilient is None:
+            resilient = ResilientModelClient(client)
+            _resilient_clients[client] = resilient
+        return resilient
+
+
+__all__ = [CircuitOpenException.__name__, is_retryable.__name__, backoff_delay.__name__, LatencyTracker.__name__,
+        CircuitBreaker.__name__, ResilientModelClient.__name__, get_resilient_client.__name__]
@@ -0,0 +1,171 @@
+"""
+Module to cache the model's plans so repeated planning queries skip the round trip to DeepSeek.
+"""
+
+
+
+import datetime
+import hashlib
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+
+
+def make_cache_key(model: str, system_prompt: str, query: str, today: datetime.date | None = None) -> str:
+    """
+    Given a model name, system prompt, Task string query, and the date of today, create a content-addressed cache key.
+
+    The date is part of the key because the prompt tells the model that the query date is today.
+    """
+    if today is None:
+        today = datetime.date.today()
+
+    digest = hashlib.sha256()
+    for part in (model, system_prompt, query, today.isoformat()):
+        digest.update(part.encode())
+        # separator so that ("ab", "c") and ("a", "bc") hash differently
+        digest.update(b"\0")
+    return digest.hexdigest()
+
+
+class ResponseCache:
+    """
+    Two-tier cache of model responses: an in-memory LRU with TTL and size-based eviction, and an optional
+    sqlite file that survives restarts.
+    """
+
+    def __init__(self, max_entries: int = 1024, max_bytes: int = 16 * 1024 * 1024, ttl: float = 24 * 60 * 60,
+                 db_path: str | None = None) -> None:
+        """
+        Create a new ResponseCache holding at most max_entries responses and max_bytes of response text in memory.
+
+        Entries older than ttl seconds are treated as missing. Giving a db_path enables the on-disk tier.
+        """
+        self._max_entries = max_entries
+        self._max_bytes = max_bytes
+        self._ttl = ttl
+        self._lock = threading.Lock()
+        # key -> (expiry on the monotonic clock, response, encoded size)
+        self._entries: OrderedDict[str, tuple[float, str, int]] = OrderedDict()
+        self._bytes = 0
+        self._hits = 0
+        self._disk_hits = 0
+        self._misses = 0
+
+        self._db = None
+        if db_path is not None:
+            self._db = sqlite3.connect(db_path, check_same_thread = False)
+            self._db.execute("PRAGMA journal_mode=WAL")
+            self._db.execute("CREATE TABLE IF NOT EXISTS responses (key TEXT PRIMARY KEY, response TEXT NOT NULL, "
+                             "created REAL NOT NULL)")
+            self._db.commit()
+
+    @property
+    def hits(self):
+        return self._hits
+
+    @property
+    def disk_hits(self):
+        return self._disk_hits
+
+    @property
+    def misses(self):
+        return self._misses
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def stats(self) -> dict:
+        """
+        Return the hit and miss counters along with the current size of the in-memory tier.
+        """
+        with self._lock:
+            return {"hits": self._hits, "disk_hits": self._disk_hits, "misses": self._misses,
+                    "entries": len(self._entries), "bytes": self._bytes}
+
+    def get(self, key: str) -> str | None:
+        """
+        Given a cache key, return the cached response or None if it is missing or expired.
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                if entry[0] > time.monotonic():
+                    self._entries.move_to_end(key)
+                    self._hits += 1
+                    return entry[1]
+                self._remove(key)
+
+            if self._db is not None:
+                row = self._db.execute("SELECT response, created FROM responses WHERE key = ?", (key,)).fetchone()
+                if row is not None and row[1] + self._ttl > time.time():
+                    # promote to memory with whatever lifetime it has left
+                    self._insert(key, row[0], row[1] + self._ttl - time.time())
+                    self._hits += 1
+                    self._disk_hits += 1
+                    return row[0]
+
+            self._misses += 1
+            return None
+
+    def put(self, key: str, response: str) -> None:
+        """
+        Given a cache key and a model response, store the response in every tier.
+        """
+        with self._lock:
+            self._insert(key, response, self._ttl)
+            if self._db is not None:
+                self._db.execute("INSERT OR REPLACE INTO responses (key, response, created) VALUES (?, ?, ?)",
+                                 (key, response, time.time()))
+                self._db.commit()
+
+    def clear(self) -> None:
+        """
+        Remove every response from every tier.
+        """
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+            if self._db is not None:
+                self._db.execute("DELETE FROM responses")
+                self._db.commit()
+
+    def purge_expired(self) -> None:
+        """
+        Remove expired responses from the on-disk tier.
+        """
+        if self._db is not None:
+            with self._lock:
+                self._db.execute("DELETE FROM responses WHERE created < ?", (time.time() - self._ttl,))
+                self._db.commit()
+
+    def close(self) -> None:
+        if self._db is not None:
+            self._db.close()
+            self._db = None
+
+    def _insert(self, key: str, response: str, lifetime: float) -> None:
+        """
+        Add a response to the in-memory tier and evict least recently used entries until it fits.
+
+        Must be called with the lock held.
+        """
+        if key in self._entries:
+            self._remove(key)
+        size = len(response.encode())
+        if size > self._max_bytes:
+            return
+        self._entries[key] = (time.monotonic() + lifetime, response, size)
+        self._bytes += size
+        while len(self._entries) > self._max_entries or self._bytes > self._max_bytes:
+            self._remove(next(iter(self._entries)))
+
+    def _remove(self, key: str) -> None:
+        """
+        Remove a response from the in-memory tier. Must be called with the lock held.
+        """
+        self._bytes -= self._entries.pop(key)[2]
+
+
+__all__ = [make_cache_key.__name__, ResponseCache.__name__]
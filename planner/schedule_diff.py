@@ -0,0 +1,130 @@
+"""
+Module to find the smallest set of added, moved, and removed parts that turns one schedule of OutputTasks into another.
+"""
+
+
+
+import hashlib
+from collections.abc import Iterable
+
+from planner.task import OutputTask
+from planner.task_interpreter import task_to_dict
+
+
+class ScheduleDiffException(Exception):
+    """
+    Exceptions when comparing schedules.
+    """
+    pass
+
+
+def part_key(task: OutputTask, copies: int) -> tuple:
+    """
+    Given an OutputTask and the number of copies of it earlier in its schedule, return its part key.
+
+    A part's key is its task's name and description, its part number, and a count of earlier copies of the same part.
+    It leaves out the date, so it stays the same when the part moves to another day.
+    """
+    if not isinstance(task, OutputTask):
+        raise ScheduleDiffException("Object in schedule is not an OutputTask.")
+    return (task.name, task.desc, task.part_num, copies)
+
+
+def key_parts(output_tasks: Iterable[OutputTask]) -> dict[tuple, OutputTask]:
+    """
+    Given OutputTasks, return them by their part key, counting copies in the order given.
+    """
+    keyed = {}
+    # the next count of each part scheduled more than once, so every copy keeps its own key
+    copies = {}
+    for task in output_tasks:
+        if not isinstance(task, OutputTask):
+            raise ScheduleDiffException("Object in schedule is not an OutputTask.")
+        # built in place rather than with part_key, as this runs for every part of a schedule
+        key = (task.name, task.desc, task.part_num, 0)
+        if key in keyed:
+            part = key[:3]
+            count = copies.get(part, 1)
+            copies[part] = count + 1
+            key = part + (count,)
+        keyed[key] = task
+    return keyed
+
+
+def part_id(key: tuple) -> str:
+    """
+    Given a part key, return a short id for it that is the same in every process.
+
+    Only parts that are sent need an id, so hashing is left out of key_parts.
+    """
+    return hashlib.blake2b(repr(key).encode(), digest_size = 8).hexdigest()
+
+
+class ScheduleDiff:
+    """
+    The parts added to, moved within, and removed from a schedule, each under its part key.
+    """
+
+    def __init__(self, added: dict[tuple, OutputTask], moved: dict[tuple, OutputTask], removed: list[tuple]) -> None:
+        """
+        Create a new ScheduleDiff.
+        """
+        self._added = added
+        self._moved = moved
+        self._removed = removed
+
+    @property
+    def added(self):
+        return self._added
+
+    @property
+    def moved(self):
+        return self._moved
+
+    @property
+    def removed(self):
+        return self._removed
+
+    def __bool__(self) -> bool:
+        return bool(self._added or self._moved or self._removed)
+
+    def __len__(self) -> int:
+        return len(self._added) + len(self._moved) + len(self._removed)
+
+    def to_dict(self) -> dict:
+        """
+        Return the diff as a dictionary of plain values, for sending as JSON.
+        """
+        return {"added": [{"id": part_id(key), **task_to_dict(task)} for key, task in self._added.items()],
+                "moved": [{"id": part_id(key), **task_to_dict(task)} for key, task in self._moved.items()],
+                "removed": [part_id(key) for key in self._removed]}
+
+
+def diff_keyed_parts(before: dict[tuple, OutputTask], after: dict[tuple, OutputTask]) -> ScheduleDiff:
+    """
+    Given two schedules keyed by key_parts, return the ScheduleDiff from before to after.
+
+    Parts are matched by their key in one pass over each schedule, so the diff takes O(N + M) time. A matched part
+    whose date or number of parts changed is moved, and parts that did not change are left out.
+    """
+    added = {}
+    moved = {}
+    for key, task in after.items():
+        previous = before.get(key)
+        if previous is None:
+            added[key] = task
+        elif previous != task:
+            moved[key] = task
+    removed = [key for key in before if key not in after]
+    return ScheduleDiff(added, moved, removed)
+
+
+def diff_schedules(old: Iterable[OutputTask], new: Iterable[OutputTask]) -> ScheduleDiff:
+    """
+    Given two schedules of OutputTasks, return the ScheduleDiff from old to new.
+    """
+    return diff_keyed_parts(key_parts(old), key_parts(new))
+
+
+__all__ = [ScheduleDiffException.__name__, ScheduleDiff.__name__, part_key.__name__, key_parts.__name__,
+        part_id.__name__, diff_keyed_parts.__name__, diff_schedules.__name__]
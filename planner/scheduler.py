@@ -0,0 +1,458 @@
+"""
+Module to schedule Tasks locally, following the same rules the AI is given, without calling DeepSeek.
+"""
+
+
+
+import datetime
+import heapq
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+from operator import attrgetter, itemgetter
+
+from planner.date_index import DateIndex
+from planner.deepseek_processor import APIException
+from planner.metrics import PARSE_FAILURES, STAGE_SECONDS
+from planner.prompt_builder import (COMPACT_OUTPUT_SYSTEM_PROMPT, COMPACT_SYSTEM_PROMPT, DEFAULT_MAX_TOKENS, chunk_tasks,
+                                    encode_tasks)
+from planner.resilience import ResilientModelClient, get_resilient_client
+from planner.response_cache import ResponseCache
+from planner.task import *
+from planner.task_interpreter import (CreateTaskException, TaskInterpreterException, input_tasks_to_lines,
+                                      lines_to_output_tasks, offsets_to_output_tasks, task_display_name)
+
+
+class SchedulerException(Exception):
+    """
+    Exceptions when scheduling Tasks locally.
+    """
+    pass
+
+
+class _DayLoads:
+    """
+    Per-day part counts for a schedule, used to pick the least loaded days for new parts.
+
+    Days count from today. Days that have parts are kept in a heap of (load, day); every other day from fresh_day
+    onwards is empty, so it never needs to be stored.
+    """
+
+    def __init__(self, loads: dict[int, int] | None = None) -> None:
+        """
+        Create a new _DayLoads, optionally starting from existing per-day loads.
+        """
+        # days without parts are left out, so every load in the heap is at least 1
+        self._heap = [(load, day) for day, load in (loads or {}).items() if day >= 0 and load > 0]
+        heapq.heapify(self._heap)
+        self._used = {day for _, day in self._heap}
+        self._fresh_day = 0
+        self._skip_used()
+
+    def _skip_used(self) -> None:
+        while self._fresh_day in self._used:
+            self._fresh_day += 1
+
+    def pick_days(self, count: int, window: int) -> list[int]:
+        """
+        Given a number of parts and a window of days, return the sorted days the parts go on and count them as loaded.
+
+        Each part goes on the least loaded day before window, preferring earlier days.
+        """
+        heap = self._heap
+        set_aside = []
+        days = []
+        for _ in range(count):
+            # Days at or after the window can only be in the heap when loads were given up front; set them aside
+            while heap and heap[0][1] >= window:
+                set_aside.append(heapq.heappop(heap))
+            # an empty day before the window always beats a loaded one
+            if heap and self._fresh_day >= window:
+                load, day = heap[0]
+                heapq.heapreplace(heap, (load + 1, day))
+            else:
+                day = self._fresh_day
+                self._fresh_day += 1
+                self._skip_used()
+                heapq.heappush(heap, (1, day))
+            days.append(day)
+
+        for entry in set_aside:
+            heapq.heappush(heap, entry)
+        # parts are done in order, so the earliest chosen day gets part 1
+        days.sort()
+        return days
+
+
+def _place_tasks(input_tasks: list[InputTask], start: int, loads: dict[int, int] | None = None) -> list[tuple]:
+    """
+    Given InputTasks, the ordinal of today, and optionally existing per-day loads, return (day, name, desc, part_num,
+    total_parts) for every part of the tasks, sorted by day.
+    """
+    if not isinstance(input_tasks, list):
+        raise SchedulerException("Input Task list is not a list.")
+
+    # Earliest due date first; ties keep the order the tasks were given in
+    queue = []
+    for index, task in enumerate(input_tasks):
+        if not isinstance(task, InputTask):
+            raise SchedulerException("Object in list is not an InputTask.")
+        queue.append((task.ordinal, index, task))
+    heapq.heapify(queue)
+
+    day_loads = _DayLoads(loads)
+    placed = []
+    while queue:
+        due, _, task = heapq.heappop(queue)
+        total_parts = max(task.parts, 1)
+        name = task_display_name(task)
+        for part_num, day in enumerate(day_loads.pick_days(total_parts, max(due - start, 1)), 1):
+            placed.append((day, name, task.desc, part_num, total_parts))
+
+    placed.sort(key = itemgetter(0))
+    return placed
+
+
+def _to_output_tasks(placed: list[tuple], start: int) -> list[OutputTask]:
+    from_ordinal = OutputTask.from_ordinal
+    return [from_ordinal(name, start + day, desc, part_num, total_parts)
+            for day, name, desc, part_num, total_parts in placed]
+
+
+def schedule_tasks(input_tasks: list[InputTask], today: datetime.date | None = None) -> list[OutputTask]:
+    """
+    Given a list of InputTasks, create a schedule of OutputTasks starting today.
+
+    Tasks are taken earliest due date first, so late tasks come first. Each task is split into its requested number
+    of parts, and every part goes on the least loaded day before the task's due date, preferring earlier days. Late
+    tasks and tasks due today are done today. Runs in O(P log P) time for P parts in total.
+    """
+    if today is None:
+        today = datetime.date.today()
+    start = today.toordinal()
+    return _to_output_tasks(_place_tasks(input_tasks, start), start)
+
+
+def _split_changes(schedule: list[OutputTask], added: list[InputTask], removed: list[InputTask],
+                   changed: list[tuple[InputTask, InputTask]]) -> tuple[list[OutputTask], list[InputTask]]:
+    """
+    Given a schedule and a delta of InputTasks, return the OutputTasks that stay pinned and the InputTasks to place.
+
+    A changed task is its old version removed and its new version added. Removed tasks with a name match parts by name
+    and description; removed tasks without one match by description, since the AI generates names for them.
+    """
+    if not isinstance(schedule, list):
+        raise SchedulerException("Output Task schedule is not a list.")
+    removed = list(removed) + [old for old, _ in changed]
+    to_place = list(added) + [new for _, new in changed]
+
+    named = set()
+    unnamed = set()
+    for task in removed:
+        if not isinstance(task, InputTask):
+            raise SchedulerException("Object in list is not an InputTask.")
+        if task.name and task.name != "NONE" or not task.desc or task.desc == "NONE":
+            named.add((task_display_name(task), task.desc))
+        else:
+            unnamed.add(task.desc)
+
+    pinned = []
+    for task in schedule:
+        if not isinstance(task, OutputTask):
+            raise SchedulerException("Object in schedule is not an OutputTask.")
+        if (task.name, task.desc) not in named and task.desc not in unnamed:
+            pinned.append(task)
+    return pinned, to_place
+
+
+def _merge_by_date(pinned: list[OutputTask], new_parts: list[OutputTask]) -> list[OutputTask]:
+    return sorted(pinned + new_parts, key = attrgetter('ordinal'))
+
+
+def replan_tasks(schedule: list[OutputTask], added: list[InputTask] = (), removed: list[InputTask] = (),
+                 changed: list[tuple[InputTask, InputTask]] = (), today: datetime.date | None = None) -> list[OutputTask]:
+    """
+    Given an existing schedule and the InputTasks that were added, removed, or changed as (old, new) pairs, update the
+    schedule without moving any part that is not affected.
+
+    Parts of removed and changed tasks are dropped, and parts of added and changed tasks are placed around the loads
+    left by the pinned parts, using the same rules as schedule_tasks.
+    """
+    if today is None:
+        today = datetime.date.today()
+    start = today.toordinal()
+
+    pinned, to_place = _split_changes(schedule, added, removed, changed)
+    return _merge_by_date(pinned, _place_around(pinned, to_place, start))
+
+
+def _place_around(pinned: list[OutputTask], to_place: list[InputTask], start: int) -> list[OutputTask]:
+    loads = Counter(task.ordinal - start for task in pinned)
+    return _to_output_tasks(_place_tasks(to_place, start, loads), start)
+
+
+def place_new_tasks(schedule: list[OutputTask], added: list[InputTask],
+                    today: datetime.date | None = None) -> list[OutputTask]:
+    """
+    Given an existing schedule and added InputTasks, return only the parts of the added tasks, placed around the
+    schedule's loads as replan_tasks would place them.
+
+    A new part may be equal to a part already in the schedule, so callers that store the new parts should take them
+    from here rather than filter them out of replan_tasks' result.
+    """
+    if today is None:
+        today = datetime.date.today()
+    pinned, to_place = _split_changes(schedule, added, (), ())
+    return _place_around(pinned, to_place, today.toordinal())
+
+
+def build_replan_query(pinned: list[OutputTask], to_place: list[InputTask], today: datetime.date | None = None) -> str:
+    """
+    Given the pinned parts of a schedule and the InputTasks to place, create a reduced query for the model.
+
+    Only the pinned parts that fall between today and the last new due date are sent, so that the model can balance
+    the new parts against them without the rest of the schedule.
+    """
+    if today is None:
+        today = datetime.date.today()
+    start = today.toordinal()
+    end = max((task.ordinal for task in to_place), default = start)
+
+    window = [task for task in pinned if start <= task.ordinal < end]
+    query = input_tasks_to_lines(to_place)
+    if window:
+        query = ("Already scheduled, do not move or repeat these: " + input_tasks_to_lines(window) +
+                 "\nSchedule only these new tasks: " + query)
+    return query
+
+
+def plan_task_changes(api_key: str, schedule: list[OutputTask], added: list[InputTask] = (),
+                      removed: list[InputTask] = (), changed: list[tuple[InputTask, InputTask]] = (),
+                      today: datetime.date | None = None, cache: ResponseCache | None = None,
+                      timeout: float | None = None) -> list[OutputTask]:
+    """
+    Given an API Key, an existing schedule, and the InputTasks that were added, removed, or changed, ask the model to
+    place only the affected parts.
+
+    Falls back to replan_tasks if the model still fails after retries, takes longer than timeout seconds, or replies
+    with something that cannot be interpreted.
+    """
+    pinned, to_place = _split_changes(schedule, added, removed, changed)
+    if not to_place:
+        return pinned
+
+    try:
+        with STAGE_SECONDS.time(stage = "prompt_build"):
+            query = build_replan_query(pinned, to_place, today)
+        reply = get_resilient_client(api_key).ask(query, cache = cache, today = today, deadline = timeout)
+        pinned_lines = {str(task) for task in pinned}
+        # drop any pinned parts the model echoed back
+        new_parts = [task for task in parse_reply(reply) if str(task) not in pinned_lines]
+        return _merge_by_date(pinned, new_parts)
+    except (APIException, CreateTaskException, TaskInterpreterException):
+        return replan_tasks(schedule, added, removed, changed, today)
+
+
+def parse_reply(reply: str, input_tasks: list[InputTask] | None = None,
+                today: datetime.date | None = None) -> list[OutputTask]:
+    """
+    Given the model's reply, return its OutputTasks, recording how long parsing took and whether it failed.
+
+    If the InputTasks of a compact query are given, a reply in the compact output format is expanded using them; a
+    reply of whole OutputTasks is still read as it is.
+    """
+    with STAGE_SECONDS.time(stage = "response_parse"):
+        try:
+            if input_tasks is not None and isinstance(reply, str) and not reply.lstrip().startswith("TASK"):
+                return offsets_to_output_tasks(reply, input_tasks, today)
+            return lines_to_output_tasks(reply)
+        except (CreateTaskException, TaskInterpreterException):
+            PARSE_FAILURES.inc()
+            raise
+
+
+def _ask_compact(client: ResilientModelClient, input_tasks: list[InputTask], today: datetime.date, busy: Counter | None,
+                 cache: ResponseCache | None, timeout: float | None, compact_output: bool = False) -> list[OutputTask]:
+    """
+    Given a ModelClient and InputTasks, ask the model for their parts using a compact query, and a compact reply if
+    compact_output is set.
+    """
+    with STAGE_SECONDS.time(stage = "prompt_build"):
+        query = encode_tasks(input_tasks, today, busy)
+    system_prompt = COMPACT_OUTPUT_SYSTEM_PROMPT if compact_output else COMPACT_SYSTEM_PROMPT
+    reply = client.ask(query, cache = cache, today = today, system_prompt = system_prompt, deadline = timeout)
+    return parse_reply(reply, input_tasks, today)
+
+
+def plan_tasks(api_key: str, input_tasks: list[InputTask], today: datetime.date | None = None,
+               cache: ResponseCache | None = None, timeout: float | None = None,
+               max_tokens: int = DEFAULT_MAX_TOKENS, compact_output: bool = False) -> list[OutputTask]:
+    """
+    Given an API Key and a list of InputTasks, ask the model for a schedule of OutputTasks.
+
+    The tasks are sent as compact queries of at most max_tokens each. With compact_output, the model only answers
+    with the days of each task's parts, which takes far fewer tokens to generate than whole OutputTasks. A list too
+    large for one query is split into windows of due dates that are planned in order, each told how busy the days
+    already planned are. Any window the model still fails on after retries, takes longer than timeout seconds on, or
+    replies to with something that cannot be interpreted is placed by the local scheduler instead.
+    """
+    if today is None:
+        today = datetime.date.today()
+    start = today.toordinal()
+    client = get_resilient_client(api_key)
+
+    # the schedule so far is indexed by date, so each window's busy days are read without scanning every part
+    schedule = DateIndex()
+    for chunk in chunk_tasks(input_tasks, today, max_tokens, compact_output):
+        end = max(task.ordinal for task in chunk)
+        busy = Counter({day - start: load for day, load in schedule.day_loads(end = end).items()})
+        try:
+            schedule.extend(_ask_compact(client, chunk, today, busy, cache, timeout, compact_output))
+        except (APIException, CreateTaskException, TaskInterpreterException):
+            schedule = DateIndex(replan_tasks(schedule.tasks(), added = chunk, today = today))
+    return schedule.tasks()
+
+
+class _LoadTree:
+    """
+    Per-day loads over a fixed range of days, kept in a segment tree of (load, day) minimums.
+
+    Finding the earliest least loaded day of any sub-range and changing a day's load both take O(log D) time for D
+    days, instead of scanning the sub-range.
+    """
+
+    def __init__(self, first: int, last: int, loads: dict[int, int]) -> None:
+        """
+        Create a new _LoadTree of the days from first to last, starting from existing per-day loads.
+        """
+        self._first = first
+        size = 1
+        while size < last - first + 1:
+            size *= 2
+        self._size = size
+        # leaves past the last day are never the least loaded
+        padding = (float("inf"), float("inf"))
+        self._tree = [padding] * size + [(loads.get(day, 0), day) for day in range(first, first + size)]
+        for day in range(last + 1, first + size):
+            self._tree[size + day - first] = padding
+        for index in range(size - 1, 0, -1):
+            self._tree[index] = min(self._tree[2 * index], self._tree[2 * index + 1])
+
+    def add(self, day: int, amount: int) -> None:
+        index = day - self._first + self._size
+        if not self._size <= index < 2 * self._size:
+            return
+        tree = self._tree
+        tree[index] = (tree[index][0] + amount, day)
+        index //= 2
+        while index:
+            tree[index] = min(tree[2 * index], tree[2 * index + 1])
+            index //= 2
+
+    def least(self, low: int, high: int) -> int:
+        """
+        Given a range of days, return the earliest least loaded day from low to high.
+        """
+        tree = self._tree
+        left = low - self._first + self._size
+        right = high - self._first + self._size + 1
+        best = (float("inf"), float("inf"))
+        while left < right:
+            if left & 1:
+                best = min(best, tree[left])
+                left += 1
+            if right & 1:
+                right -= 1
+                best = min(best, tree[right])
+            left //= 2
+            right //= 2
+        return best[1]
+
+
+def merge_schedules(schedules: list[list[OutputTask]], input_tasks: list[InputTask],
+                    today: datetime.date | None = None) -> list[OutputTask]:
+    """
+    Given schedules that were planned separately, earliest due dates first, and the InputTasks they were planned from,
+    merge them into one schedule.
+
+    Each part keeps its planned day unless that day is busier, counting every schedule, by more than one part than the
+    least loaded day the part may go on, or is not a day the part may go on at all; then the part moves to the earliest
+    least loaded day. A part may go on any day from today, or from its previous part's day, up to the day before its
+    task's due date. Parts that match no InputTask are never moved. Takes O(P log D) time for P parts and D days.
+    """
+    if today is None:
+        today = datetime.date.today()
+    start = today.toordinal()
+
+    # the model names unnamed tasks itself, so those are found by their description alone
+    named_dues = {}
+    unnamed_dues = {}
+    for task in input_tasks:
+        if task.name and task.name != "NONE" or not task.desc or task.desc == "NONE":
+            dues, key = named_dues, (task_display_name(task), task.desc)
+        else:
+            dues, key = unnamed_dues, task.desc
+        dues[key] = min(dues.get(key, task.ordinal), task.ordinal)
+
+    loads = Counter(task.ordinal for schedule in schedules for task in schedule)
+    last = max([start] + [due - 1 for due in named_dues.values()] + [due - 1 for due in unnamed_dues.values()])
+    tree = _LoadTree(start, last, loads)
+    merged = []
+    # later windows give way first, so that earlier due dates keep the early days
+    for schedule in reversed(schedules):
+        previous = {}
+        for task in sorted(schedule, key = attrgetter('ordinal', 'part_num')):
+            day = task.ordinal
+            due = named_dues.get((task.name, task.desc), unnamed_dues.get(task.desc))
+            if due is not None:
+                key = (task.name, task.desc, task.total_parts)
+                low = max(start, previous.get(key, start))
+                high = max(due - 1, low)
+                best = tree.least(low, high)
+                if not low <= day <= high or loads[day] > loads[best] + 1:
+                    loads[day] -= 1
+                    loads[best] += 1
+                    tree.add(day, -1)
+                    tree.add(best, 1)
+                    day = best
+                    task = OutputTask.from_ordinal(task.name, day, task.desc, task.part_num, task.total_parts)
+                previous[key] = day
+            merged.append(task)
+    merged.sort(key = attrgetter('ordinal'))
+    return merged
+
+
+def plan_tasks_parallel(api_key: str, input_tasks: list[InputTask], today: datetime.date | None = None,
+                        cache: ResponseCache | None = None, timeout: float | None = None,
+                        max_tokens: int = DEFAULT_MAX_TOKENS, workers: int = 4,
+                        compact_output: bool = False) -> list[OutputTask]:
+    """
+    Given an API Key and a list of InputTasks, ask the model for a schedule of OutputTasks, planning windows of due
+    dates concurrently.
+
+    The tasks are split into windows of at most max_tokens as in plan_tasks, with the same compact_output option, but
+    up to workers windows are planned at once without knowing about each other, and the results are merged with
+    merge_schedules. This takes about as long as the slowest window rather than all of them. Any window the model still
+    fails on after retries is placed by the local scheduler instead.
+    """
+    if today is None:
+        today = datetime.date.today()
+    client = get_resilient_client(api_key)
+    groups = chunk_tasks(input_tasks, today, max_tokens, compact_output)
+
+    def plan_group(group: list[InputTask]) -> list[OutputTask]:
+        try:
+            return _ask_compact(client, group, today, None, cache, timeout, compact_output)
+        except (APIException, CreateTaskException, TaskInterpreterException):
+            return schedule_tasks(group, today)
+
+    if len(groups) <= 1 or workers <= 1:
+        schedules = [plan_group(group) for group in groups]
+    else:
+        with ThreadPoolExecutor(min(workers, len(groups))) as executor:
+            schedules = list(executor.map(plan_group, groups))
+    return merge_schedules(schedules, input_tasks, today)
+
+
+__all__ = [SchedulerException.__name__, schedule_tasks.__name__,
+        replan_tasks.__name__, place_new_tasks.__name__, build_replan_query.__name__, plan_tasks.__name__,
+        plan_task_changes.__name__, merge_schedules.__name__, plan_tasks_parallel.__name__, parse_reply.__name__]
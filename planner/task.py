@@ -4,19 +4,39 @@ Module that contains Task classes: Task parent class with InputTask and OutputTa
 
 
 
+import datetime
+import functools
+import sys
+
+# Parts of the same task share their date far more often than not, so keep recently used dates around
+_date_from_ordinal = functools.lru_cache(maxsize = 4096)(datetime.date.fromordinal)
+
+
+def _intern(text: str) -> str:
+    """
+    Return the interned copy of a string so that every part of a task shares one name and description.
+    """
+    return sys.intern(text) if type(text) is str else text
+
+
+@functools.total_ordering
 class Task:
     """
     Parent classes for Task objects that are used by the Planner.
+
+    The date is stored as a single proleptic Gregorian ordinal, so Tasks sort by date and compare cheaply.
     """
+    __slots__ = ("_name", "_ordinal", "_desc")
+
     def __init__(self, name: str, day: int, month: int, year: int, desc: str) -> None:
         """
         Create a new Task object.
+
+        Raises a ValueError if the day, month, and year do not make a valid date.
         """
-        self._name = name
-        self._day = day
-        self._month = month
-        self._year = year
-        self._desc = desc
+        self._name = _intern(name)
+        self._ordinal = datetime.date(year, month, day).toordinal()
+        self._desc = _intern(desc)
 
     @property
     def name(self):
@@ -24,25 +44,53 @@ class Task:
 
     @property
     def day(self):
-        return self._day
+        return _date_from_ordinal(self._ordinal).day
 
     @property
     def month(self):
-        return self._month
+        return _date_from_ordinal(self._ordinal).month
 
     @property
     def year(self):
-        return self._year
+        return _date_from_ordinal(self._ordinal).year
 
     @property
     def desc(self):
         return self._desc
 
+    @property
+    def ordinal(self):
+        return self._ordinal
+
+    @property
+    def date(self):
+        return _date_from_ordinal(self._ordinal)
+
+    def _key(self) -> tuple:
+        """
+        Return the values that identify this Task, starting with its date.
+        """
+        return (self._ordinal, self._name, self._desc)
+
+    def __eq__(self, other) -> bool:
+        if type(other) is not type(self):
+            return NotImplemented
+        return self._key() == other._key()
+
+    def __lt__(self, other) -> bool:
+        if type(other) is not type(self):
+            return NotImplemented
+        return self._key() < other._key()
+
+    def __hash__(self) -> int:
+        return hash(self._key())
+
 
 class InputTask(Task):
     """
     Task child class that creates a Task object from user inputs into the Planner.
     """
+    __slots__ = ("_parts",)
 
     def __init__(self, name: str, day: int, month: int, year: int, desc: str, parts: int) -> None:
         """
@@ -51,41 +99,38 @@ class InputTask(Task):
         super().__init__(name, day, month, year, desc)
         self._parts = parts
 
-    @property
-    def name(self):
-        return self._name
-
-    @property
-    def day(self):
-        return self._day
-
-    @property
-    def month(self):
-        return self._month
-
-    @property
-    def year(self):
-        return self._year
-
-    @property
-    def desc(self):
-        return self._desc
+    @classmethod
+    def from_ordinal(cls, name: str, ordinal: int, desc: str, parts: int) -> "InputTask":
+        """
+        Create a new InputTask object from a date ordinal instead of a day, month, and year.
+        """
+        task = cls.__new__(cls)
+        task._name = _intern(name)
+        task._ordinal = ordinal
+        task._desc = _intern(desc)
+        task._parts = parts
+        return task
 
     @property
     def parts(self):
         return self._parts
 
+    def _key(self) -> tuple:
+        return (self._ordinal, self._name, self._desc, self._parts)
+
     def __str__(self) -> str:
         """
         Return the string expression of this Task.
         """
-        return f"TASK {self._name} DUE {self._day:02d} {self._month:02d} {self._year:04d} DESC {self._desc} PARTS {self._parts}"
+        date = _date_from_ordinal(self._ordinal)
+        return f"TASK {self._name} DUE {date.day:02d} {date.month:02d} {date.year:04d} DESC {self._desc} PARTS {self._parts}"
 
 
 class OutputTask(Task):
     """
     Task child class that creates a Task object from outputs from the Planner's AI.
     """
+    __slots__ = ("_part_num", "_total_parts")
 
     def __init__(self, name: str, day: int, month: int, year: int, desc: str, part_num: int, total_parts: int) -> None:
         """
@@ -95,6 +140,19 @@ class OutputTask(Task):
         self._part_num = part_num
         self._total_parts = total_parts
 
+    @classmethod
+    def from_ordinal(cls, name: str, ordinal: int, desc: str, part_num: int, total_parts: int) -> "OutputTask":
+        """
+        Create a new OutputTask object from a date ordinal instead of a day, month, and year.
+        """
+        task = cls.__new__(cls)
+        task._name = _intern(name)
+        task._ordinal = ordinal
+        task._desc = _intern(desc)
+        task._part_num = part_num
+        task._total_parts = total_parts
+        return task
+
     @property
     def part_num(self):
         return self._part_num
@@ -103,10 +161,14 @@ class OutputTask(Task):
     def total_parts(self):
         return self._total_parts
 
+    def _key(self) -> tuple:
+        return (self._ordinal, self._name, self._desc, self._part_num, self._total_parts)
+
     def __str__(self) -> str:
         """
         Return the string expression of this Task.
         """
-        return f"TASK {self._name} DUE {self._day:02d} {self._month:02d} {self._year:04d} DESC {self._desc} PARTS {self._part_num} {self._total_parts}"
+        date = _date_from_ordinal(self._ordinal)
+        return f"TASK {self._name} DUE {date.day:02d} {date.month:02d} {date.year:04d} DESC {self._desc} PARTS {self._part_num} {self._total_parts}"
 
 __all__ = [Task.__name__, InputTask.__name__, OutputTask.__name__]
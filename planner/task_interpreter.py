@@ -4,6 +4,11 @@ Module to convert parameters and strings to Task objects for further use.
 
 
 
+import datetime
+import functools
+import re
+from collections.abc import Iterable, Iterator
+
 from planner.task import *
 
 
@@ -23,7 +28,14 @@ class TaskInterpreterException(Exception):
     """
     Exceptions when interpreting a Task.
     """
-    pass
+    def __init__(self, message: str, position: int | None = None) -> None:
+        """
+        Create a new TaskInterpreterException, optionally noting the character position of the error.
+        """
+        if position is not None:
+            message += f" (at character {position})"
+        super().__init__(message)
+        self.position = position
 
 
 
@@ -74,7 +86,10 @@ def params_to_input_task(name: str, day: str, month: str, year: str, desc: str,
     if errorMsg != "":
         raise CreateTaskException("Error when creating Task: " + errorMsg[:-2])
 
-    return InputTask(name, day, month, year, desc, parts)
+    try:
+        return InputTask(name, day, month, year, desc, parts)
+    except (ValueError, OverflowError) as e:
+        raise CreateTaskException("Error when creating Task: Date is not valid; " + str(e)) from e
 
 
 def input_tasks_to_lines(task_list: list[InputTask]) -> str:
@@ -98,6 +113,25 @@ def input_tasks_to_lines(task_list: list[InputTask]) -> str:
 
 
 
+def task_to_dict(task: Task) -> dict:
+    """
+    Given a Task, create a dictionary of its parameters.
+
+    Used for sending InputTask and OutputTask objects as JSON.
+    """
+    if not isinstance(task, Task):
+        raise TasktoLineException("Object is not a Task.")
+
+    result = {"name": task.name, "day": task.day, "month": task.month, "year": task.year, "desc": task.desc}
+    if isinstance(task, InputTask):
+        result["parts"] = task.parts
+    elif isinstance(task, OutputTask):
+        result["part_num"] = task.part_num
+        result["total_parts"] = task.total_parts
+    return result
+
+
+
 def params_to_output_task(name: str, day: str, month: str, year: str, desc: str, part_num: str, total_parts: str) -> OutputTask:
     """
     Given a Task's name, assigned date (day, month, and year), description, and parts, create an OutputTask object.
@@ -152,7 +186,263 @@ def params_to_output_task(name: str, day: str, month: str, year: str, desc: str,
     if errorMsg != "":
         raise CreateTaskException("Error when creating Task: " + errorMsg[:-2])
 
-    return OutputTask(name, day, month, year, desc, part_num, total_parts)
+    try:
+        return OutputTask(name, day, month, year, desc, part_num, total_parts)
+    except (ValueError, OverflowError) as e:
+        raise CreateTaskException("Error when creating Task: Date is not valid; " + str(e)) from e
+
+
+@functools.lru_cache(maxsize = 4096)
+def iso_date_to_ordinal(text: str) -> int:
+    """
+    Given an ISO date string such as 2025-01-31, return its proleptic Gregorian ordinal.
+
+    Bulk imports repeat the same due dates over and over, so parsed dates are cached. Raises a ValueError if the string
+    is not a valid date.
+    """
+    return datetime.date.fromisoformat(text).toordinal()
+
+
+_INPUT_FIELDS = ("name", "date", "desc", "parts")
+_OUTPUT_FIELDS = ("name", "date", "desc", "part_num", "total_parts")
+# error messages for the integer fields, in the wording of params_to_input_task and params_to_output_task
+_INTEGER_ERRORS = {"parts": "Parts is not an integer", "part_num": "Part Number is not an integer",
+                   "total_parts": "Total Number of Parts is not an integer"}
+
+
+def _date_to_ordinal(value) -> int:
+    """
+    Given an ISO date string, a date, or a (year, month, day) tuple, return its ordinal.
+    """
+    if type(value) is str:
+        return iso_date_to_ordinal(value)
+    if isinstance(value, datetime.date):
+        return value.toordinal()
+    if isinstance(value, tuple):
+        return datetime.date(*map(int, value)).toordinal()
+    raise TypeError("Date is not an ISO date string.")
+
+
+def _row_values(row, fields: tuple[str, ...]) -> list:
+    """
+    Given a row as a dictionary or a sequence, return its values in the order of fields.
+
+    A dictionary without a date may give the day, month, and year separately, like the dictionaries of task_to_dict.
+    """
+    if isinstance(row, dict):
+        values = [row.get(field) for field in fields]
+        if values[1] is None and "day" in row:
+            values[1] = (row.get("year"), row.get("month"), row.get("day"))
+        return values
+    if isinstance(row, (tuple, list)):
+        if len(row) != len(fields):
+            raise CreateTaskException(f"Error when creating Task: Row has {len(row)} values instead of {len(fields)}")
+        return list(row)
+    raise CreateTaskException("Error when creating Task: Row is not a dictionary or a sequence")
+
+
+def _row_to_task(row, fields: tuple[str, ...], from_ordinal) -> Task:
+    """
+    Given a row, create its Task with from_ordinal, checking every value so that the error names all that are wrong.
+    """
+    name, date, desc, *numbers = _row_values(row, fields)
+    errorMsg = ""
+    if not isinstance(name, str):
+        errorMsg += "Name is not a string; "
+    try:
+        ordinal = _date_to_ordinal(date)
+    except (TypeError, ValueError, OverflowError) as e:
+        errorMsg += f"Date is not valid; {e}; " if isinstance(date, (str, tuple)) else "Date is not a string; "
+    if not isinstance(desc, str):
+        errorMsg += "Description is not a string; "
+    for position, (field, number) in enumerate(zip(fields[3:], numbers)):
+        try:
+            numbers[position] = int(number)
+        except (TypeError, ValueError):
+            errorMsg += _INTEGER_ERRORS[field] + "; "
+
+    if errorMsg != "":
+        raise CreateTaskException("Error when creating Task: " + errorMsg[:-2])
+    return from_ordinal(name, ordinal, desc, *numbers)
+
+
+def _rows_to_tasks(rows: Iterable, fields: tuple[str, ...], from_ordinal) -> tuple[list, list[tuple[int, str]]]:
+    """
+    Given rows of Task parameters, return the Tasks created with from_ordinal and the errors of the rows that failed.
+
+    Rows of strings with ISO dates, as CSV files give them, are converted with one try per row and no checks of their
+    own; any row that fails there, or that is a dictionary, goes through _row_to_task instead.
+    """
+    if isinstance(rows, (str, bytes)) or not isinstance(rows, Iterable):
+        raise CreateTaskException("Rows of Tasks are not iterable.")
+
+    parse = iso_date_to_ordinal
+    tasks = []
+    append = tasks.append
+    errors = []
+    for index, row in enumerate(rows):
+        try:
+            if type(row) is not tuple:
+                raise TypeError
+            if len(fields) == 4:
+                name, date, desc, parts = row
+                if type(name) is not str or type(desc) is not str:
+                    raise TypeError
+                append(from_ordinal(name, parse(date), desc, int(parts)))
+            else:
+                name, date, desc, part_num, total_parts = row
+                if type(name) is not str or type(desc) is not str:
+                    raise TypeError
+                append(from_ordinal(name, parse(date), desc, int(part_num), int(total_parts)))
+        except (TypeError, ValueError, OverflowError):
+            try:
+                append(_row_to_task(row, fields, from_ordinal))
+            except CreateTaskException as e:
+                errors.append((index, str(e)))
+    return tasks, errors
+
+
+def rows_to_input_tasks(rows: Iterable) -> tuple[list[InputTask], list[tuple[int, str]]]:
+    """
+    Given rows of InputTask parameters, create a list of InputTask objects and a list of errors.
+
+    Each row is a dictionary with the keys name, date, desc, and parts, or a sequence of those values in that order,
+    so the rows of csv.reader, csv.DictReader, or a JSON array can be passed as they are. Dates are ISO date strings.
+    Rows that fail do not stop the rest; each gives an (index of the row, error message) pair instead.
+
+    Used for importing many InputTasks at once.
+    """
+    return _rows_to_tasks(rows, _INPUT_FIELDS, InputTask.from_ordinal)
+
+
+def rows_to_output_tasks(rows: Iterable) -> tuple[list[OutputTask], list[tuple[int, str]]]:
+    """
+    Given rows of OutputTask parameters, create a list of OutputTask objects and a list of errors.
+
+    Like rows_to_input_tasks, with the keys name, date, desc, part_num, and total_parts.
+    """
+    return _rows_to_tasks(rows, _OUTPUT_FIELDS, OutputTask.from_ordinal)
+
+
+# Keywords that start each parameter of an OutputTask; DATE is what the AI is asked to write, DUE is what OutputTask prints
+_KEYWORDS = {"TASK": "TASK", "DUE": "DUE", "DATE": "DUE", "DESC": "DESC", "PARTS": "PARTS"}
+_WORD_RE = re.compile(r"\S+")
+# Whitespace other than single spaces, which has to be collapsed when slicing names and descriptions
+_UNEVEN_SPACE_RE = re.compile(r"\s\s|[^\S ]")
+# One well-formed OutputTask, matched in a single regex pass; anything else goes through the word-by-word scanner
+_PLAIN_WORD = r"(?!(?:TASK|DUE|DATE|DESC|PARTS)(?!\S))\S+"
+_TASK_RE = re.compile(
+    rf"TASK(?:\s+(?P<name>{_PLAIN_WORD}(?:\s+{_PLAIN_WORD})*))?"
+    r"\s+(?:DUE|DATE)\s+(?P<day>\d+)\s+(?P<month>\d+)\s+(?P<year>\d+)"
+    rf"\s+DESC(?:\s+(?P<desc>{_PLAIN_WORD}(?:\s+{_PLAIN_WORD})*))?"
+    # a third number after PARTS is left to the word-by-word scanner, which reports it as an extra Parts value
+    r"\s+PARTS\s+(?P<part_num>\d+)\s+(?P<total_parts>\d+)(?!\s+\d+(?!\S))(?:\s+|\Z)"
+)
+_SPACE_RE = re.compile(r"\s*")
+
+
+def _span_text(text: str, start: int, end: int) -> str:
+    """
+    Return the words of text between start and end joined by single spaces.
+    """
+    span = text[start:end]
+    if _UNEVEN_SPACE_RE.search(span):
+        return ' '.join(span.split())
+    return span
+
+
+def _scan_output_tasks(text: str) -> Iterator[OutputTask]:
+    """
+    Given a string of OutputTasks, yield each OutputTask in a single pass over the string.
+
+    Well-formed tasks are matched whole by one compiled regex. From the first task that does not match, the rest of
+    the string is scanned word by word so that errors report the character position they were found at.
+    """
+    first = pos = _SPACE_RE.match(text).end()
+    end = len(text)
+    while pos < end:
+        match = _TASK_RE.match(text, pos)
+        if match is None:
+            yield from _scan_words(text, pos, pos > first)
+            return
+        name, day, month, year, desc, part_num, total_parts = match.groups()
+        name = _span_text(name, 0, len(name)) if name else ""
+        desc = _span_text(desc, 0, len(desc)) if desc else ""
+        try:
+            task = OutputTask(name, int(day), int(month), int(year), desc, int(part_num), int(total_parts))
+        except (ValueError, OverflowError):
+            # a date that does not exist, like 31 02, gets the regular constructor's error message
+            task = params_to_output_task(name, day, month, year, desc, part_num, total_parts)
+        yield task
+        pos = match.end()
+
+
+def _scan_words(text: str, pos: int, after_task: bool = False) -> Iterator[OutputTask]:
+    """
+    Given a string of OutputTasks and a position in it, yield each OutputTask from that position onwards word by word.
+
+    after_task tells whether a complete task ends at that position, for reporting text that is not part of any task.
+    """
+    task_start = -1
+    state = None
+    seen = set()
+    name_span = desc_span = None
+    dates = []
+    parts = []
+
+    def finish() -> OutputTask:
+        if len(seen) < 4:
+            raise TaskInterpreterException("All required parameters not given to create an OutputTask.", task_start)
+        name = _span_text(text, *name_span) if name_span else ""
+        desc = _span_text(text, *desc_span) if desc_span else ""
+        try:
+            return OutputTask(name, int(dates[0]), int(dates[1]), int(dates[2]), desc, int(parts[0]), int(parts[1]))
+        except (ValueError, OverflowError, IndexError):
+            # let the regular constructor build the detailed error message
+            return params_to_output_task(name, *(dates + [""] * (3 - len(dates))), desc,
+                                         *(parts + [""] * (2 - len(parts))))
+
+    for match in _WORD_RE.finditer(text, pos):
+        word = match.group()
+        keyword = _KEYWORDS.get(word)
+
+        if keyword == "TASK" and task_start != -1:
+            # the next task started, so the current one is complete
+            yield finish()
+            task_start = -1
+
+        if keyword is not None:
+            if keyword == "TASK":
+                task_start = match.start()
+                seen = set()
+                name_span = desc_span = None
+                dates = []
+                parts = []
+            elif task_start == -1:
+                raise TaskInterpreterException(f"Keyword {word} given before TASK.", match.start())
+            if keyword in seen:
+                raise TaskInterpreterException(f"Keyword {word} given more than once in one task.", match.start())
+            seen.add(keyword)
+            state = keyword
+        elif task_start == -1 and after_task:
+            raise TaskInterpreterException("Text given after the end of a complete task.", match.start())
+        elif task_start == -1:
+            raise TaskInterpreterException("Text given before the first TASK keyword.", match.start())
+        elif state == "TASK":
+            name_span = (name_span[0] if name_span else match.start(), match.end())
+        elif state == "DESC":
+            desc_span = (desc_span[0] if desc_span else match.start(), match.end())
+        elif state == "DUE":
+            if len(dates) == 3:
+                raise TaskInterpreterException("More values given to Due Date than expected.", match.start())
+            dates.append(word)
+        else:
+            if len(parts) == 2:
+                raise TaskInterpreterException("More values given to Parts than expected.", match.start())
+            parts.append(word)
+
+    if task_start != -1:
+        yield finish()
 
 
 def line_to_output_task(line: str) -> OutputTask:
@@ -166,46 +456,13 @@ def line_to_output_task(line: str) -> OutputTask:
     elif not line:
         raise TaskInterpreterException("Empty line given.")
 
-    line_list = line.split()
-    active_state = "NONE"
-    data = {"NAME": "", "DAY": "", "MONTH": "", "YEAR": "", "DESC": "", "PART_NUM": "", "TOTAL_PARTS": ""}
-
-    if "TASK" not in line_list or "DUE" not in line_list or "DESC" not in line_list or "PARTS" not in line_list:
+    output_tasks = _scan_output_tasks(line)
+    output_task = next(output_tasks, None)
+    if output_task is None:
         raise TaskInterpreterException("All required parameters not given to create an OutputTask.")
-
-    for word in line_list:
-        if word == "TASK" or word == "DUE" or word == "DESC" or word == "PARTS":
-            # Found keyword -> change processed parameter
-            active_state = word
-        else:
-            if active_state == "TASK":
-                if data["NAME"] == "":
-                    data["NAME"] = word
-                else:
-                    data["NAME"] += ' ' + word
-            elif active_state == "DUE":
-                if data["DAY"] == "":
-                    data["DAY"] = word
-                elif data["MONTH"] == "":
-                    data["MONTH"] = word
-                elif data["YEAR"] == "":
-                    data["YEAR"] = word
-                else:
-                    raise TaskInterpreterException("More values given to Due Date than expected.")
-            elif active_state == "DESC":
-                if data["DESC"] == "":
-                    data["DESC"] = word
-                else:
-                    data["DESC"] += ' ' + word
-            elif active_state == "PARTS":
-                if data["PART_NUM"] == "":
-                    data["PART_NUM"] = word
-                elif data["TOTAL_PARTS"] == "":
-                    data["TOTAL_PARTS"] = word
-                else:
-                    raise TaskInterpreterException("More values given to Parts than expected.")
-    
-    return params_to_output_task(data["NAME"], data["DAY"], data["MONTH"], data["YEAR"], data["DESC"], data["PART_NUM"], data["TOTAL_PARTS"])
+    if next(output_tasks, None) is not None:
+        raise TaskInterpreterException("More than one Task given in a single line.")
+    return output_task
 
 
 def lines_to_output_tasks(lines: str) -> list[OutputTask]:
@@ -217,23 +474,164 @@ def lines_to_output_tasks(lines: str) -> list[OutputTask]:
     if not isinstance(lines, str):
         raise CreateTaskException("Lines of OutputTasks input are not in a string.")
 
-    lines_list = lines.split()
-    line = ""
-    output_tasks = []
-    for word in lines_list:
-        if word == "TASK":
-            # Add the new OutputTask if a line has been compiled
-            if line != "":
-                output_tasks.append(line_to_output_task(line))
-            # Reset the extracted line
-            line = "TASK"
-        else:
-            line += ' ' + word
-    
-    if line != "":
-        output_tasks.append(line_to_output_task(line))
+    return list(_scan_output_tasks(lines))
+
 
+def task_display_name(task: Task) -> str:
+    """
+    Given a Task, return the name it is scheduled under, generating one from its description if it has no name.
+    """
+    if task.name and task.name != "NONE":
+        return task.name
+    if task.desc and task.desc != "NONE":
+        return task.desc
+    return "Untitled Task"
+
+
+# One task of the compact output: its id, a colon, and the days of its parts separated by commas, where a number
+# followed by a colon is already the next task's id
+_OFFSETS_RE = re.compile(r"\s*(\d+)\s*:\s*(-?\d+(?:\s*,\s*-?\d+(?!\d|\s*:))*)\s*,?\s*")
+
+
+def _offset_items(reply: str) -> Iterator[tuple[int, list[int]]]:
+    """
+    Given a reply in the compact output format, yield each task id with the days of its parts.
+    """
+    text = reply.strip()
+    if text.startswith("{"):
+        # json is only imported for JSON replies, so parsing Tasks stays cheap to import
+        import json
+        try:
+            data = json.loads(text)
+        except ValueError as e:
+            raise TaskInterpreterException(f"Reply is not valid JSON; {e}") from e
+        if not isinstance(data, dict):
+            raise TaskInterpreterException("Reply is not a JSON object of task ids.")
+        for task_id, offsets in data.items():
+            if not isinstance(offsets, list) or not all(type(offset) is int for offset in offsets):
+                raise TaskInterpreterException(f"Days of task {task_id} are not a list of integers.")
+            try:
+                yield int(task_id), offsets
+            except ValueError as e:
+                raise TaskInterpreterException(f"Task id {task_id} is not an integer.") from e
+        return
+
+    pos = 0
+    while pos < len(text):
+        match = _OFFSETS_RE.match(text, pos)
+        if match is None:
+            raise TaskInterpreterException("Reply is not in the id:days format.", pos)
+        yield int(match.group(1)), [int(offset) for offset in match.group(2).split(",")]
+        pos = match.end()
+
+
+def offsets_to_output_tasks(reply: str, input_tasks: list[InputTask],
+                            today: datetime.date | None = None) -> list[OutputTask]:
+    """
+    Given the model's reply in the compact output format and the InputTasks it was asked about, create a list of
+    OutputTask objects in date order.
+
+    The reply gives each task by its id, its position in the list counting from 1, with the days from today of its
+    parts in order, either as lines like 1:0,1 or as a JSON object like {"1": [0, 1]}. The names, descriptions, and
+    number of parts are taken from the InputTasks, so the model never has to repeat them. Every day must fall from
+    today up to the day before the task is due, or on today for late tasks and tasks due today.
+    """
+    if not isinstance(reply, str):
+        raise CreateTaskException("Compact output is not in a string.")
+    if not isinstance(input_tasks, list):
+        raise CreateTaskException("Input Task list is not a list.")
+    if today is None:
+        today = datetime.date.today()
+    start = today.toordinal()
+
+    output_tasks = []
+    from_ordinal = OutputTask.from_ordinal
+    for task_id, offsets in _offset_items(reply):
+        if not 1 <= task_id <= len(input_tasks):
+            raise TaskInterpreterException(f"Task id {task_id} is not one of the given tasks.")
+        task = input_tasks[task_id - 1]
+        if not isinstance(task, InputTask):
+            raise CreateTaskException("Object in list is not an InputTask.")
+        name = task_display_name(task)
+        total_parts = max(task.parts, 1)
+        last_offset = max(task.ordinal - start, 1) - 1
+        for part_num, offset in enumerate(offsets, 1):
+            if not 0 <= offset <= last_offset:
+                raise TaskInterpreterException(f"Day {offset} of task {task_id} is outside its due window.")
+            output_tasks.append(from_ordinal(name, start + offset, task.desc, part_num, total_parts))
+    output_tasks.sort(key = lambda task: task.ordinal)
     return output_tasks
 
-__all__ = [params_to_input_task.__name__, input_tasks_to_lines.__name__, params_to_output_task.__name__, line_to_output_task.__name__, 
-        lines_to_output_tasks.__name__, CreateTaskException.__name__, TasktoLineException.__name__, TaskInterpreterException.__name__]
\ No newline at end of file
+
+class OutputTaskStreamParser:
+    """
+    Incremental parser that turns chunks of an OutputTask string into OutputTask objects as soon as each one is complete.
+
+    A task is complete once the next TASK keyword arrives, or once the stream is closed.
+    """
+
+    def __init__(self) -> None:
+        """
+        Create a new OutputTaskStreamParser with nothing parsed yet.
+        """
+        # the last word of the previous chunk, if that chunk ended in the middle of a word
+        self._pending = ""
+        # words of the task that is currently being received
+        self._words = []
+
+    def feed(self, chunk: str) -> list[OutputTask]:
+        """
+        Given the next chunk of an OutputTask string, return the OutputTasks that the chunk completed.
+        """
+        if not isinstance(chunk, str):
+            raise TaskInterpreterException("Streamed chunk is not a string.")
+        if not chunk:
+            return []
+
+        text = self._pending + chunk
+        words = text.split()
+        if text[-1].isspace() or not words:
+            self._pending = ""
+        else:
+            self._pending = words.pop()
+        return self._add_words(words)
+
+    def close(self) -> list[OutputTask]:
+        """
+        End the stream and return the OutputTasks that were still being received.
+        """
+        words = [self._pending] if self._pending else []
+        self._pending = ""
+        output_tasks = self._add_words(words)
+        if self._words:
+            output_tasks.append(line_to_output_task(' '.join(self._words)))
+            self._words = []
+        return output_tasks
+
+    def _add_words(self, words: list[str]) -> list[OutputTask]:
+        output_tasks = []
+        for word in words:
+            if word == "TASK" and self._words:
+                # the next task started, so the current one is complete
+                output_tasks.append(line_to_output_task(' '.join(self._words)))
+                self._words = []
+            self._words.append(word)
+        return output_tasks
+
+
+def stream_to_output_tasks(chunks: Iterable[str]) -> Iterator[OutputTask]:
+    """
+    Given chunks of an OutputTask string, yield each OutputTask as soon as it is complete.
+
+    Used for turning a streamed reply from the AI into OutputTask objects without waiting for the whole reply.
+    """
+    parser = OutputTaskStreamParser()
+    for chunk in chunks:
+        yield from parser.feed(chunk)
+    yield from parser.close()
+
+__all__ = [params_to_input_task.__name__, input_tasks_to_lines.__name__, task_to_dict.__name__, params_to_output_task.__name__, line_to_output_task.__name__, 
+        lines_to_output_tasks.__name__, task_display_name.__name__, offsets_to_output_tasks.__name__,
+        OutputTaskStreamParser.__name__, stream_to_output_tasks.__name__,
+        iso_date_to_ordinal.__name__, rows_to_input_tasks.__name__, rows_to_output_tasks.__name__,
+        CreateTaskException.__name__, TasktoLineException.__name__, TaskInterpreterException.__name__]
\ No newline at end of file
@@ -0,0 +1,272 @@
+"""
+Module to keep each user's InputTasks and schedule in a sqlite database shared by every worker process.
+"""
+
+
+
+import datetime
+import sqlite3
+import threading
+import time
+from collections.abc import Iterable, Iterator
+
+from planner.task import InputTask, OutputTask
+
+
+class TaskStoreException(Exception):
+    """
+    Exceptions when reading or writing the TaskStore.
+    """
+    pass
+
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS input_tasks (
+    id INTEGER PRIMARY KEY,
+    user TEXT NOT NULL,
+    name TEXT NOT NULL,
+    due INTEGER NOT NULL,
+    description TEXT NOT NULL,
+    parts INTEGER NOT NULL
+);
+CREATE INDEX IF NOT EXISTS input_tasks_user_due ON input_tasks (user, due);
+CREATE TABLE IF NOT EXISTS output_tasks (
+    id INTEGER PRIMARY KEY,
+    user TEXT NOT NULL,
+    name TEXT NOT NULL,
+    date INTEGER NOT NULL,
+    description TEXT NOT NULL,
+    part_num INTEGER NOT NULL,
+    total_parts INTEGER NOT NULL
+);
+CREATE INDEX IF NOT EXISTS output_tasks_user_date ON output_tasks (user, date);
+CREATE INDEX IF NOT EXISTS output_tasks_user_part ON output_tasks (user, name, description, part_num, date);
+CREATE TABLE IF NOT EXISTS schedule_versions (
+    user TEXT PRIMARY KEY,
+    version INTEGER NOT NULL
+);
+"""
+
+
+class TaskStore:
+    """
+    sqlite-backed storage of InputTasks and scheduled OutputTasks, keyed by user.
+
+    The database runs in WAL mode so that several worker processes can read while one writes. Dates are stored as
+    ordinals and indexed together with the user, so reads for one user and date range never scan other users' tasks.
+    """
+
+    def __init__(self, path: str) -> None:
+        """
+        Create a new TaskStore on the sqlite database file at path, creating the tables if needed.
+        """
+        self._path = path
+        # sqlite connections cannot be shared between threads, so each thread opens its own
+        self._local = threading.local()
+        # counts the schedule writes made through this TaskStore, to wake watchers without polling
+        self._writes = 0
+        self._written = threading.Condition()
+        connection = self._connection()
+        connection.execute("PRAGMA journal_mode=WAL")
+        connection.executescript(_SCHEMA)
+
+    def _connection(self) -> sqlite3.Connection:
+        connection = getattr(self._local, "connection", None)
+        if connection is None:
+            connection = sqlite3.connect(self._path, timeout = 30)
+            connection.execute("PRAGMA synchronous=NORMAL")
+            self._local.connection = connection
+        return connection
+
+    def add_input_tasks(self, user: str, input_tasks: Iterable[InputTask]) -> list[int]:
+        """
+        Given a user and InputTasks, store every task in one transaction and return their ids.
+        """
+        connection = self._connection()
+        ids = []
+        with connection:
+            for task in input_tasks:
+                if not isinstance(task, InputTask):
+                    raise TaskStoreException("Object in list is not an InputTask.")
+                cursor = connection.execute("INSERT INTO input_tasks (user, name, due, description, parts) "
+                                            "VALUES (?, ?, ?, ?, ?)", (user, task.name, task.ordinal, task.desc, task.parts))
+                ids.append(cursor.lastrowid)
+        return ids
+
+    def get_input_tasks(self, user: str, limit: int | None = None, offset: int = 0) -> list[InputTask]:
+        """
+        Given a user, return their InputTasks ordered by due date, optionally one page of limit tasks at a time.
+        """
+        rows = self._connection().execute(
+            "SELECT name, due, description, parts FROM input_tasks WHERE user = ? ORDER BY due, id LIMIT ? OFFSET ?",
+            (user, -1 if limit is None else limit, offset))
+        from_ordinal = InputTask.from_ordinal
+        return [from_ordinal(name, due, desc, parts) for name, due, desc, parts in rows]
+
+    def count_input_tasks(self, user: str) -> int:
+        return self._connection().execute("SELECT COUNT(*) FROM input_tasks WHERE user = ?", (user,)).fetchone()[0]
+
+    def remove_input_tasks(self, user: str, input_tasks: Iterable[InputTask]) -> int:
+        """
+        Given a user and InputTasks, delete one stored copy of each task and return how many were deleted.
+        """
+        connection = self._connection()
+        removed = 0
+        with connection:
+            for task in input_tasks:
+                cursor = connection.execute(
+                    "DELETE FROM input_tasks WHERE id = (SELECT id FROM input_tasks WHERE user = ? AND due = ? AND "
+                    "name = ? AND description = ? AND parts = ? LIMIT 1)",
+                    (user, task.ordinal, task.name, task.desc, task.parts))
+                removed += cursor.rowcount
+        return removed
+
+    def _insert_output_tasks(self, connection: sqlite3.Connection, user: str,
+                             output_tasks: Iterable[OutputTask]) -> None:
+        # every write to a schedule counts up its version, in the same transaction as the write
+        connection.execute("INSERT INTO schedule_versions (user, version) VALUES (?, 1) "
+                           "ON CONFLICT (user) DO UPDATE SET version = version + 1", (user,))
+        rows = []
+        for task in output_tasks:
+            if not isinstance(task, OutputTask):
+                raise TaskStoreException("Object in list is not an OutputTask.")
+            rows.append((user, task.name, task.ordinal, task.desc, task.part_num, task.total_parts))
+        connection.executemany("INSERT INTO output_tasks (user, name, date, description, part_num, total_parts) "
+                               "VALUES (?, ?, ?, ?, ?, ?)", rows)
+
+    def add_output_tasks(self, user: str, output_tasks: Iterable[OutputTask]) -> None:
+        """
+        Given a user and OutputTasks, add every part to the user's schedule in one transaction.
+        """
+        connection = self._connection()
+        with connection:
+            self._insert_output_tasks(connection, user, output_tasks)
+        self._notify()
+
+    def replace_schedule(self, user: str, output_tasks: Iterable[OutputTask]) -> None:
+        """
+        Given a user and OutputTasks, replace the user's whole schedule in one transaction.
+        """
+        connection = self._connection()
+        with connection:
+            connection.execute("DELETE FROM output_tasks WHERE user = ?", (user,))
+            self._insert_output_tasks(connection, user, output_tasks)
+        self._notify()
+
+    def schedule_version(self, user: str) -> int:
+        """
+        Given a user, return a number that changes whenever their schedule is written, or 0 if it never was.
+
+        Reading it is a single indexed lookup, so watchers can poll it instead of reading the whole schedule.
+        """
+        row = self._connection().execute("SELECT version FROM schedule_versions WHERE user = ?", (user,)).fetchone()
+        return 0 if row is None else row[0]
+
+    def _notify(self) -> None:
+        with self._written:
+            self._writes += 1
+            self._written.notify_all()
+
+    def wait_for_version(self, user: str, version: int, timeout: float) -> int:
+        """
+        Given a user and the version of their schedule last seen, wait up to timeout seconds for it to change, and
+        return the latest version.
+
+        Writes made through this TaskStore wake the waiting threads at once, while writes made by other processes are
+        only seen once timeout runs out, so watchers sleep instead of polling the database.
+        """
+        deadline = time.monotonic() + timeout
+        while True:
+            # the count is read before the version, so a write between the two still ends the wait
+            with self._written:
+                writes = self._writes
+            latest = self.schedule_version(user)
+            remaining = deadline - time.monotonic()
+            if latest != version or remaining <= 0:
+                return latest
+            with self._written:
+                self._written.wait_for(lambda: self._writes != writes, remaining)
+
+    def get_schedule(self, user: str, start: datetime.date | None = None, end: datetime.date | None = None,
+                     limit: int | None = None, offset: int = 0) -> list[OutputTask]:
+        """
+        Given a user, return their scheduled OutputTasks dated from start up to but not including end, in date order.
+
+        Either bound can be left out, and limit and offset read one page at a time.
+        """
+        low = 0 if start is None else start.toordinal()
+        high = datetime.date.max.toordinal() + 1 if end is None else end.toordinal()
+        rows = self._connection().execute(
+            "SELECT name, date, description, part_num, total_parts FROM output_tasks "
+            "WHERE user = ? AND date >= ? AND date < ? ORDER BY date, id LIMIT ? OFFSET ?",
+            (user, low, high, -1 if limit is None else limit, offset))
+        from_ordinal = OutputTask.from_ordinal
+        return [from_ordinal(name, date, desc, part_num, total_parts)
+                for name, date, desc, part_num, total_parts in rows]
+
+    def get_schedule_copies(self, user: str, start: datetime.date | None = None, end: datetime.date | None = None,
+                            limit: int | None = None, offset: int = 0) -> list[tuple[OutputTask, int]]:
+        """
+        Given a user, return the same parts as get_schedule, each with the number of copies of it earlier in the
+        user's whole schedule.
+
+        A copy is a part with the same name, description, and part number. Copies are counted in an index of each
+        user's parts, so a page costs the same however much of the schedule comes before it.
+        """
+        low = 0 if start is None else start.toordinal()
+        high = datetime.date.max.toordinal() + 1 if end is None else end.toordinal()
+        rows = self._connection().execute(
+            "SELECT name, date, description, part_num, total_parts, ("
+            "SELECT COUNT(*) FROM output_tasks AS copy WHERE copy.user = part.user AND copy.name = part.name "
+            "AND copy.description = part.description AND copy.part_num = part.part_num "
+            "AND (copy.date, copy.id) < (part.date, part.id)) "
+            "FROM output_tasks AS part WHERE user = ? AND date >= ? AND date < ? ORDER BY date, id LIMIT ? OFFSET ?",
+            (user, low, high, -1 if limit is None else limit, offset))
+        from_ordinal = OutputTask.from_ordinal
+        return [(from_ordinal(name, date, desc, part_num, total_parts), copies)
+                for name, date, desc, part_num, total_parts, copies in rows]
+
+    def iter_schedule(self, user: str, start: datetime.date | None = None, end: datetime.date | None = None,
+                      batch_size: int = 1000) -> Iterator[OutputTask]:
+        """
+        Given a user, yield their scheduled OutputTasks dated from start up to but not including end, in date order.
+
+        Rows are fetched batch_size at a time, so a large schedule is never held in memory all at once. The generator
+        must be used up on the thread that created it.
+        """
+        low = 0 if start is None else start.toordinal()
+        high = datetime.date.max.toordinal() + 1 if end is None else end.toordinal()
+        cursor = self._connection().execute(
+            "SELECT name, date, description, part_num, total_parts FROM output_tasks "
+            "WHERE user = ? AND date >= ? AND date < ? ORDER BY date, id", (user, low, high))
+        from_ordinal = OutputTask.from_ordinal
+        try:
+            while rows := cursor.fetchmany(batch_size):
+                for name, date, desc, part_num, total_parts in rows:
+                    yield from_ordinal(name, date, desc, part_num, total_parts)
+        finally:
+            cursor.close()
+
+    def delete_user(self, user: str) -> None:
+        """
+        Given a user, delete all of their InputTasks and their schedule.
+        """
+        connection = self._connection()
+        with connection:
+            connection.execute("DELETE FROM input_tasks WHERE user = ?", (user,))
+            connection.execute("DELETE FROM output_tasks WHERE user = ?", (user,))
+            # the version is counted up rather than deleted, so that watchers still see the schedule change
+            connection.execute("UPDATE schedule_versions SET version = version + 1 WHERE user = ?", (user,))
+        self._notify()
+
+    def close(self) -> None:
+        """
+        Close this thread's connection to the database.
+        """
+        connection = getattr(self._local, "connection", None)
+        if connection is not None:
+            connection.close()
+            self._local.connection = None
+
+
+__all__ = [TaskStoreException.__name__, TaskStore.__name__]
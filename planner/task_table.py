@@ -0,0 +1,197 @@
+"""
+Module that contains the TaskTable, a columnar container for running bulk queries over schedules of OutputTasks.
+"""
+
+
+
+import datetime
+from array import array
+from bisect import bisect_left
+from collections import Counter
+from collections.abc import Iterable
+from itertools import compress
+
+from planner.task import OutputTask
+
+
+class TaskTableException(Exception):
+    """
+    Exceptions when building or querying a TaskTable.
+    """
+    pass
+
+
+class TaskTable:
+    """
+    Columnar store of OutputTask parts, sorted by date.
+
+    Names and descriptions are dictionary-encoded as integer ids, and every column is a flat integer array, so counting
+    and filtering run over arrays instead of over OutputTask objects.
+    """
+
+    def __init__(self) -> None:
+        """
+        Create a new, empty TaskTable.
+        """
+        self._names = []
+        self._name_ids = {}
+        self._descs = []
+        self._desc_ids = {}
+        self._ordinals = array('i')
+        self._name_col = array('i')
+        self._desc_col = array('i')
+        self._part_nums = array('i')
+        self._total_parts = array('i')
+
+    @classmethod
+    def from_output_tasks(cls, output_tasks: Iterable[OutputTask]) -> "TaskTable":
+        """
+        Given OutputTasks, create a TaskTable holding every part, sorted by date.
+        """
+        table = cls()
+        rows = []
+        for task in output_tasks:
+            if not isinstance(task, OutputTask):
+                raise TaskTableException("Object in list is not an OutputTask.")
+            rows.append((task.ordinal, table._encode_name(task.name), table._encode_desc(task.desc), task.part_num,
+                         task.total_parts))
+        rows.sort(key = lambda row: row[0])
+        table._set_columns(rows)
+        return table
+
+    @classmethod
+    def concat(cls, tables: Iterable["TaskTable"]) -> "TaskTable":
+        """
+        Given TaskTables, for example one per user, create a single TaskTable holding all of their parts.
+        """
+        table = cls()
+        rows = []
+        for other in tables:
+            name_map = [table._encode_name(name) for name in other._names]
+            desc_map = [table._encode_desc(desc) for desc in other._descs]
+            rows.extend(zip(other._ordinals, map(name_map.__getitem__, other._name_col),
+                            map(desc_map.__getitem__, other._desc_col), other._part_nums, other._total_parts))
+        rows.sort(key = lambda row: row[0])
+        table._set_columns(rows)
+        return table
+
+    def _encode_name(self, name: str) -> int:
+        name_id = self._name_ids.get(name)
+        if name_id is None:
+            name_id = self._name_ids[name] = len(self._names)
+            self._names.append(name)
+        return name_id
+
+    def _encode_desc(self, desc: str) -> int:
+        desc_id = self._desc_ids.get(desc)
+        if desc_id is None:
+            desc_id = self._desc_ids[desc] = len(self._descs)
+            self._descs.append(desc)
+        return desc_id
+
+    def _set_columns(self, rows: list[tuple]) -> None:
+        if rows:
+            ordinals, names, descs, part_nums, total_parts = zip(*rows)
+            self._ordinals = array('i', ordinals)
+            self._name_col = array('i', names)
+            self._desc_col = array('i', descs)
+            self._part_nums = array('i', part_nums)
+            self._total_parts = array('i', total_parts)
+
+    def _slice(self, start: int, stop: int) -> "TaskTable":
+        """
+        Return a TaskTable with the rows from start to stop, sharing this table's name and description dictionaries.
+        """
+        table = TaskTable()
+        table._names = self._names
+        table._name_ids = self._name_ids
+        table._descs = self._descs
+        table._desc_ids = self._desc_ids
+        table._ordinals = self._ordinals[start:stop]
+        table._name_col = self._name_col[start:stop]
+        table._desc_col = self._desc_col[start:stop]
+        table._part_nums = self._part_nums[start:stop]
+        table._total_parts = self._total_parts[start:stop]
+        return table
+
+    def __len__(self) -> int:
+        return len(self._ordinals)
+
+    @property
+    def ordinals(self):
+        return self._ordinals
+
+    @property
+    def names(self):
+        return self._names
+
+    @property
+    def descs(self):
+        return self._descs
+
+    @property
+    def name_ids(self):
+        return self._name_col
+
+    @property
+    def desc_ids(self):
+        return self._desc_col
+
+    @property
+    def part_nums(self):
+        return self._part_nums
+
+    @property
+    def total_parts(self):
+        return self._total_parts
+
+    def to_output_tasks(self) -> list[OutputTask]:
+        """
+        Return every part in the TaskTable as an OutputTask, sorted by date.
+        """
+        names = self._names
+        descs = self._descs
+        from_ordinal = OutputTask.from_ordinal
+        return [from_ordinal(names[name], ordinal, descs[desc], part_num, total_parts)
+                for ordinal, name, desc, part_num, total_parts
+                in zip(self._ordinals, self._name_col, self._desc_col, self._part_nums, self._total_parts)]
+
+    def day_counts(self) -> dict[datetime.date, int]:
+        """
+        Return the number of parts scheduled on each day that has any.
+        """
+        return {datetime.date.fromordinal(ordinal): count for ordinal, count in Counter(self._ordinals).items()}
+
+    def filter_dates(self, start: datetime.date | None = None, end: datetime.date | None = None) -> "TaskTable":
+        """
+        Return a TaskTable with only the parts dated from start up to but not including end.
+
+        Either bound can be left out. Runs in O(log n + k) time for k matching parts.
+        """
+        low = 0 if start is None else bisect_left(self._ordinals, start.toordinal())
+        high = len(self._ordinals) if end is None else bisect_left(self._ordinals, end.toordinal())
+        return self._slice(low, max(low, high))
+
+    def filter_name(self, name: str) -> "TaskTable":
+        """
+        Return a TaskTable with only the parts of tasks with the given name.
+        """
+        name_id = self._name_ids.get(name, -1)
+        mask = [value == name_id for value in self._name_col]
+        table = self._slice(0, 0)
+        table._ordinals = array('i', compress(self._ordinals, mask))
+        table._name_col = array('i', compress(self._name_col, mask))
+        table._desc_col = array('i', compress(self._desc_col, mask))
+        table._part_nums = array('i', compress(self._part_nums, mask))
+        table._total_parts = array('i', compress(self._total_parts, mask))
+        return table
+
+    def overloaded_days(self, limit: int) -> list[datetime.date]:
+        """
+        Given a daily limit, return the days with more than that many parts, in date order.
+        """
+        return sorted(datetime.date.fromordinal(ordinal) for ordinal, count in Counter(self._ordinals).items()
+                      if count > limit)
+
+
+__all__ = [TaskTableException.__name__, TaskTable.__name__]
@@ -0,0 +1,213 @@
+"""
+Module to check the model's schedule of OutputTasks against the InputTasks it was asked to plan, and to repair it.
+"""
+
+
+
+import datetime
+from array import array
+
+from planner.date_index import DateIndex
+from planner.metrics import INVALID_PARTS
+from planner.scheduler import replan_tasks
+from planner.task import InputTask, OutputTask
+from planner.task_interpreter import task_display_name
+from planner.task_table import TaskTable, TaskTableException
+
+
+class ValidatorException(Exception):
+    """
+    Exceptions when validating a schedule.
+    """
+    pass
+
+
+class ValidationReport:
+    """
+    The problems found in a schedule, each as the OutputTasks that have it, and how evenly the schedule loads its days.
+    """
+
+    def __init__(self) -> None:
+        """
+        Create a new, empty ValidationReport.
+        """
+        # parts that belong to no InputTask
+        self.unknown: list[OutputTask] = []
+        # parts that repeat a part number of their task
+        self.duplicate: list[OutputTask] = []
+        # parts with a part number above the number of parts their InputTask asked for
+        self.extra: list[OutputTask] = []
+        # parts whose total number of parts disagrees with their InputTask
+        self.wrong_total: list[OutputTask] = []
+        # parts on or after their due date, or after today for late tasks
+        self.late: list[OutputTask] = []
+        # parts before today
+        self.past: list[OutputTask] = []
+        # (InputTask, part number) for every part the schedule leaves out
+        self.missing: list[tuple[InputTask, int]] = []
+        self.load_mean = 0.0
+        self.load_variance = 0.0
+        self.max_load = 0
+
+    @property
+    def ok(self):
+        return not (self.unknown or self.duplicate or self.extra or self.wrong_total or self.late or self.past or
+                    self.missing)
+
+    def problem_counts(self) -> dict[str, int]:
+        return {"unknown": len(self.unknown), "duplicate": len(self.duplicate), "extra": len(self.extra),
+                "wrong_total": len(self.wrong_total), "late": len(self.late), "past": len(self.past),
+                "missing": len(self.missing)}
+
+    def to_dict(self) -> dict:
+        """
+        Return the report as a dictionary of plain values, for logging or JSON.
+        """
+        result = {"ok": self.ok, "load_mean": self.load_mean, "load_variance": self.load_variance,
+                  "max_load": self.max_load}
+        for problem in ("unknown", "duplicate", "extra", "wrong_total", "late", "past"):
+            result[problem] = [str(task) for task in getattr(self, problem)]
+        result["missing"] = [{"task": str(task), "part_num": part_num} for task, part_num in self.missing]
+        return result
+
+
+def _input_index(input_tasks: list[InputTask]) -> tuple[dict, dict]:
+    """
+    Given InputTasks, return lookups from (display name, description) and from description alone to the positions of
+    the tasks with that key, in due date order.
+
+    The model names unnamed tasks itself, so those can only be found by their description.
+    """
+    named = {}
+    unnamed = {}
+    for index, task in enumerate(input_tasks):
+        if not isinstance(task, InputTask):
+            raise ValidatorException("Object in list is not an InputTask.")
+        if task.name and task.name != "NONE" or not task.desc or task.desc == "NONE":
+            named.setdefault((task_display_name(task), task.desc), []).append(index)
+        else:
+            unnamed.setdefault(task.desc, []).append(index)
+    for lookup in (named, unnamed):
+        for positions in lookup.values():
+            positions.sort(key = lambda index: input_tasks[index].ordinal)
+    return named, unnamed
+
+
+def _check(output_tasks: list[OutputTask], input_tasks: list[InputTask],
+           today: datetime.date) -> tuple[ValidationReport, list[OutputTask], array, set[int]]:
+    """
+    Return the report, the parts sorted by date, each part's InputTask position or -1, and the positions of the
+    InputTasks that have a problem.
+    """
+    if not isinstance(input_tasks, list):
+        raise ValidatorException("Input Task list is not a list.")
+    if not isinstance(output_tasks, list):
+        raise ValidatorException("Output Task list is not a list.")
+    named, unnamed = _input_index(input_tasks)
+    try:
+        table = TaskTable.from_output_tasks(output_tasks)
+    except TaskTableException as e:
+        raise ValidatorException(str(e)) from e
+    parts = table.to_output_tasks()
+    start = today.toordinal()
+
+    # hash join on the dictionary codes: each distinct name and description pair is looked up once
+    codes = {}
+    for name_id, desc_id in set(zip(table.name_ids, table.desc_ids)):
+        name, desc = table.names[name_id], table.descs[desc_id]
+        codes[(name_id, desc_id)] = named.get((name, desc)) or unnamed.get(desc) or ()
+    # InputTasks with the same key share out their parts: in date order, the nth copy of a part number goes to the
+    # nth task due, and copies beyond the last task are checked against it
+    task_ids = array('i')
+    copies = {}
+    for code, part_num in zip(zip(table.name_ids, table.desc_ids), table.part_nums):
+        positions = codes[code]
+        if not positions:
+            task_ids.append(-1)
+            continue
+        copy = copies.get((code, part_num), 0)
+        copies[(code, part_num)] = copy + 1
+        task_ids.append(positions[min(copy, len(positions) - 1)])
+
+    # late tasks and tasks due today may only go on today
+    last_days = array('i', (max(task.ordinal, start + 1) - 1 for task in input_tasks))
+    expected = array('i', (max(task.parts, 1) for task in input_tasks))
+
+    report = ValidationReport()
+    bad = set()
+    seen = set()
+    for row, (task_id, ordinal, part_num, total_parts) in enumerate(zip(task_ids, table.ordinals, table.part_nums,
+                                                                         table.total_parts)):
+        if task_id < 0:
+            report.unknown.append(parts[row])
+            continue
+        problem = None
+        if (task_id, part_num) in seen:
+            problem = report.duplicate
+        elif not 1 <= part_num <= expected[task_id]:
+            problem = report.extra
+        elif total_parts != expected[task_id]:
+            problem = report.wrong_total
+        elif ordinal > last_days[task_id]:
+            problem = report.late
+        elif ordinal < start:
+            problem = report.past
+        seen.add((task_id, part_num))
+        if problem is not None:
+            problem.append(parts[row])
+            bad.add(task_id)
+
+    for task_id, task in enumerate(input_tasks):
+        for part_num in range(1, expected[task_id] + 1):
+            if (task_id, part_num) not in seen:
+                report.missing.append((task, part_num))
+                bad.add(task_id)
+
+    loads = DateIndex(parts).day_loads(start)
+    if loads:
+        days = max(loads) - start + 1
+        report.load_mean = sum(loads.values()) / days
+        report.load_variance = (sum((load - report.load_mean) ** 2 for load in loads.values()) +
+                                (days - len(loads)) * report.load_mean ** 2) / days
+        report.max_load = max(loads.values())
+    return report, parts, task_ids, bad
+
+
+def validate_schedule(output_tasks: list[OutputTask], input_tasks: list[InputTask],
+                      today: datetime.date | None = None) -> ValidationReport:
+    """
+    Given a schedule of OutputTasks and the InputTasks it was planned from, return a ValidationReport.
+
+    Every part is matched to its InputTask by a hash join, then checked for its part numbers, its date against today
+    and the task's due date, and its day's load. Runs in O(P log P) time for P parts.
+    """
+    if today is None:
+        today = datetime.date.today()
+    return _check(output_tasks, input_tasks, today)[0]
+
+
+def repair_schedule(output_tasks: list[OutputTask], input_tasks: list[InputTask],
+                    today: datetime.date | None = None) -> tuple[list[OutputTask], ValidationReport]:
+    """
+    Given a schedule of OutputTasks and the InputTasks it was planned from, return a repaired schedule along with the
+    ValidationReport of the original.
+
+    Parts that belong to no InputTask are dropped. Every InputTask with a missing, repeated, misnumbered, or misdated
+    part has its parts placed again by the local scheduler around the parts that were fine, so a few bad parts never
+    need another call to the model.
+    """
+    if today is None:
+        today = datetime.date.today()
+    report, parts, task_ids, bad = _check(output_tasks, input_tasks, today)
+    for problem, count in report.problem_counts().items():
+        if count:
+            INVALID_PARTS.inc(count, problem = problem)
+    if report.ok:
+        return parts, report
+
+    kept = [task for task, task_id in zip(parts, task_ids) if task_id >= 0 and task_id not in bad]
+    return replan_tasks(kept, added = [input_tasks[task_id] for task_id in sorted(bad)], today = today), report
+
+
+__all__ = [ValidatorException.__name__, ValidationReport.__name__, validate_schedule.__name__,
+        repair_schedule.__name__]
@@ -13,21 +13,162 @@ document.addEventListener("DOMContentLoaded", () => {
     yesRadio.addEventListener("change", updateVisibility);
     noRadio.addEventListener("change", updateVisibility);
 
+    // Schedule script, which only asks the server for the week on screen
+    const scheduleList = document.getElementById("schedule");
+    const rangeLabel = document.getElementById("scheduleRange");
+    let weekStart = new Date();
+    weekStart.setHours(0, 0, 0, 0);
+
+    function addDays(date, days) {
+        // calendar days rather than fixed spans of time, so a daylight saving change never skips or repeats a date
+        const result = new Date(date);
+        result.setDate(result.getDate() + days);
+        return result;
+    }
+
+    function isoDate(date) {
+        const month = String(date.getMonth() + 1).padStart(2, "0");
+        const day = String(date.getDate()).padStart(2, "0");
+        return `${date.getFullYear()}-${month}-${day}`;
+    }
+
+    function partLabel(task) {
+        const name = task.name && task.name !== "NONE" ? task.name : task.desc;
+        return task.total_parts === 1 ? name : `${name} (${task.part_num}/${task.total_parts})`;
+    }
+
+    async function fetchRange(start, end) {
+        // follow the pages of the range until the server has no more
+        const tasks = [];
+        let offset = 0;
+        while (offset !== null) {
+            const params = new URLSearchParams({ start: isoDate(start), end: isoDate(end), offset: offset });
+            const response = await fetch(`/api/schedule?${params}`);
+            if (!response.ok) {
+                throw new Error((await response.json()).error);
+            }
+            const page = await response.json();
+            tasks.push(...page.tasks);
+            offset = page.next_offset;
+        }
+        return tasks;
+    }
+
+    // the list of each day on screen by its date, and the item of each part on screen by its id
+    const dayLists = new Map();
+    const partItems = new Map();
+
+    function taskDate(task) {
+        return `${task.year}-${String(task.month).padStart(2, "0")}-${String(task.day).padStart(2, "0")}`;
+    }
+
+    function placePart(task) {
+        // parts dated outside the week on screen are not kept
+        const list = dayLists.get(taskDate(task));
+        let item = partItems.get(task.id);
+        if (!list) {
+            removePart(task.id);
+            return;
+        }
+        if (!item) {
+            item = document.createElement("li");
+            partItems.set(task.id, item);
+        }
+        item.textContent = partLabel(task);
+        if (item.parentNode !== list) {
+            list.appendChild(item);
+        }
+    }
+
+    function removePart(id) {
+        const item = partItems.get(id);
+        if (item) {
+            item.remove();
+            partItems.delete(id);
+        }
+    }
+
+    function renderWeek(tasks) {
+        dayLists.clear();
+        partItems.clear();
+        const fragment = document.createDocumentFragment();
+        for (let i = 0; i < 7; i++) {
+            const key = isoDate(addDays(weekStart, i));
+            const day = document.createElement("div");
+            const heading = document.createElement("h6");
+            heading.textContent = key;
+            day.appendChild(heading);
+            const list = document.createElement("ul");
+            dayLists.set(key, list);
+            day.appendChild(list);
+            fragment.appendChild(day);
+        }
+        for (const task of tasks) {
+            placePart(task);
+        }
+        scheduleList.replaceChildren(fragment);
+    }
+
+    function applyDiff(diff) {
+        // only the parts that changed are touched, and adding or moving a part twice has the same result
+        for (const id of diff.removed) {
+            removePart(id);
+        }
+        for (const task of diff.added.concat(diff.moved)) {
+            placePart(task);
+        }
+    }
+
+    async function loadWeek() {
+        const weekEnd = addDays(weekStart, 7);
+        rangeLabel.textContent = `${isoDate(weekStart)} to ${isoDate(addDays(weekStart, 6))}`;
+        try {
+            renderWeek(await fetchRange(weekStart, weekEnd));
+        } catch (err) {
+            console.error("Error loading schedule:", err);
+        }
+    }
+
+    document.getElementById("prevWeek").addEventListener("click", () => {
+        weekStart = addDays(weekStart, -7);
+        loadWeek();
+    });
+    document.getElementById("nextWeek").addEventListener("click", () => {
+        weekStart = addDays(weekStart, 7);
+        loadWeek();
+    });
+    // every change to the schedule arrives as a diff, and after any reconnect the week is loaded again in case one
+    // was missed
+    const scheduleStream = new EventSource("/api/schedule/stream");
+    scheduleStream.addEventListener("open", loadWeek);
+    scheduleStream.addEventListener("diff", (e) => applyDiff(JSON.parse(e.data)));
+
     // Prevent page refresh on form submission
     const form = document.getElementById("addTaskForm");
     form.addEventListener("submit", async function (e) {
         e.preventDefault(); // stop normal refresh
 
         const formData = new FormData(form);
+        const task = {
+            name: formData.get("addName"),
+            date: formData.get("addDate"),
+            desc: formData.get("addDesc") || "NONE",
+            parts: Number(formData.get("addParts")) || 1
+        };
 
         try {
-            const response = await fetch(form.action, {
-                method: form.method,
-                body: formData
+            // the API answers with only the created task instead of the whole page
+            const response = await fetch("/api/tasks", {
+                method: "POST",
+                headers: { "Content-Type": "application/json" },
+                body: JSON.stringify(task)
             });
 
-            const result = await response.text(); // Flask returns plain text now
-            console.log("Server response:", result);
+            const result = await response.json();
+            if (!response.ok) {
+                throw new Error(result.error);
+            }
+            console.log("Task added:", result);
 
             // close modal and reset form
             const modal = bootstrap.Modal.getInstance(document.getElementById("addTaskModal"));
@@ -38,4 +179,4 @@ document.addEventListener("DOMContentLoaded", () => {
             console.error("Error submitting form:", err);
         }
     });
-});
\ No newline at end of file
+});